@@ -0,0 +1,210 @@
+"""
+Motor de scraping assíncrono baseado em playwright.async_api.
+
+Executa os mesmos passos do scraper.py (abas, gabarito, scroll e extração),
+mas processa várias URLs no mesmo processo com asyncio.gather, limitando a
+concorrência com um semáforo. Um único navegador e um único contexto
+autenticado servem todas as páginas, sem uma thread por página.
+"""
+
+import asyncio
+from playwright.async_api import async_playwright
+from config import SEL, SCRAPING_CONFIG
+from readiness import NetworkIdle, async_wait_ready, async_scroll_until_stable
+from resource_filter import async_attach_resource_filter
+from response_capture import ResponseCapture, parse_payloads
+from question_cache import FINGERPRINT_JS
+from extraction import async_extract_questions, to_questions
+from rate_limiter import limiter
+from scraper import (
+    CLICK_TAB_JS,
+    log_message,
+    update_progress,
+    add_screenshot,
+)
+
+async def scroll_all(page, quiet_ms=None, timeout=None, max_iter=None):
+    """
+    Rola a página até o DOM estabilizar (ver readiness.scroll_until_stable).
+
+    Returns:
+        Dicionário com iterations, elapsed (s), height (px) e converged
+    """
+    stats = await async_scroll_until_stable(page, quiet_ms, timeout, max_iter)
+    status = "✅ Scroll completo" if stats["converged"] else "⚠️ Scroll não estabilizou"
+    log_message(f"{status}: {stats['iterations']} iterações em {stats['elapsed']:.2f}s")
+    return stats
+
+async def click_tab(page, text):
+    """
+    Clica em uma aba específica baseada no texto.
+
+    Args:
+        page: Página do Playwright (async)
+        text: Texto da aba a ser clicada
+    """
+    try:
+        await async_wait_ready(page, "tabs")
+        result = await page.evaluate(CLICK_TAB_JS, text)
+        if result:
+            log_message(f"✅ Aba '{text}' clicada com sucesso!")
+        else:
+            log_message(f"⚠️ Aba '{text}' não encontrada")
+        return result
+    except Exception as e:
+        log_message(f"❌ Erro ao clicar na aba '{text}': {e}", "ERROR")
+        return False
+
+async def extract_all_data_with_javascript(page, skip=None):
+    """
+    Extrai as questões em um único page.evaluate - mesma extração do motor síncrono.
+    """
+    try:
+        return to_questions(await async_extract_questions(page, skip))
+    except Exception as e:
+        log_message(f"❌ Erro na extração de dados: {e}", "ERROR")
+        return []
+
+async def extract_with_cache(page, question_cache):
+    """
+    Versão assíncrona de scraper.extract_with_cache. O cache (SQLite com lock)
+    é consultado e gravado numa thread, fora do event loop.
+    """
+    fingerprints = await page.evaluate(FINGERPRINT_JS, SEL)
+    cached = await asyncio.to_thread(question_cache.lookup, fingerprints)
+    nodes = await extract_all_data_with_javascript(page, skip=cached.keys())
+    await asyncio.to_thread(question_cache.store, nodes, fingerprints)
+    nodes.extend(cached.values())
+    nodes.sort(key=lambda q: q.gabarito)
+    return nodes
+
+async def process_url(context, url, index, mode=None, question_cache=None):
+    """
+    Abre uma página nova no contexto compartilhado e executa os passos de raspagem.
+
+    Args:
+        context: Contexto autenticado do Playwright (async)
+        url: URL de questões a processar
+        index: Posição da URL na lista (usada nos arquivos de debug)
+        mode: "dom" ou "network" (padrão: SCRAPING_CONFIG["extraction_mode"])
+        question_cache: QuestionCache para reaproveitar questões já extraídas
+
+    Returns:
+        Lista de Question extraídas; None em caso de erro
+    """
+    mode = mode or SCRAPING_CONFIG["extraction_mode"]
+    page = await context.new_page()
+    limiter.async_watch(page)
+    resource_filter = await async_attach_resource_filter(page)
+    capture = ResponseCapture(page) if mode == "network" else None
+    network = NetworkIdle(page)
+    try:
+        await limiter.async_navigate(
+            page, url,
+            on_wait=lambda wait: log_message(f"⏳ [{index}] Aguardando {wait:.1f}s (limite do host)"),
+            wait_until="domcontentloaded", timeout=60000,
+        )
+
+        if capture:
+            await network.async_wait(page)
+            nodes = parse_payloads(await capture.collect_async())
+            capture.detach(page)
+            if nodes:
+                log_message(f"✅ [{index}] {len(nodes)} nódulos capturados da rede", "SUCCESS")
+                return nodes
+            log_message(f"⚠️ [{index}] Nenhuma questão nas respostas; usando extração via DOM", "WARNING")
+
+        if await click_tab(page, "Estatísticas"):
+            await async_wait_ready(page, "statistics")
+
+        if await click_tab(page, "Comentários de alunos"):
+            await async_wait_ready(page, "comments")
+        await scroll_all(page)
+        await network.async_wait(page)
+
+        if question_cache:
+            nodes = await extract_with_cache(page, question_cache)
+        else:
+            nodes = await extract_all_data_with_javascript(page)
+        log_message(f"✅ [{index}] {len(nodes)} nódulos extraídos de {url[:80]}", "SUCCESS")
+        return nodes
+    except Exception as e:
+        log_message(f"❌ [{index}] Erro ao processar URL: {e}", "ERROR")
+        try:
+            screenshot_path = f"error_url_{index}.png"
+            await page.screenshot(path=screenshot_path)
+            add_screenshot(screenshot_path)
+        except Exception:
+            pass
+        return None
+    finally:
+        if resource_filter:
+            log_message(f"🚫 [{index}] Requisições filtradas: {resource_filter.describe()}")
+        await page.close()
+
+async def scrape_urls(urls, storage_state=None, concurrency=None, mode=None, on_result=None,
+                      question_cache=None):
+    """
+    Processa as URLs concorrentemente em um único navegador.
+
+    Args:
+        urls: Lista de URLs a processar
+        storage_state: Estado de sessão retornado por context.storage_state()
+        concurrency: Máximo de páginas abertas ao mesmo tempo
+        mode: Modo de extração repassado a process_url
+        on_result: Callback (url, nodes) chamado a cada URL concluída com sucesso
+            (numa thread; precisa ser seguro entre threads, como Checkpoint.append)
+        question_cache: QuestionCache compartilhado entre as páginas
+
+    Returns:
+        Lista de nós na mesma ordem das URLs
+    """
+    concurrency = max(1, concurrency or SCRAPING_CONFIG["workers"])
+    semaphore = asyncio.Semaphore(concurrency)
+    total = len(urls)
+    done = 0
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(
+            headless=SCRAPING_CONFIG["headless"],
+            args=['--disable-blink-features=AutomationControlled']
+        )
+        context = await browser.new_context(
+            user_agent=SCRAPING_CONFIG["user_agent"],
+            storage_state=storage_state
+        )
+        await context.set_extra_http_headers({
+            "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
+        })
+
+        async def bounded(index, url):
+            nonlocal done
+            async with semaphore:
+                update_progress(done, total, url)
+                nodes = await process_url(context, url, index, mode, question_cache)
+                if nodes is not None and on_result:
+                    # on_result grava o checkpoint com fsync: fora do event loop
+                    await asyncio.to_thread(on_result, url, nodes)
+                done += 1
+                update_progress(done, total, url)
+                return nodes or []
+
+        try:
+            results = await asyncio.gather(
+                *(bounded(i, url) for i, url in enumerate(urls, 1))
+            )
+        finally:
+            await browser.close()
+
+    all_nodes = []
+    for nodes in results:
+        all_nodes.extend(nodes)
+    return all_nodes
+
+def run(urls, storage_state=None, concurrency=None, mode=None, on_result=None, question_cache=None):
+    """
+    Ponto de entrada síncrono para o motor assíncrono.
+    """
+    log_message(f"⚡ Motor assíncrono: {len(urls)} URLs, concorrência {concurrency}")
+    return asyncio.run(scrape_urls(urls, storage_state, concurrency, mode, on_result, question_cache))
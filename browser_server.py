@@ -0,0 +1,163 @@
+"""
+Navegador Chromium de longa duração para os jobs da interface web.
+
+Em vez de cada job abrir e fechar o Chromium, o processo web mantém um
+Chromium aquecido com a porta de depuração (CDP) aberta. Cada job conecta com
+connect_over_cdp e cria seus próprios contextos isolados; ao terminar, fecha
+só a conexão. Uma thread de monitoramento verifica a saúde do navegador e o
+reinicia automaticamente se ele cair.
+
+Com port=0 (padrão) o Chromium escolhe uma porta livre, lida do arquivo
+DevToolsActivePort do perfil, então cada processo (workers do gunicorn,
+scrape_worker.py) tem o seu navegador e nunca conecta ao de outro.
+"""
+
+import os
+import time
+import atexit
+import shutil
+import tempfile
+import threading
+import subprocess
+import urllib.request
+from config import BROWSER_SERVER_CONFIG, SCRAPING_CONFIG
+
+class SharedBrowser:
+    """
+    Gerencia um processo Chromium compartilhado exposto via CDP.
+    """
+
+    def __init__(self, port=None, headless=None, health_interval=None):
+        self.port = BROWSER_SERVER_CONFIG["port"] if port is None else port
+        self.headless = SCRAPING_CONFIG["headless"] if headless is None else headless
+        self.health_interval = health_interval or BROWSER_SERVER_CONFIG["health_interval"]
+        self.endpoint = f"http://127.0.0.1:{self.port}" if self.port else None
+        self.executable_path = None
+        self.restarts = 0
+        self._process = None
+        self._profile_dir = None
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._stopped = threading.Event()
+        atexit.register(self.stop)
+
+    def is_healthy(self, timeout=1):
+        """True se o processo está vivo e o endpoint CDP responde."""
+        if self._process is None or self._process.poll() is not None or self.endpoint is None:
+            return False
+        try:
+            with urllib.request.urlopen(f"{self.endpoint}/json/version", timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def _launch(self):
+        self._profile_dir = tempfile.mkdtemp(prefix="qc-browser-")
+        args = [
+            self.executable_path,
+            f"--remote-debugging-port={self.port}",
+            f"--user-data-dir={self._profile_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-blink-features=AutomationControlled",
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        if os.path.exists("/.dockerenv"):
+            args.append("--no-sandbox")
+        self._process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        if not self.port:
+            self.endpoint = None
+        deadline = time.time() + BROWSER_SERVER_CONFIG["startup_timeout"]
+        while time.time() < deadline:
+            if self.endpoint is None:
+                self.endpoint = self._read_active_port()
+            if self.is_healthy():
+                return
+            if self._process.poll() is not None:
+                break
+            time.sleep(0.1)
+        self._kill()
+        raise RuntimeError(f"Chromium compartilhado não respondeu em {self.endpoint or 'porta automática'}")
+
+    def _read_active_port(self):
+        """Endpoint da porta escolhida pelo Chromium (None enquanto ele não a grava)."""
+        try:
+            with open(os.path.join(self._profile_dir, "DevToolsActivePort"), encoding="utf-8") as f:
+                port = int(f.readline().strip())
+        except (OSError, ValueError):
+            return None
+        return f"http://127.0.0.1:{port}"
+
+    def _kill(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+    def ensure_running(self, playwright=None):
+        """
+        Garante que o Chromium está no ar, (re)iniciando se necessário.
+
+        Args:
+            playwright: Instância do sync_playwright, usada na primeira vez para
+                descobrir o executável do Chromium instalado pelo Playwright
+        """
+        with self._lock:
+            if self.is_healthy():
+                return
+            if self.executable_path is None:
+                if playwright is None:
+                    raise RuntimeError("Executável do Chromium desconhecido; passe a instância do Playwright")
+                self.executable_path = playwright.chromium.executable_path
+            if self._process is not None:
+                self.restarts += 1
+            self._kill()
+            self._launch()
+            self._start_monitor()
+
+    def connect(self, playwright):
+        """
+        Conecta ao Chromium compartilhado.
+
+        Returns:
+            Browser conectado via CDP; browser.close() apenas desconecta
+        """
+        self.ensure_running(playwright)
+        return playwright.chromium.connect_over_cdp(self.endpoint)
+
+    def _start_monitor(self):
+        if self._monitor is not None and self._monitor.is_alive():
+            return
+        self._monitor = threading.Thread(target=self._watch, name="shared-browser-health", daemon=True)
+        self._monitor.start()
+
+    def _watch(self):
+        while not self._stopped.wait(self.health_interval):
+            if not self.is_healthy():
+                try:
+                    self.ensure_running()
+                except Exception:
+                    pass
+
+    def status(self):
+        """Resumo para o endpoint de saúde."""
+        return {
+            "endpoint": self.endpoint,
+            "healthy": self.is_healthy(),
+            "pid": self._process.pid if self._process is not None else None,
+            "restarts": self.restarts,
+        }
+
+    def stop(self):
+        """Encerra o monitoramento e o processo do Chromium."""
+        self._stopped.set()
+        with self._lock:
+            self._kill()
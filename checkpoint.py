@@ -0,0 +1,136 @@
+"""
+Checkpoint em disco dos resultados do scraping.
+
+Cada URL concluída é gravada imediatamente como um registro binário (url +
+questões serializadas com models.pack_questions, comprimido com zlib) com
+flush e fsync, então uma queda no meio da execução perde no máximo a URL em
+andamento. Com --resume o scraper pula as URLs já presentes no checkpoint e
+monta o arquivo final a partir dele.
+
+Formato de cada registro: tamanho (4 bytes, big-endian) + zlib(tamanho da
+url + url + questões).
+"""
+
+import os
+import zlib
+import struct
+import threading
+from models import pack_questions, unpack_questions
+
+_U32 = struct.Struct(">I")
+
+class Checkpoint:
+    """
+    Arquivo binário append-only com o resultado de cada URL.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._repaired = False
+
+    def _frames(self, f):
+        """
+        Percorre os registros do arquivo aberto.
+
+        Yields:
+            (offset, fim, url, questões serializadas) de cada registro íntegro.
+            Um registro truncado ou corrompido (queda durante a escrita) encerra
+            a leitura.
+        """
+        offset = f.tell()
+        while True:
+            header = f.read(4)
+            if len(header) < 4:
+                return
+            size = _U32.unpack(header)[0]
+            data = f.read(size)
+            if len(data) < size:
+                return
+            try:
+                payload = zlib.decompress(data)
+            except zlib.error:
+                return
+            url_size = _U32.unpack_from(payload)[0]
+            url = payload[4:4 + url_size].decode("utf-8")
+            end = offset + 4 + size
+            yield offset, end, url, payload[4 + url_size:]
+            offset = end
+
+    def load(self):
+        """
+        Lê o checkpoint.
+
+        Returns:
+            Dicionário url -> lista de Question
+        """
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, "rb") as f:
+            for _, _, url, questions in self._frames(f):
+                try:
+                    completed[url] = unpack_questions(questions)
+                except ValueError:
+                    continue
+        return completed
+
+    def append(self, url, questions):
+        """
+        Grava o resultado de uma URL de forma durável (seguro entre threads).
+        """
+        raw_url = url.encode("utf-8")
+        data = zlib.compress(_U32.pack(len(raw_url)) + raw_url + pack_questions(questions))
+        with self._lock:
+            self._repair()
+            with open(self.path, "ab") as f:
+                f.write(_U32.pack(len(data)) + data)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _repair(self):
+        """
+        Antes da primeira gravação, corta o lixo deixado por uma queda no fim
+        do arquivo; senão os registros novos ficariam depois dele e a leitura
+        (que para no primeiro registro inválido) nunca os alcançaria.
+        """
+        if self._repaired:
+            return
+        self._repaired = True
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r+b") as f:
+            end = 0
+            for _, end, _, _ in self._frames(f):
+                pass
+            if end < os.fstat(f.fileno()).st_size:
+                f.truncate(end)
+                os.fsync(f.fileno())
+
+    def reset(self):
+        """Descarta o checkpoint anterior (execução nova, sem --resume)."""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._repaired = True
+
+    def iter_questions(self, urls):
+        """
+        Gera as questões do checkpoint na ordem das URLs, lendo uma URL por vez.
+
+        Só os offsets dos registros ficam em memória, então o consumo não
+        cresce com o número de questões (usado pelo FreeplaneWriter).
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            offsets = {url: offset for offset, _, url, _ in self._frames(f)}
+            for url in urls:
+                if url not in offsets:
+                    continue
+                f.seek(offsets[url])
+                _, _, _, questions = next(self._frames(f))
+                try:
+                    yield from unpack_questions(questions)
+                except ValueError:
+                    continue
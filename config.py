@@ -5,6 +5,7 @@ Configurações centralizadas para o QConcursos Scraper.
 
 # URLs
 LOGIN_URL = "https://www.qconcursos.com/conta/entrar?return_url=https%3A%2F%2Fapp.qconcursos.com%2F"
+DASHBOARD_URL = "https://app.qconcursos.com/b/dashboard"  # Página que exige login (validação de sessão)
 
 # Seletores CSS - Atualize se o site mudar
 SEL = {
@@ -15,6 +16,7 @@ SEL = {
     "card": ".mb-4",
     "statsAttr": "[data-question-statistics-alternatives-statistics]",
     "num": ".index.text-center.font-weight-bold.border-right.pr-2.svelte-1i1uol",
+    "code": ".pl-2.font-size-1",  # Código da questão ("Q3437098"), irmão do número
     "title": ".title",
     "info": ".info.d-flex.flex-wrap.align-items-center.svelte-1i1uol",
     "statement": ".font-size-2.statement-container.svelte-18f2a5m",
@@ -33,22 +35,152 @@ IS_DOCKER = os.path.exists('/.dockerenv') or os.environ.get('container') == 'doc
 SCRAPING_CONFIG = {
     "headless": IS_DOCKER,      # True para Docker, False para debug local
     "timeout": 30000,           # Timeout de login em ms - aumentado para debug
-    "scroll_step": 1200,        # Pixels por rolagem - reduzido para ser mais suave
-    "scroll_pause": 0.8,        # Pausa entre rolagens - aumentado para dar mais tempo
-    "scroll_max_iter": 60,      # Máximo de iterações de rolagem - aumentado para carregar tudo
-    "url_pause": 3,             # Pausa entre URLs - aumentado para estabilidade
+    "scroll_quiet_ms": 500,     # Janela sem mutações no DOM que encerra o scroll
+    "scroll_timeout": 20000,    # Limite total (ms) do scroll até estabilizar
+    "scroll_max_iter": 60,      # Máximo de saltos para o fim da página
+    "ready_timeout": 15000,     # Limite (ms) das esperas por condição (abas, estatísticas)
+    "comments_timeout": 3000,   # Limite (ms) da espera pelo 1º comentário; páginas sem comentários não têm o que esperar
+    "network_idle_ms": 500,     # Janela sem requisições em andamento que indica rede ociosa
+    "network_idle_timeout": 5000,  # Limite (ms) da espera por rede ociosa
+    "expand_pagination": False, # Expande cada filtro em todas as páginas (--expand-pages)
+    "max_per_page": 50,         # Maior per_page aceito pelo site ao expandir filtros
+    "page_param": "page",       # Nome do parâmetro de página nas URLs de filtro
+    "workers": 1,               # Páginas processando URLs em paralelo (--workers N)
+    "extraction_mode": "dom",   # "dom" (abas + scroll + JS) ou "network" (captura do JSON da API)
+    "question_cache": True,     # Reaproveita questões já extraídas (--no-cache desativa)
+    "engine": "sync",           # Motor de scraping: "sync" (threads) ou "async" (asyncio)
+    "resource_filter": True,    # Aborta recursos que o scraper não usa (imagens, fontes, analytics)
+    "blocked_resource_types": ["image", "font", "media"],
+    "blocked_hosts": [          # Padrões fnmatch de hosts de terceiros bloqueados
+        "*google-analytics.com",
+        "*googletagmanager.com",
+        "*doubleclick.net",
+        "*facebook.net",
+        "*facebook.com",
+        "*hotjar.com",
+        "*clarity.ms",
+    ],
+    "blocked_bytes_estimate": {  # Tamanho médio (bytes) usado para estimar a economia por tipo
+        "image": 40000,
+        "font": 35000,
+        "media": 500000,
+        "script": 60000,
+        "other": 5000,
+    },
     "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",  # User agent realista
 }
 
+# Extração por captura de respostas JSON (--mode network)
+CAPTURE_CONFIG = {
+    "url_patterns": [           # URLs (fnmatch) de respostas XHR/fetch guardadas
+        "*/questions*",
+        "*/questoes*",
+        "*statistics*",
+        "*comments*",
+        "*comentarios*",
+    ],
+    "fields": {                 # Nomes de campo aceitos para cada informação, em ordem de preferência
+        "id": ["id", "question_id"],
+        "question_id": ["question_id", "questionId"],
+        "number": ["number", "code", "index"],
+        "statement": ["statement", "enunciado"],
+        "answer": ["correct_alternative", "answer", "gabarito"],
+        "statistics": ["alternatives_statistics", "statistics"],
+        "alternatives": ["alternatives", "alternativas"],
+        "comments": ["comments", "comentarios"],
+        "comment": ["body", "text", "comment"],
+        "title": ["discipline", "subject", "title"],
+        "info": ["year", "examining_board", "institute", "exam", "role"],
+    },
+}
+
+# Navegador compartilhado da interface web (Chromium aquecido acessado via CDP)
+BROWSER_SERVER_CONFIG = {
+    "enabled": True,            # False volta a abrir um Chromium novo por job
+    "port": 0,                  # Porta de depuração remota; 0 = livre, uma por processo (seguro com vários workers)
+    "health_interval": 30,      # Segundos entre verificações de saúde
+    "startup_timeout": 15,      # Segundos aguardando o Chromium responder ao iniciar
+}
+
 # Configurações de output
 OUTPUT_CONFIG = {
     "output_dir": "output",
     "filename": "qc_freeplane.mm",
+    "bank_file": "questions.sqlite3",  # Banco de questões com busca FTS5 (question_bank.py)
+    "question_bank": True,      # Gravar também no banco de questões
+    "cache_file": "question_cache.sqlite3",  # Cache de questões por número + hash do conteúdo
+    "checkpoint_file": "checkpoint.bin",  # Resultado de cada URL concluída (--resume)
+    "session_file": "session",  # storage_state salvo (compartilhado com a interface web)
     "encoding": "utf-8",
+    "render_chunk_size": 2000,  # Nós por bloco no build_freeplane
+    "render_parallel_threshold": 20000,  # A partir daqui os blocos vão para um pool de processos
     "highlight_wrong": True,    # Destacar questões erradas
     "highlight_color": "#ffcccc"  # Cor para questões erradas
 }
 
+# Log da interface web (log_writer.py)
+LOG_CONFIG = {
+    "path": "logs/scraper.log",
+    "format": "text",           # "text" ou "json" (uma linha JSON por mensagem)
+    "flush_interval": 0.5,      # Segundos máximos que uma linha fica no buffer
+    "batch_size": 200,          # Grava antes se o lote atingir este número de linhas
+    "max_bytes": 5 * 1024 * 1024,  # Rotaciona ao passar deste tamanho
+    "backups": 3,               # Arquivos antigos mantidos (scraper.log.1, .2, ...)
+    "tail_max_bytes": 256 * 1024  # Máximo devolvido por chamada de /log_tail
+}
+
+# Atualizações em tempo real do monitor (live_updates.py)
+LIVE_CONFIG = {
+    "socketio": True,           # Usa Flask-SocketIO se instalado; senão só SSE (/events)
+    "history": 1000,            # Linhas de log reenviadas a quem reconecta
+    "subscriber_queue": 1000,   # Eventos pendentes por cliente SSE antes de descartar
+    "keepalive": 15             # Segundos entre comentários de keep-alive no SSE
+}
+
+# Barramento de eventos scraper -> interface web (event_bus.py)
+EVENT_BUS_CONFIG = {
+    "redis_url": "redis://localhost:6379/0",  # Sobrescrito pela variável REDIS_URL
+    "channel": "qc:events",
+    "flush_interval": 0.1,      # Segundos máximos que um evento espera pelo lote
+    "batch_size": 100,          # Envia antes se o lote atingir este número de eventos
+    "retry_interval": 30        # Segundos até tentar o Redis de novo após uma falha
+}
+
+# Fila de jobs da interface web (job_queue.py / scrape_worker.py)
+JOB_QUEUE_CONFIG = {
+    "enabled": os.environ.get("QC_JOB_QUEUE") == "1",  # Senão /start_scraping roda o job numa thread
+    "backend": os.environ.get("QC_JOB_BACKEND", "auto"),  # "redis", "sqlite" ou "auto"
+    "redis_prefix": "qc:jobs",
+    "sqlite_file": "jobs.sqlite3",  # Em output_dir, quando não há Redis
+    "max_pending": 20,          # /start_scraping recusa novos jobs acima disso
+    "poll_interval": 1.0,       # Segundos entre consultas da fila SQLite
+    "max_attempts": 3,          # Execuções de um job interrompidas por queda do worker antes de desistir
+    "workers": 2                # Processos padrão do scrape_worker.py
+}
+
+# Registro de jobs da interface web (job_registry.py)
+JOB_REGISTRY_CONFIG = {
+    "file": "job_registry.sqlite3",  # Em output_dir, compartilhado por todos os processos
+    "keep": 100                 # Jobs finalizados mantidos (com log e mapa); os mais antigos são apagados
+}
+
+# Limite adaptativo de navegações por host (rate_limiter.py), no lugar da pausa fixa entre URLs
+RATE_LIMIT_CONFIG = {
+    "enabled": True,
+    "file": "rate_limits.sqlite3",  # Em output_dir, compartilhado por todos os processos
+    "initial_rate": 0.5,        # Navegações/s de um host ainda sem histórico
+    "min_rate": 1 / 30,         # Piso após quedas seguidas (uma navegação a cada 30s)
+    "max_rate": 2.0,            # Teto ao subir a taxa
+    "burst": 2,                 # Navegações seguidas permitidas sem espera
+    "ramp_after": 3,            # Navegações saudáveis seguidas antes de subir a taxa
+    "ramp_step": 0.1,           # Aumento da taxa (navegações/s) a cada subida
+    "backoff": 0.5,             # Fator aplicado em 429/5xx/redirecionamento ao login
+    "slow_factor": 0.8,         # Fator aplicado em navegações lentas
+    "slow_navigation": 15,      # Segundos de page.goto considerados lentos
+    "cooldown": 30,             # Pausa (s) após 429/503 sem Retry-After ou redirecionamento ao login
+    "decrease_interval": 5      # Quedas dentro deste intervalo (s) contam uma vez
+}
+
 # Configurações de debug
 DEBUG_CONFIG = {
     "screenshot_on_error": True,
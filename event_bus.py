@@ -0,0 +1,216 @@
+"""
+Barramento de eventos entre o scraper e a interface web.
+
+O scraper (CLI ou container "scraper") publica log, progresso, screenshots e
+status pelo WebSocketLogHandler. Os eventos entram numa fila em memória e uma
+thread os envia em lotes (a cada flush_interval ou batch_size eventos), então
+o loop de scraping nunca espera por rede.
+
+Com o Redis do docker-compose disponível, cada lote vai para um canal
+pub/sub e qualquer processo da interface web recebe os eventos de qualquer
+scraper. Sem Redis (ou com ele fora do ar), os lotes são entregues só aos
+ouvintes do próprio processo, e a conexão é tentada de novo depois de
+retry_interval segundos.
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+from config import EVENT_BUS_CONFIG
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+_FLUSH = object()
+
+class EventBus:
+    """
+    Publica lotes de eventos no Redis (se houver) e nos ouvintes locais.
+    """
+
+    def __init__(self, url=None, channel=None, flush_interval=None, batch_size=None):
+        self.url = url or os.environ.get("REDIS_URL") or EVENT_BUS_CONFIG["redis_url"]
+        self.channel = channel or EVENT_BUS_CONFIG["channel"]
+        self.flush_interval = flush_interval or EVENT_BUS_CONFIG["flush_interval"]
+        self.batch_size = batch_size or EVENT_BUS_CONFIG["batch_size"]
+        self.host = os.uname().nodename if hasattr(os, "uname") else "local"
+        self._queue = queue.SimpleQueue()
+        self._listeners = []
+        self._subscribers = []
+        self._client = None
+        self._retry_at = 0
+        self._thread = None
+        self._listener = None
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    @property
+    def source(self):
+        """Identifica este processo; calculado a cada uso porque muda depois de um fork."""
+        return f"{self.host}:{os.getpid()}"
+
+    def _after_fork(self):
+        # Threads e conexões do processo pai não existem no filho (preload_app do gunicorn)
+        self._client = None
+        self._retry_at = 0
+        self._lock = threading.Lock()
+
+    def publish(self, event, data):
+        """Enfileira um evento (não bloqueia)."""
+        self._ensure_thread()
+        self._queue.put((event, data))
+
+    def flush(self, timeout=2):
+        """Espera os eventos já enfileirados serem entregues."""
+        self._ensure_thread()
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait(timeout)
+
+    def add_listener(self, callback):
+        """
+        Registra um ouvinte local: callback(events) recebe cada lote publicado
+        por este processo, como lista de (evento, dados).
+        """
+        self._listeners.append(callback)
+
+    def subscribe(self, callback):
+        """
+        Recebe os lotes publicados por outros processos via Redis.
+
+        A thread de assinatura é (re)criada sob demanda por ensure_subscribed(),
+        então continua valendo em processos criados por fork depois desta chamada.
+
+        Returns:
+            Thread de assinatura, ou None se o Redis não estiver disponível
+        """
+        if redis is None:
+            return None
+        self._subscribers.append(callback)
+        return self.ensure_subscribed()
+
+    def ensure_subscribed(self):
+        """Garante que a thread de assinatura está rodando neste processo."""
+        if redis is None or not self._subscribers:
+            return None
+        if self._listener is None or not self._listener.is_alive():
+            with self._lock:
+                if self._listener is None or not self._listener.is_alive():
+                    self._listener = threading.Thread(target=self._listen, name="event-bus-subscriber", daemon=True)
+                    self._listener.start()
+        return self._listener
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-bus", daemon=True)
+                self._thread.start()
+
+    def _redis(self):
+        """Cliente Redis, ou None enquanto estiver indisponível."""
+        if redis is None:
+            return None
+        if self._client is None and time.monotonic() >= self._retry_at:
+            try:
+                client = redis.Redis.from_url(self.url, socket_connect_timeout=1, socket_timeout=2)
+                client.ping()
+                self._client = client
+            except redis.RedisError:
+                self._retry_at = time.monotonic() + EVENT_BUS_CONFIG["retry_interval"]
+        return self._client
+
+    def _deliver(self, events):
+        if not events:
+            return
+        for callback in self._listeners:
+            try:
+                callback(events)
+            except Exception as e:
+                print(f"[ERROR] Ouvinte do barramento falhou: {e}")
+        client = self._redis()
+        if client is not None:
+            try:
+                client.publish(self.channel, json.dumps({"source": self.source, "events": events}, ensure_ascii=False))
+            except redis.RedisError:
+                self._client = None
+                self._retry_at = time.monotonic() + EVENT_BUS_CONFIG["retry_interval"]
+
+    def _run(self):
+        events = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                event, data = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._deliver(events)
+                events, deadline = [], None
+                continue
+            if event is _FLUSH:
+                self._deliver(events)
+                events, deadline = [], None
+                data.set()
+                continue
+            events.append((event, data))
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            if len(events) >= self.batch_size:
+                self._deliver(events)
+                events, deadline = [], None
+
+    def _listen(self):
+        while True:
+            try:
+                client = redis.Redis.from_url(self.url, socket_connect_timeout=1)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    try:
+                        batch = json.loads(message["data"])
+                    except (ValueError, TypeError):
+                        continue
+                    # Lotes deste processo já foram entregues aos ouvintes locais
+                    if batch.get("source") == self.source:
+                        continue
+                    events = [tuple(item) for item in batch.get("events", [])]
+                    for callback in list(self._subscribers):
+                        try:
+                            callback(events)
+                        except Exception as e:
+                            print(f"[ERROR] Assinante do barramento falhou: {e}")
+            except redis.RedisError:
+                time.sleep(EVENT_BUS_CONFIG["retry_interval"])
+
+# Barramento do processo (compartilhado por scraper e interface web)
+bus = EventBus()
+
+class WebSocketLogHandler:
+    """
+    Ponte do scraper para o monitor web: cada chamada vira um evento no barramento.
+    """
+
+    @classmethod
+    def log(cls, message, level="INFO"):
+        bus.publish("log", {"level": level, "message": message, "ts": time.time()})
+
+    @classmethod
+    def update_progress(cls, processed, total, current_url=""):
+        bus.publish("progress", {"processed": processed, "total": total, "url": current_url})
+
+    @classmethod
+    def add_screenshot(cls, filename):
+        bus.publish("screenshot", {"filename": filename})
+
+    @classmethod
+    def set_running(cls, running, error=None):
+        bus.publish("status", {"running": running, "completed": not running and error is None, "error": error})
+        if not running:
+            # Fim da execução: entrega o que falta antes de o processo sair
+            bus.flush()
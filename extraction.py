@@ -0,0 +1,94 @@
+"""
+Extração estruturada das questões em uma única ida ao navegador.
+
+Um só page.evaluate percorre os cards e devolve, para cada questão, um
+registro com número, código, gabarito, título, info, enunciado, alternativas,
+comentários, badge e extras, convertido em models.Question. A montagem do XML
+do Freeplane acontece em Python (freeplane.render_question_node), fora da
+thread principal da página.
+"""
+
+from config import SEL
+from models import Question
+
+# Registros por questão. O gabarito vem do atributo de estatísticas ou, se a
+# aba já foi trocada, do que STATS_READY_JS guardou em window.__qcGabaritos.
+EXTRACT_QUESTIONS_JS = """
+({sel, skip}) => {
+    const gabaritos = window.__qcGabaritos || {};
+    const pular = new Set(skip || []);
+    const html = (els) => Array.from(els).map(el => el.outerHTML.trim());
+    const records = [];
+
+    document.querySelectorAll(sel.card).forEach(card => {
+        const num = card.querySelector(sel.num);
+        const numero = num ? num.textContent.trim() : "";
+        // O código ("Q3437098") fica ao lado do número, que é só a posição na página
+        const code = (num && num.parentElement.querySelector(sel.code)) || card.querySelector(sel.code);
+        const codigo = code ? code.textContent.trim() : "";
+        // Questões já presentes no cache não são serializadas de novo
+        if (codigo && pular.has(codigo)) return;
+
+        let gabarito = "";
+        try {
+            const statsEl = card.querySelector(sel.statsAttr);
+            if (statsEl) {
+                const stats = JSON.parse(statsEl.getAttribute("data-question-statistics-alternatives-statistics"));
+                const correct = stats.find(item => item.hit > 0);
+                if (correct) gabarito = "" + correct.id;
+            }
+        } catch (error) {
+            console.error('Erro ao extrair estatística:', error);
+        }
+        gabarito = gabarito || gabaritos[numero] || "";
+
+        const title = card.querySelector(sel.title);
+        const titulo = title ? title.textContent.trim() : "";
+        const info = card.querySelector(sel.info);
+        let infoText = info ? info.textContent.trim().replace(/\\s+/g, " ") : "";
+        if (infoText.includes(titulo)) infoText = infoText.replace(titulo, "").trim();
+
+        const statement = card.querySelector(sel.statement);
+        const badge = card.querySelector(sel.badge);
+
+        records.push({
+            numero: numero,
+            codigo: codigo,
+            gabarito: gabarito,
+            titulo: titulo,
+            info: infoText,
+            enunciado: statement ? statement.innerHTML.trim().replace(/\\n/g, " ") : "",
+            alternativas: html(card.querySelectorAll(sel.alt)),
+            comentarios: html(card.querySelectorAll(sel.commentText)),
+            badge: badge ? badge.outerHTML.trim() : "",
+            extras: Array.from(card.querySelectorAll(sel.extra)).map(el => el.outerHTML.replace('<div class="text px-3.font-size-2 svelte-1tiqrp1">', '<div class="text px-3 font-size-2 svelte-1tiqrp1">&#9830 '))
+        });
+    });
+    return records;
+}
+"""
+
+def extract_questions(page, skip=None):
+    """
+    Lê as questões da página em um único page.evaluate.
+
+    Args:
+        page: Página do Playwright (síncrona)
+        skip: Códigos de questões a não extrair (já presentes no cache)
+
+    Returns:
+        Lista de registros por questão (ver EXTRACT_QUESTIONS_JS)
+    """
+    return page.evaluate(EXTRACT_QUESTIONS_JS, {"sel": SEL, "skip": list(skip or [])})
+
+async def async_extract_questions(page, skip=None):
+    """Versão assíncrona de extract_questions."""
+    return await page.evaluate(EXTRACT_QUESTIONS_JS, {"sel": SEL, "skip": list(skip or [])})
+
+def to_questions(records):
+    """
+    Converte os registros em Question, ordenadas por gabarito.
+    """
+    questions = [Question.from_record(record) for record in records]
+    questions.sort(key=lambda q: q.gabarito)
+    return questions
@@ -1,32 +1,129 @@
 # freeplane.py
-from typing import List, Dict
-import random
+from typing import List, Dict, Iterable, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+import os
+import re
+import gzip
+import shutil
+import hashlib
+import tempfile
 import time
+from config import OUTPUT_CONFIG
+from models import Question
 
-def generate_id():
-    """Gera um ID único para os nós do Freeplane"""
-    return f"ID_{random.randint(100000000, 999999999)}"
+COMMENT_DIV = '<div class="question-commentary-text font-size-2">'
 
-def generate_timestamp():
-    """Gera timestamp para os nós"""
-    return str(int(time.time() * 1000))
-
-def build_freeplane(nodes: List[Dict[str, str]]) -> str:
+def render_question_node(q: Question) -> str:
     """
-    Constrói o XML no formato Freeplane moderno (.mm) a partir dos nós extraídos.
-    
+    Renderiza uma questão no nó Freeplane usado pelo scraper.
+
+    Produz exatamente o mesmo XML que o script de extração do bookmarklet
+    montava dentro do navegador.
+
     Args:
-        nodes: Lista de dicionários contendo os dados dos nós
-        
+        q: Questão (models.Question)
+
     Returns:
-        String XML formatada para Freeplane (.mm)
+        XML do nó
+    """
+    comentarios = [c.html for c in q.comentarios]
+
+    note = " ".join(comentarios) + " ".join(q.alternativas)
+    note = note.replace(COMMENT_DIV, COMMENT_DIV + "<p>------------</p>", 1)
+
+    first_comment = ""
+    if comentarios:
+        first_comment = f'<node MAX_WIDTH="40 cm"><richcontent TYPE="NODE"><html><head></head><body>{comentarios[0]}</body></html></richcontent></node>'
+
+    style = ""
+    if OUTPUT_CONFIG["highlight_wrong"] and q.gabarito == "E":
+        style = f' style="background-color: {OUTPUT_CONFIG["highlight_color"]};"'
+    header = " | ".join(part for part in (q.numero, q.gabarito, q.titulo, q.info) if part)
+    text = f'<span{style}>{header}</span><br>{q.enunciado}'
+
+    extras = "".join(q.extras)
+    extras_node = f'<node><richcontent TYPE="NODE"><html><head></head><body>{extras}</body></html></richcontent></node>' if extras else ""
+
+    return (
+        f'<node MAX_WIDTH="40 cm"><richcontent TYPE="NODE"><html><head></head><body>{text}</body></html></richcontent>'
+        f'<richcontent TYPE="NOTE" CONTENT-TYPE="xml/"><html><head></head><body>{note} | {q.badge}</body></html></richcontent>'
+        f'{extras_node}{first_comment}</node>'
+    )
+
+MAP_HEADER = '<map version="freeplane 1.9.8"><node LOCALIZED_TEXT="new_mindmap">'
+MAP_FOOTER = '</node></map>'
+
+class FreeplaneWriter:
     """
-    nodes_sorted = sorted(nodes, key=lambda x: x.get("gab", ""))
-    
-    # Cabeçalho moderno do Freeplane
-    xml = '''<map version="freeplane 1.12.1">
+    Escreve o mapa (.mm) em streaming: cabeçalho, cada questão renderizada
+    assim que é produzida e rodapé, direto no disco.
+
+    O conteúdo vai para um arquivo temporário no mesmo diretório, que só
+    substitui o destino (os.replace) ao final sem erros e com ao menos um nó.
+    Um mapa anterior nunca fica pela metade.
+
+    Uso:
+        with FreeplaneWriter(path) as writer:
+            for question in questions:
+                writer.write(question)
+    """
+
+    def __init__(self, path, encoding=None):
+        self.path = str(path)
+        self.encoding = encoding or OUTPUT_CONFIG["encoding"]
+        self.count = 0
+        self._file = None
+        self._tmp_path = None
+
+    def open(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(prefix=".mm-", suffix=".tmp", dir=directory)
+        self._file = os.fdopen(fd, "w", encoding=self.encoding)
+        self._file.write(MAP_HEADER)
+        return self
+
+    def write(self, question: Question):
+        """Renderiza e acrescenta uma questão ao mapa."""
+        self._file.write(render_question_node(question))
+        self.count += 1
+
+    def write_all(self, questions: Iterable[Question]):
+        for question in questions:
+            self.write(question)
+
+    def commit(self):
+        """Fecha o mapa e o move atomicamente para o destino."""
+        self._file.write(MAP_FOOTER)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+        self._tmp_path = None
+
+    def discard(self):
+        """Descarta o arquivo temporário sem tocar no destino."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._tmp_path and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+        self._tmp_path = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None and self.count:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+_MAP_HEADER_TEMPLATE = '''<map version="freeplane 1.12.1">
 <!--To view this file, download free mind mapping software Freeplane from https://www.freeplane.org -->
-<node TEXT="QConcursos - Questões" FOLDED="false" ID="''' + generate_id() + '''" CREATED="''' + generate_timestamp() + '''" MODIFIED="''' + generate_timestamp() + '''" STYLE="oval">
+<node TEXT="QConcursos - Questões" FOLDED="false" ID="{root_id}" CREATED="{ts}" MODIFIED="{ts}" STYLE="oval">
 <font SIZE="18"/>
 <hook NAME="MapStyle">
     <properties edgeColorConfiguration="#808080ff,#ff0000ff,#0000ffff,#00ff00ff,#ff00ffff,#00ffffff,#7c0000ff,#00007cff,#007c00ff,#7c007cff,#007c7cff,#7c7c00ff" fit_to_viewport="false" show_icons="BESIDE_NODES" associatedTemplateLocation="template:/standard-1.6.mm" show_tags="UNDER_NODES" showTagCategories="false" show_icon_for_attributes="true" show_note_icons="true"/>
@@ -102,71 +199,123 @@ def build_freeplane(nodes: List[Dict[str, str]]) -> str:
 <hook NAME="AutomaticEdgeColor" COUNTER="6" RULE="ON_BRANCH_CREATION"/>
 '''
 
-    # Cores para as bordas dos nós
-    colors = ["#ff0000", "#0000ff", "#00ff00", "#ff00ff", "#00ffff", "#7c0000"]
-    
-    # Adiciona cada questão como um nó filho
-    for i, node in enumerate(nodes_sorted):
-        if node.get("html"):
-            # Extrai o texto principal do HTML para usar como TEXT
-            html_content = node["html"]
-            
-            # Extrai texto entre as tags de richcontent NODE
-            start_marker = '<span>'
-            end_marker = '</span><br>'
-            
-            if start_marker in html_content and end_marker in html_content:
-                text_start = html_content.find(start_marker) + len(start_marker)
-                text_end = html_content.find(end_marker, text_start)
-                node_text = html_content[text_start:text_end] if text_end > text_start else f"Questão {i+1}"
-            else:
-                node_text = f"Questão {i+1}"
-            
-            # Escapa caracteres especiais para XML
-            node_text = node_text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
-            
-            # Extrai nota/comentário do HTML
-            note_start = '<richcontent TYPE="NOTE"'
-            note_end = '</richcontent>'
-            note_content = ""
-            
-            if note_start in html_content and note_end in html_content:
-                note_begin = html_content.find(note_start)
-                note_finish = html_content.find(note_end, note_begin) + len(note_end)
-                note_section = html_content[note_begin:note_finish]
-                
-                # Extrai o conteúdo da nota
-                body_start = note_section.find('<body>') + 6
-                body_end = note_section.find('</body>')
-                if body_start > 5 and body_end > body_start:
-                    note_content = note_section[body_start:body_end].strip()
-            
-            # Gera o nó moderno do Freeplane
-            color = colors[i % len(colors)]
-            created_time = generate_timestamp()
-            modified_time = generate_timestamp()
-            node_id = generate_id()
-            
-            xml += f'''<node TEXT="{node_text}" POSITION="bottom_or_right" ID="{node_id}" CREATED="{created_time}" MODIFIED="{modified_time}">
-<edge COLOR="{color}"/>'''
-            
-            # Adiciona nota se existir
-            if note_content:
-                xml += f'''
-<richcontent TYPE="NOTE">
-<html>
-  <head>
-    
-  </head>
-  <body>
-    <p>
-      {note_content}
-    </p>
-  </body>
-</html>
-</richcontent>'''
-            
-            xml += '</node>\n'
-    
-    xml += '</node>\n</map>\n'
-    return xml 
\ No newline at end of file
+# Cores para as bordas dos nós
+EDGE_COLORS = ("#ff0000", "#0000ff", "#00ff00", "#ff00ff", "#00ffff", "#7c0000")
+
+# Uma única varredura do HTML do nó: texto do <span> do cabeçalho e corpo da nota
+_NODE_PARTS_RE = re.compile(
+    r'<span[^>]*>(?P<text>.*?)</span><br>'
+    r'|<richcontent TYPE="NOTE"[^>]*>.*?<body>(?P<note>.*?)</body>',
+    re.S,
+)
+
+_XML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+def stable_id(*parts) -> str:
+    """
+    ID determinístico para o Freeplane: hash (blake2b) do conteúdo do nó.
+
+    O mesmo conteúdo na mesma posição gera sempre o mesmo ID, então duas
+    renderizações da mesma entrada produzem arquivos idênticos.
+    """
+    digest = hashlib.blake2b("\x00".join(map(str, parts)).encode("utf-8"), digest_size=6).digest()
+    return f"ID_{int.from_bytes(digest, 'big')}"
+
+def _render_node(index: int, html_content: str, timestamp: str) -> str:
+    text = note = None
+    for match in _NODE_PARTS_RE.finditer(html_content):
+        if text is None and match.group("text") is not None:
+            text = match.group("text")
+        elif note is None and match.group("note") is not None:
+            note = match.group("note").strip()
+        if text is not None and note is not None:
+            break
+    node_text = (text or f"Questão {index + 1}").translate(_XML_ESCAPE)
+
+    parts = [
+        f'<node TEXT="{node_text}" POSITION="bottom_or_right" ID="{stable_id(index, html_content)}" '
+        f'CREATED="{timestamp}" MODIFIED="{timestamp}">\n<edge COLOR="{EDGE_COLORS[index % len(EDGE_COLORS)]}"/>'
+    ]
+    if note:
+        parts.append(
+            f'\n<richcontent TYPE="NOTE">\n<html>\n  <head>\n    \n  </head>\n  <body>\n'
+            f'    <p>\n      {note}\n    </p>\n  </body>\n</html>\n</richcontent>'
+        )
+    parts.append('</node>\n')
+    return "".join(parts)
+
+def _render_chunk(args) -> str:
+    """Renderiza um bloco de nós (executado nos processos do pool)."""
+    start, htmls, timestamp = args
+    return "".join(_render_node(start + i, html_content, timestamp) for i, html_content in enumerate(htmls))
+
+def write_gzip_copy(path, compresslevel=6):
+    """
+    Gera (ou atualiza) path + ".gz" a partir do mapa, em streaming.
+
+    Só recomprime se o .gz não existe ou é mais antigo que o mapa; a troca é
+    atômica (arquivo temporário + os.replace).
+
+    Returns:
+        Caminho do .gz
+    """
+    path = str(path)
+    gz_path = path + ".gz"
+    if os.path.exists(gz_path) and os.path.getmtime(gz_path) >= os.path.getmtime(path):
+        return gz_path
+    fd, tmp_path = tempfile.mkstemp(prefix=".mm-", suffix=".gz.tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with open(path, "rb") as src, os.fdopen(fd, "wb") as raw:
+            # mtime=0: o mesmo mapa gera sempre o mesmo .gz (e o mesmo ETag)
+            with gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=compresslevel, mtime=0) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp_path, gz_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return gz_path
+
+def build_freeplane(nodes: List[Union[Question, Dict[str, str]]], timestamp: Optional[int] = None,
+                    workers: Optional[int] = None, chunk_size: Optional[int] = None) -> str:
+    """
+    Constrói o XML no formato Freeplane moderno (.mm) a partir dos nós extraídos.
+
+    A saída é reproduzível: IDs vêm de stable_id() e todos os nós usam o
+    mesmo timestamp. Acima de OUTPUT_CONFIG["render_parallel_threshold"] nós,
+    blocos de chunk_size nós são renderizados em um pool de processos e
+    concatenados na ordem original.
+
+    Args:
+        nodes: Lista de Question (renderizadas com render_question_node) ou de
+            dicionários já renderizados ("html", "gab"), como os do bookmarklet
+        timestamp: Timestamp em ms de CREATED/MODIFIED (padrão: SOURCE_DATE_EPOCH ou agora)
+        workers: Processos do pool; None decide pelo tamanho da entrada, 1 desativa o pool
+        chunk_size: Nós por bloco (padrão: OUTPUT_CONFIG["render_chunk_size"])
+
+    Returns:
+        String XML formatada para Freeplane (.mm)
+    """
+    if timestamp is None:
+        epoch = os.environ.get("SOURCE_DATE_EPOCH")
+        timestamp = int(epoch) * 1000 if epoch else int(time.time() * 1000)
+    ts = str(timestamp)
+    chunk_size = chunk_size or OUTPUT_CONFIG["render_chunk_size"]
+
+    nodes = [{"html": render_question_node(node), "gab": node.gabarito} if isinstance(node, Question) else node
+             for node in nodes]
+    htmls = [node["html"] for node in sorted(nodes, key=lambda x: x.get("gab", "")) if node.get("html")]
+    header = _MAP_HEADER_TEMPLATE.format(root_id=stable_id("root", len(htmls)), ts=ts)
+
+    chunks = [(start, htmls[start:start + chunk_size], ts) for start in range(0, len(htmls), chunk_size)]
+    if workers is None:
+        use_pool = len(htmls) >= OUTPUT_CONFIG["render_parallel_threshold"]
+    else:
+        use_pool = workers > 1
+    if use_pool and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            body = list(pool.map(_render_chunk, chunks))
+    else:
+        body = [_render_chunk(chunk) for chunk in chunks]
+
+    return "".join([header, *body, '</node>\n</map>\n'])
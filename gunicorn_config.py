@@ -6,7 +6,10 @@ bind = "0.0.0.0:5000"
 backlog = 2048
 
 # Worker processes
-workers = 1  # SocketIO funciona melhor com um único worker
+# Os jobs ficam no JobRegistry (SQLite em output/), visível a todos os workers,
+# e cada worker sobe seu próprio Chromium (porta CDP livre, ver browser_server.py).
+# Com mais de um worker, o Socket.IO exige sticky sessions no proxy; o SSE não.
+workers = int(os.environ.get("WEB_WORKERS", 1))
 worker_class = "eventlet"
 worker_connections = 1000
 timeout = 30
@@ -0,0 +1,213 @@
+"""
+Fila durável de jobs de scraping.
+
+A interface web só enfileira o job (/start_scraping) e responde na hora; os
+processos do scrape_worker.py consomem a fila e rodam o Playwright. Para ter
+mais capacidade, basta subir mais workers ou containers.
+
+Dois backends com a mesma interface:
+    RedisJobQueue   - lista no Redis do docker-compose. O job passa de
+                      "pending" para "processing" atomicamente (BLMOVE) e sai
+                      de lá no ack.
+    SQLiteJobQueue  - stand-in local (output/jobs.sqlite3) para rodar sem Redis.
+
+O payload leva só as URLs, nunca credenciais: o worker usa a sessão salva em
+output/ (volume compartilhado) e, se ela não servir, faz login com QC_EMAIL e
+QC_PASSWORD do próprio ambiente. Se o processo que executava um job morre,
+release() o devolve à fila (ou o descarta, depois de tentativas demais).
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from pathlib import Path
+from config import JOB_QUEUE_CONFIG, EVENT_BUS_CONFIG, OUTPUT_CONFIG
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+def new_job(urls):
+    """Monta o payload de um job (sem credenciais)."""
+    return {
+        "id": uuid.uuid4().hex,
+        "urls": [url for url in urls if url.strip()],
+        "created_at": time.time(),
+    }
+
+class RedisJobQueue:
+    """
+    Fila confiável no Redis: LPUSH em pending, BLMOVE para processing, LREM no ack.
+    """
+
+    def __init__(self, url=None, prefix=None):
+        self.url = url or os.environ.get("REDIS_URL") or EVENT_BUS_CONFIG["redis_url"]
+        prefix = prefix or JOB_QUEUE_CONFIG["redis_prefix"]
+        self.pending_key = f"{prefix}:pending"
+        self.processing_key = f"{prefix}:processing"
+        self._client = redis.Redis.from_url(self.url, socket_connect_timeout=1)
+        self._client.ping()
+
+    def push(self, job):
+        self._client.lpush(self.pending_key, json.dumps(job, ensure_ascii=False))
+        return job["id"]
+
+    def pending(self):
+        return self._client.llen(self.pending_key)
+
+    def pop(self, timeout=5):
+        """
+        Retira o próximo job (bloqueia até timeout segundos).
+
+        Returns:
+            Payload do job, ou None se a fila ficou vazia
+        """
+        raw = self._client.blmove(self.pending_key, self.processing_key, timeout, "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        job = json.loads(raw)
+        job["_raw"] = raw
+        return job
+
+    def ack(self, job, ok=True):
+        """Remove o job concluído (com sucesso ou não) da lista de processamento."""
+        self._client.lrem(self.processing_key, 1, job["_raw"])
+
+    def release(self, job_id, requeue=True):
+        """
+        Tira um job de processing pelo ID: de volta para pending ou descartado.
+
+        Returns:
+            True se o job estava em processamento
+        """
+        for raw in self._client.lrange(self.processing_key, 0, -1):
+            try:
+                if json.loads(raw).get("id") != job_id:
+                    continue
+            except ValueError:
+                continue
+            pipe = self._client.pipeline()
+            pipe.lrem(self.processing_key, 1, raw)
+            if requeue:
+                # RPUSH: sai antes dos outros pendentes
+                pipe.rpush(self.pending_key, raw)
+            pipe.execute()
+            return True
+        return False
+
+    def recover(self):
+        """
+        Devolve para pending os jobs que ficaram em processing (worker caiu).
+
+        Returns:
+            Quantidade de jobs devolvidos
+        """
+        count = 0
+        while self._client.lmove(self.processing_key, self.pending_key, "RIGHT", "RIGHT") is not None:
+            count += 1
+        return count
+
+class SQLiteJobQueue:
+    """
+    Fila em SQLite para uso local; pop() consulta a tabela em intervalos curtos.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or Path(OUTPUT_CONFIG["output_dir"]) / JOB_QUEUE_CONFIG["sqlite_file"])
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " payload TEXT,"
+            " status TEXT NOT NULL,"
+            " worker INTEGER,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def push(self, job):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, payload, status, created_at) VALUES (?, ?, 'pending', ?)",
+                (job["id"], json.dumps(job, ensure_ascii=False), job["created_at"]),
+            )
+        return job["id"]
+
+    def pending(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'pending'").fetchone()[0]
+
+    def _claim(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, payload FROM jobs WHERE status = 'pending' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, started_at = ? WHERE id = ?",
+                        (os.getpid(), time.time(), row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return json.loads(row[1]) if row else None
+
+    def pop(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self._claim()
+            if job is not None or time.monotonic() >= deadline:
+                return job
+            time.sleep(JOB_QUEUE_CONFIG["poll_interval"])
+
+    def ack(self, job, ok=True):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, payload = NULL, finished_at = ? WHERE id = ?",
+                ("done" if ok else "failed", time.time(), job["id"]),
+            )
+
+    def release(self, job_id, requeue=True):
+        with self._lock:
+            if requeue:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = 'pending', worker = NULL, started_at = NULL"
+                    " WHERE id = ? AND status = 'running'", (job_id,))
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', payload = NULL, finished_at = ?"
+                    " WHERE id = ? AND status = 'running'", (time.time(), job_id))
+            return cursor.rowcount > 0
+
+    def recover(self):
+        with self._lock:
+            return self._conn.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'").rowcount
+
+def open_queue(backend=None):
+    """
+    Abre a fila configurada em JOB_QUEUE_CONFIG["backend"].
+
+    "auto" usa o Redis se ele responder e, senão, o SQLite local.
+    """
+    backend = backend or JOB_QUEUE_CONFIG["backend"]
+    if backend in ("redis", "auto") and redis is not None:
+        try:
+            return RedisJobQueue()
+        except redis.RedisError:
+            if backend == "redis":
+                raise
+    elif backend == "redis":
+        raise RuntimeError("Backend redis configurado, mas o pacote redis não está instalado")
+    return SQLiteJobQueue()
@@ -0,0 +1,152 @@
+"""
+Registro dos jobs de scraping (status, progresso, tempos, log e saída de cada um).
+
+Cada job recebe um ID e grava seu estado numa tabela SQLite em output/, com
+log próprio (logs/jobs/<id>.log) e mapa próprio (output/jobs/<id>/resultado.mm),
+então dois jobs simultâneos não se sobrescrevem. O banco fica no disco
+compartilhado: qualquer worker do gunicorn e qualquer scrape_worker.py lê e
+atualiza o mesmo registro. Cada operação abre sua própria conexão, o que é
+seguro entre threads e depois de fork (preload_app do gunicorn).
+
+Estados: queued -> running -> completed | failed
+"""
+
+import os
+import time
+import sqlite3
+from contextlib import closing
+from config import JOB_REGISTRY_CONFIG, LOG_CONFIG, OUTPUT_CONFIG
+
+COLUMNS = ("id", "state", "urls", "processed", "current_url", "nodes", "error", "worker",
+           "log_path", "output_path", "created_at", "started_at", "finished_at")
+
+def job_log_path(job_id):
+    return os.path.join(os.path.dirname(LOG_CONFIG["path"]), "jobs", f"{job_id}.log")
+
+def job_output_path(job_id):
+    return os.path.join(OUTPUT_CONFIG["output_dir"], "jobs", job_id, "resultado.mm")
+
+class JobRegistry:
+    """
+    Tabela de jobs compartilhada entre processos.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(OUTPUT_CONFIG["output_dir"], JOB_REGISTRY_CONFIG["file"])
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " state TEXT NOT NULL,"
+                " urls INTEGER NOT NULL,"
+                " processed INTEGER NOT NULL DEFAULT 0,"
+                " current_url TEXT,"
+                " nodes INTEGER NOT NULL DEFAULT 0,"
+                " error TEXT,"
+                " worker TEXT,"
+                " log_path TEXT NOT NULL,"
+                " output_path TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " started_at REAL,"
+                " finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _update(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with closing(self._connect()) as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def create(self, job_id, urls):
+        """
+        Registra um job novo (estado "queued").
+
+        Args:
+            job_id: ID do job (job_queue.new_job)
+            urls: Número de URLs do job
+        """
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, state, urls, log_path, output_path, created_at)"
+                " VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, urls, job_log_path(job_id), job_output_path(job_id), time.time()),
+            )
+        self.prune()
+
+    def start(self, job_id, worker):
+        self._update(job_id, state="running", worker=worker, started_at=time.time())
+
+    def progress(self, job_id, processed, current_url=""):
+        self._update(job_id, processed=processed, current_url=current_url)
+
+    def requeue(self, job_id):
+        """Volta o job para "queued" (o processo que o executava morreu)."""
+        self._update(job_id, state="queued", worker=None, started_at=None, processed=0, current_url=None)
+
+    def finish(self, job_id, error=None, nodes=0):
+        self._update(job_id, state="failed" if error else "completed", error=error,
+                     nodes=nodes, finished_at=time.time())
+
+    def get(self, job_id):
+        """
+        Returns:
+            Dicionário com os campos do job (mais "elapsed" em segundos), ou None
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, limit=50, state=None):
+        """Jobs mais recentes primeiro, opcionalmente filtrados por estado."""
+        query = f"SELECT {', '.join(COLUMNS)} FROM jobs"
+        params = []
+        if state:
+            query += " WHERE state = ?"
+            params.append(state)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            return [self._to_dict(row) for row in conn.execute(query, params)]
+
+    def latest_output(self):
+        """Mapa do último job concluído com questões, ou None."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT output_path FROM jobs WHERE state = 'completed' AND nodes > 0"
+                " ORDER BY finished_at DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def prune(self):
+        """Apaga registro, log e mapa dos jobs finalizados além dos keep mais recentes."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, log_path, output_path FROM jobs WHERE state IN ('completed', 'failed')"
+                " ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+                (JOB_REGISTRY_CONFIG["keep"],),
+            ).fetchall()
+            for job_id, log_path, output_path in rows:
+                for path in (log_path, output_path, output_path + ".gz"):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                try:
+                    os.rmdir(os.path.dirname(output_path))
+                except OSError:
+                    pass
+                conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    @staticmethod
+    def _to_dict(row):
+        job = dict(zip(COLUMNS, row))
+        if job["started_at"]:
+            job["elapsed"] = round((job["finished_at"] or time.time()) - job["started_at"], 1)
+        else:
+            job["elapsed"] = None
+        return job
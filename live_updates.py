@@ -0,0 +1,103 @@
+"""
+Atualizações em tempo real para o monitor (push em vez de polling).
+
+O EventBroker recebe os eventos do job (linhas de log, progresso, mudanças de
+status) e os entrega a quem estiver conectado: clientes Socket.IO, quando o
+Flask-SocketIO está disponível, e assinantes SSE (/events) como alternativa.
+
+Cada evento tem um número de sequência. As últimas linhas de log e o último
+status/progresso ficam guardados, então um cliente que (re)conecta recebe o
+que perdeu (Last-Event-ID no SSE, last_id no Socket.IO) sem reler o log.
+"""
+
+import json
+import queue
+import threading
+from collections import deque
+from config import LIVE_CONFIG
+
+class EventBroker:
+    """
+    Pub/sub em memória com histórico curto para reconexão.
+    """
+
+    def __init__(self, history=None, subscriber_queue=None):
+        self.history = deque(maxlen=history or LIVE_CONFIG["history"])
+        self.subscriber_queue = subscriber_queue or LIVE_CONFIG["subscriber_queue"]
+        self.snapshot = {}
+        self.socketio = None
+        self._seq = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event, data):
+        """
+        Publica um evento ("log", "progress", "status" ou "screenshot") para todos os clientes.
+        """
+        with self._lock:
+            self._seq += 1
+            item = {"id": self._seq, "event": event, "data": data}
+            if event == "log":
+                self.history.append(item)
+            else:
+                self.snapshot[event] = item
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(item)
+            except queue.Full:
+                # Cliente lento: descarta; ele recupera pelo histórico ao reconectar
+                pass
+        if self.socketio is not None:
+            self.socketio.emit(event, {"id": item["id"], **data})
+
+    def replay(self, last_id=0):
+        """
+        Eventos que um cliente com last_id ainda não viu: status/progresso
+        atuais + linhas de log mais novas, em ordem.
+        """
+        with self._lock:
+            items = [item for item in self.history if item["id"] > last_id]
+            items += [item for item in self.snapshot.values() if item["id"] > last_id]
+        return sorted(items, key=lambda item: item["id"])
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=self.subscriber_queue)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def reset(self):
+        """Limpa o histórico de log (início de um novo job)."""
+        with self._lock:
+            self.history.clear()
+
+    def sse_stream(self, last_id=0):
+        """
+        Gerador de mensagens SSE: replay desde last_id e depois eventos ao vivo,
+        com comentário de keep-alive quando não há eventos.
+        """
+        q = self.subscribe()
+        try:
+            sent = last_id
+            for item in self.replay(last_id):
+                sent = item["id"]
+                yield format_sse(item)
+            while True:
+                try:
+                    item = q.get(timeout=LIVE_CONFIG["keepalive"])
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item["id"] > sent:
+                    sent = item["id"]
+                    yield format_sse(item)
+        finally:
+            self.unsubscribe(q)
+
+def format_sse(item):
+    return f"id: {item['id']}\nevent: {item['event']}\ndata: {json.dumps(item['data'], ensure_ascii=False)}\n\n"
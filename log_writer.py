@@ -0,0 +1,265 @@
+"""
+Escrita de log em segundo plano para a interface web.
+
+log() só enfileira a mensagem; uma thread dedicada junta as linhas e grava em
+lote (a cada flush_interval segundos ou batch_size linhas), mantendo o arquivo
+aberto. Quando o arquivo passa de max_bytes ele é rotacionado
+(scraper.log -> scraper.log.1 -> ...). Com format="json" cada linha é um
+objeto JSON com ts, level e msg.
+
+Vários processos (workers do gunicorn, filhos do scrape_worker.py) gravam no
+mesmo arquivo: antes de cada lote o writer confere se o caminho ainda aponta
+para o arquivo aberto (outro processo pode tê-lo rotacionado) e reabre se
+não; a rotação em si é feita sob um lock de arquivo (scraper.log.lock), para
+dois processos não rotacionarem juntos.
+
+read_tail() lê só o trecho novo do arquivo a partir de um cursor (inode +
+offset em bytes), com seek, para o monitor acompanhar o log sem reler tudo.
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+from config import LOG_CONFIG
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos
+    fcntl = None
+
+_FLUSH = object()
+_RESET = object()
+_STOP = object()
+
+def split_level(msg):
+    """Separa o prefixo "INFO: ..." usado nas mensagens da interface web."""
+    level, sep, rest = msg.partition(": ")
+    if sep and level.isupper() and level.isalpha():
+        return level, rest
+    return "INFO", msg
+
+def format_text(line):
+    """
+    Converte uma linha do arquivo (texto ou JSON) no formato exibido no monitor.
+    """
+    if line.startswith("{"):
+        try:
+            entry = json.loads(line)
+            stamp = time.strftime("%H:%M:%S", time.localtime(entry["ts"]))
+            return f"[{stamp}] {entry['level']}: {entry['msg']}\n"
+        except (ValueError, KeyError, TypeError):
+            pass
+    return line
+
+def read_tail(path, cursor=None, max_bytes=None):
+    """
+    Lê as linhas novas do log desde o cursor.
+
+    Args:
+        path: Arquivo de log
+        cursor: "inode:offset" devolvido pela chamada anterior (None = do início)
+        max_bytes: Máximo lido por chamada (padrão: LOG_CONFIG["tail_max_bytes"])
+
+    Returns:
+        Dicionário com text (linhas completas, no formato do monitor), cursor
+        (próximo cursor), reset (True se o arquivo foi rotacionado/limpo e o
+        cliente deve descartar o que já mostrou) e more (há mais a ler)
+    """
+    max_bytes = max_bytes or LOG_CONFIG["tail_max_bytes"]
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return {"text": "", "cursor": None, "reset": cursor is not None, "more": False}
+
+    inode, offset, reset = st.st_ino, 0, cursor is not None
+    if cursor:
+        try:
+            prev_inode, prev_offset = (int(part) for part in cursor.split(":"))
+        except ValueError:
+            prev_inode, prev_offset = None, 0
+        if prev_inode == inode and prev_offset <= st.st_size:
+            offset, reset = prev_offset, False
+
+    if offset >= st.st_size:
+        return {"text": "", "cursor": f"{inode}:{offset}", "reset": reset, "more": False}
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read(max_bytes)
+    # Só devolve linhas completas; a última, ainda sendo escrita, fica para a próxima
+    end = chunk.rfind(b"\n") + 1
+    if end == 0 and len(chunk) < max_bytes:
+        return {"text": "", "cursor": f"{inode}:{offset}", "reset": reset, "more": False}
+    if end:
+        chunk = chunk[:end]
+    text = "".join(format_text(line) for line in chunk.decode("utf-8", errors="replace").splitlines(True))
+    next_offset = offset + len(chunk)
+    return {"text": text, "cursor": f"{inode}:{next_offset}", "reset": reset,
+            "more": next_offset < st.st_size}
+
+class BufferedLogWriter:
+    """
+    Log com fila e thread de escrita; write() nunca faz I/O de arquivo.
+    """
+
+    def __init__(self, path=None, fmt=None, flush_interval=None, batch_size=None,
+                 max_bytes=None, backups=None):
+        self.path = path or LOG_CONFIG["path"]
+        self.fmt = fmt or LOG_CONFIG["format"]
+        self.flush_interval = flush_interval or LOG_CONFIG["flush_interval"]
+        self.batch_size = batch_size or LOG_CONFIG["batch_size"]
+        self.max_bytes = max_bytes or LOG_CONFIG["max_bytes"]
+        self.backups = LOG_CONFIG["backups"] if backups is None else backups
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def write(self, msg):
+        """Enfileira uma mensagem (não bloqueia)."""
+        self._ensure_thread()
+        self._queue.put((time.time(), msg))
+
+    def flush(self, timeout=2):
+        """Espera as mensagens já enfileiradas chegarem ao disco."""
+        self._command(_FLUSH, timeout)
+
+    def reset(self, timeout=2):
+        """Esvazia o arquivo de log (início de um novo job)."""
+        self._command(_RESET, timeout)
+
+    def close(self, timeout=2):
+        if self._thread is not None and self._thread.is_alive():
+            self._command(_STOP, timeout)
+
+    def _ensure_thread(self):
+        # Iniciada no primeiro uso, e não no import: com preload_app do gunicorn
+        # a thread criada no processo mestre não existe nos workers
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._file = None
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _command(self, command, timeout):
+        self._ensure_thread()
+        done = threading.Event()
+        self._queue.put((command, done))
+        done.wait(timeout)
+
+    def _format(self, ts, msg):
+        if self.fmt == "json":
+            level, text = split_level(msg)
+            return json.dumps({"ts": round(ts, 3), "level": level, "msg": text}, ensure_ascii=False) + "\n"
+        return f"[{time.strftime('%H:%M:%S', time.localtime(ts))}] {msg}\n"
+
+    def _open(self):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def _reopen_if_rotated(self):
+        """Reabre o arquivo se outro processo o rotacionou ou apagou."""
+        try:
+            current = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            current = None
+        if current != os.fstat(self._file.fileno()).st_ino:
+            self._file.close()
+            self._file = None
+            self._open()
+
+    @contextmanager
+    def _rotation_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _size(self):
+        return os.fstat(self._file.fileno()).st_size
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _write_batch(self, lines):
+        if not lines:
+            return
+        data = "".join(lines)
+        size = len(data.encode("utf-8"))
+        try:
+            self._open()
+            self._reopen_if_rotated()
+            if self._size() and self._size() + size > self.max_bytes:
+                with self._rotation_lock():
+                    # Outro processo pode ter rotacionado enquanto esperávamos o lock
+                    self._reopen_if_rotated()
+                    if self._size() and self._size() + size > self.max_bytes:
+                        self._rotate()
+                        self._open()
+            self._file.write(data)
+            self._file.flush()
+        except OSError as e:
+            # Falha de disco não pode derrubar a thread de log
+            print(f"[ERROR] Falha ao gravar log em {self.path}: {e}")
+
+    def _run(self):
+        lines = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                item, arg = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write_batch(lines)
+                lines, deadline = [], None
+                continue
+
+            if isinstance(item, float):
+                lines.append(self._format(item, arg))
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(lines) >= self.batch_size:
+                    self._write_batch(lines)
+                    lines, deadline = [], None
+                continue
+
+            # Comandos: grava o que está pendente antes de executar
+            self._write_batch(lines)
+            lines, deadline = [], None
+            if item is _RESET:
+                try:
+                    self._open()
+                    self._reopen_if_rotated()
+                    self._file.truncate(0)
+                except OSError as e:
+                    print(f"[ERROR] Falha ao limpar log em {self.path}: {e}")
+            arg.set()
+            if item is _STOP:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
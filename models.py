@@ -0,0 +1,191 @@
+"""
+Modelo compacto das questões raspadas.
+
+Question e Comment usam __slots__ (sem __dict__ por instância) e guardam só os
+campos extraídos, não o XML já renderizado. São o formato comum da extração
+(DOM e rede), do checkpoint, do cache, do banco de questões e do
+FreeplaneWriter, que gera o .mm nos dois scrapers e na interface web.
+
+A serialização binária usa msgpack quando instalado; sem ele, um formato
+próprio com strings prefixadas pelo tamanho. O primeiro byte identifica o
+formato, então os dois podem conviver no mesmo arquivo.
+"""
+
+import struct
+import hashlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_MSGPACK = b"M"
+_PREFIXED = b"L"
+_U32 = struct.Struct(">I")
+
+class Comment:
+    """
+    Comentário de aluno (HTML do bloco de comentário).
+    """
+
+    __slots__ = ("html",)
+
+    def __init__(self, html):
+        self.html = html
+
+    def __eq__(self, other):
+        return isinstance(other, Comment) and self.html == other.html
+
+    def __repr__(self):
+        return f"Comment({self.html[:40]!r})"
+
+class Question:
+    """
+    Uma questão com gabarito, enunciado, alternativas e comentários.
+
+    alternativas e extras são tuplas de HTML; comentarios é uma tupla de Comment.
+    numero é a posição do card na página ("1", "2", ...); codigo é o código
+    da questão no site ("Q3437098"), o mesmo em qualquer filtro ou página.
+    """
+
+    # codigo fica por último: dados serializados antes dele continuam legíveis
+    __slots__ = ("numero", "gabarito", "titulo", "info", "enunciado",
+                 "alternativas", "comentarios", "badge", "extras", "codigo")
+
+    def __init__(self, numero="", gabarito="", titulo="", info="", enunciado="",
+                 alternativas=(), comentarios=(), badge="", extras=(), codigo=""):
+        self.numero = numero
+        self.codigo = codigo
+        self.gabarito = gabarito
+        self.titulo = titulo
+        self.info = info
+        self.enunciado = enunciado
+        self.alternativas = tuple(alternativas)
+        self.comentarios = tuple(c if isinstance(c, Comment) else Comment(c) for c in comentarios)
+        self.badge = badge
+        self.extras = tuple(extras)
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Cria a questão a partir de um registro (dict) da extração ou da API.
+        """
+        return cls(**{name: record.get(name) or "" for name in cls.__slots__
+                      if name not in ("alternativas", "comentarios", "extras")},
+                   alternativas=record.get("alternativas") or (),
+                   comentarios=record.get("comentarios") or (),
+                   extras=record.get("extras") or ())
+
+    @property
+    def key(self):
+        """
+        Identificador estável da questão: o código ou, sem ele, um hash do conteúdo.
+        """
+        if self.codigo:
+            return self.codigo
+        digest = hashlib.blake2b(f"{self.titulo}\0{self.enunciado}".encode("utf-8"), digest_size=8)
+        return "#" + digest.hexdigest()
+
+    def _fields(self):
+        return [self.numero, self.gabarito, self.titulo, self.info, self.enunciado,
+                list(self.alternativas), [c.html for c in self.comentarios],
+                self.badge, list(self.extras), self.codigo]
+
+    def pack(self):
+        """
+        Serializa a questão em bytes (msgpack se disponível).
+        """
+        if msgpack is not None:
+            return _MSGPACK + msgpack.packb(self._fields(), use_bin_type=True)
+        out = bytearray(_PREFIXED)
+        for value in self._fields():
+            if isinstance(value, list):
+                out += _U32.pack(len(value))
+                for item in value:
+                    _pack_str(out, item)
+            else:
+                _pack_str(out, value)
+        return bytes(out)
+
+    @classmethod
+    def unpack(cls, data):
+        """
+        Reconstrói a questão a partir de pack().
+
+        Raises:
+            ValueError: Dados truncados ou formato desconhecido
+        """
+        tag, body = data[:1], memoryview(data)[1:]
+        if tag == _MSGPACK:
+            if msgpack is None:
+                raise ValueError("Questão serializada com msgpack, mas o msgpack não está instalado")
+            fields = msgpack.unpackb(body, raw=False)
+        elif tag == _PREFIXED:
+            fields, pos = [], 0
+            for name in cls.__slots__:
+                if name == "codigo" and pos == len(body):
+                    break
+                if name in ("alternativas", "comentarios", "extras"):
+                    count, pos = _read_u32(body, pos)
+                    items = []
+                    for _ in range(count):
+                        item, pos = _read_str(body, pos)
+                        items.append(item)
+                    fields.append(items)
+                else:
+                    value, pos = _read_str(body, pos)
+                    fields.append(value)
+        else:
+            raise ValueError(f"Formato de questão desconhecido: {tag!r}")
+        return cls(*fields)
+
+    def __eq__(self, other):
+        return isinstance(other, Question) and self._fields() == other._fields()
+
+    def __repr__(self):
+        return f"Question({self.numero!r}, codigo={self.codigo!r}, gabarito={self.gabarito!r})"
+
+def _pack_str(out, value):
+    raw = (value or "").encode("utf-8")
+    out += _U32.pack(len(raw))
+    out += raw
+
+def _read_u32(buf, pos):
+    if pos + 4 > len(buf):
+        raise ValueError("Questão truncada")
+    return _U32.unpack_from(buf, pos)[0], pos + 4
+
+def _read_str(buf, pos):
+    size, pos = _read_u32(buf, pos)
+    if pos + size > len(buf):
+        raise ValueError("Questão truncada")
+    return bytes(buf[pos:pos + size]).decode("utf-8"), pos + size
+
+def pack_questions(questions):
+    """
+    Serializa uma lista de questões: quantidade + (tamanho, questão) para cada uma.
+    """
+    out = bytearray(_U32.pack(len(questions)))
+    for question in questions:
+        data = question.pack()
+        out += _U32.pack(len(data))
+        out += data
+    return bytes(out)
+
+def unpack_questions(data):
+    """
+    Inverso de pack_questions.
+
+    Raises:
+        ValueError: Dados truncados
+    """
+    buf = memoryview(data)
+    count, pos = _read_u32(buf, 0)
+    questions = []
+    for _ in range(count):
+        size, pos = _read_u32(buf, pos)
+        if pos + size > len(buf):
+            raise ValueError("Lista de questões truncada")
+        questions.append(Question.unpack(bytes(buf[pos:pos + size])))
+        pos += size
+    return questions
@@ -0,0 +1,100 @@
+"""
+Planejamento das URLs: expande filtros paginados em uma URL por página.
+
+As URLs do urls.txt são consultas de filtro (per_page=20) e o scraper só via a
+primeira página de cada uma. O planejador abre cada filtro com o maior
+per_page aceito, lê o total de questões e gera as URLs de todas as páginas,
+que viram itens de trabalho independentes (e paralelizáveis) no scraping.
+"""
+
+import math
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from config import SCRAPING_CONFIG
+from rate_limiter import limiter
+
+# Procura o total de resultados no texto da página (ex: "1.234 questões")
+TOTAL_RESULTS_JS = """
+() => {
+    const text = document.body ? document.body.innerText : "";
+    const match = text.match(/([\\d.]+)\\s+quest(?:ões|oes|ão|ao)\\b/i);
+    return match ? parseInt(match[1].replace(/\\./g, ""), 10) : null;
+}
+"""
+
+def with_page(url, page_number, per_page):
+    """
+    Retorna a URL com os parâmetros de página e tamanho de página substituídos.
+    """
+    page_param = SCRAPING_CONFIG["page_param"]
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k not in (page_param, "per_page")]
+    query.append(("per_page", str(per_page)))
+    query.append((page_param, str(page_number)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def page_urls(url, total, per_page):
+    """
+    URLs de todas as páginas de um filtro com total questões (ao menos uma).
+    """
+    pages = max(1, math.ceil(total / per_page))
+    return [with_page(url, n, per_page) for n in range(1, pages + 1)]
+
+def detect_total(page):
+    """
+    Lê o total de questões do filtro na página já carregada.
+
+    Returns:
+        Total de questões, ou None se não foi possível identificar
+    """
+    try:
+        return page.evaluate(TOTAL_RESULTS_JS)
+    except Exception:
+        return None
+
+def expand_url(page, url, per_page=None):
+    """
+    Expande um filtro em todas as suas páginas.
+
+    Args:
+        page: Página do Playwright autenticada
+        url: URL de filtro de questões
+        per_page: Tamanho de página (padrão: SCRAPING_CONFIG["max_per_page"])
+
+    Returns:
+        Lista de URLs (uma por página); [url] se o total não for identificado
+    """
+    per_page = per_page or SCRAPING_CONFIG["max_per_page"]
+    first = with_page(url, 1, per_page)
+    limiter.navigate(page, first, wait_until="domcontentloaded", timeout=60000)
+    try:
+        page.wait_for_function(TOTAL_RESULTS_JS, timeout=SCRAPING_CONFIG["ready_timeout"])
+    except Exception:
+        pass
+    total = detect_total(page)
+    if not total:
+        return [url]
+    return page_urls(url, total, per_page)
+
+def plan(page, urls, log=print):
+    """
+    Expande todas as URLs de filtro, preservando a ordem.
+
+    Args:
+        page: Página do Playwright autenticada
+        urls: URLs lidas do urls.txt
+        log: Função de log (recebe a mensagem)
+
+    Returns:
+        Lista com as URLs de todas as páginas de todos os filtros
+    """
+    planned = []
+    for url in urls:
+        try:
+            expanded = expand_url(page, url)
+        except Exception as e:
+            log(f"⚠️ Não foi possível expandir {url[:80]}: {e}")
+            expanded = [url]
+        log(f"🧭 {url[:80]} → {len(expanded)} página(s)")
+        planned.extend(expanded)
+    return planned
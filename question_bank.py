@@ -0,0 +1,199 @@
+"""
+Banco de questões local (SQLite) com busca de texto completo (FTS5).
+
+Além do .mm, cada questão extraída é gravada (upsert pelo código da questão,
+"Q3437098") com gabarito, metadados, enunciado e comentários. O índice FTS5
+cobre o texto do enunciado e dos comentários (sem as tags HTML), usando a
+tabela questions como conteúdo (mantido por triggers). Buscar entre dezenas
+de milhares de questões leva milissegundos, e gerar um mapa novo é uma
+consulta em vez de uma nova raspagem.
+
+Uso pela linha de comando:
+    python question_bank.py "controle de constitucionalidade"
+    python question_bank.py "licitação" --mm output/licitacao.mm
+"""
+
+import re
+import html
+import time
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from config import OUTPUT_CONFIG
+from models import Question
+
+_TAGS = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"\s+")
+
+def html_to_text(value):
+    """Remove as tags e decodifica entidades para indexação."""
+    return _SPACES.sub(" ", html.unescape(_TAGS.sub(" ", value or ""))).strip()
+
+def default_path():
+    return Path(OUTPUT_CONFIG["output_dir"]) / OUTPUT_CONFIG["bank_file"]
+
+class QuestionBank:
+    """
+    Tabela de questões + índice FTS5 sobre enunciado e comentários.
+
+    Uso:
+        with QuestionBank(path) as bank:
+            bank.add(question)
+    """
+
+    def __init__(self, path=None, batch_size=500):
+        self.path = str(path or default_path())
+        self.batch_size = batch_size
+        self.count = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            " codigo TEXT PRIMARY KEY,"
+            " gabarito TEXT NOT NULL,"
+            " titulo TEXT NOT NULL,"
+            " info TEXT NOT NULL,"
+            " enunciado TEXT NOT NULL,"
+            " comentarios TEXT NOT NULL,"
+            " data BLOB NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5("
+            " enunciado, comentarios, content='questions', content_rowid='rowid',"
+            " tokenize='unicode61 remove_diacritics 2')"
+        )
+        self._conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS questions_ai AFTER INSERT ON questions BEGIN
+                INSERT INTO questions_fts (rowid, enunciado, comentarios)
+                VALUES (new.rowid, new.enunciado, new.comentarios);
+            END;
+            CREATE TRIGGER IF NOT EXISTS questions_ad AFTER DELETE ON questions BEGIN
+                INSERT INTO questions_fts (questions_fts, rowid, enunciado, comentarios)
+                VALUES ('delete', old.rowid, old.enunciado, old.comentarios);
+            END;
+            CREATE TRIGGER IF NOT EXISTS questions_au AFTER UPDATE ON questions BEGIN
+                INSERT INTO questions_fts (questions_fts, rowid, enunciado, comentarios)
+                VALUES ('delete', old.rowid, old.enunciado, old.comentarios);
+                INSERT INTO questions_fts (rowid, enunciado, comentarios)
+                VALUES (new.rowid, new.enunciado, new.comentarios);
+            END;
+        """)
+        self._conn.commit()
+
+    def add(self, question: Question):
+        """Enfileira uma questão; grava a cada batch_size questões."""
+        with self._lock:
+            self._pending.append(question)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def upsert(self, questions):
+        """Grava várias questões de uma vez."""
+        for question in questions:
+            self.add(question)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        now = time.time()
+        rows = []
+        for q in self._pending:
+            enunciado = html_to_text(q.enunciado)
+            comentarios = " ".join(html_to_text(c.html) for c in q.comentarios)
+            rows.append((q.key, q.gabarito, q.titulo, q.info, enunciado, comentarios, q.pack(), now))
+        # Os triggers atualizam o índice FTS pela rowid de cada linha
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO questions (codigo, gabarito, titulo, info, enunciado, comentarios, data, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(codigo) DO UPDATE SET gabarito=excluded.gabarito, titulo=excluded.titulo,"
+                " info=excluded.info, enunciado=excluded.enunciado, comentarios=excluded.comentarios,"
+                " data=excluded.data, updated_at=excluded.updated_at",
+                rows,
+            )
+        self.count += len(rows)
+        self._pending = []
+
+    def search(self, query, limit=50):
+        """
+        Busca no enunciado e nos comentários (sintaxe de consulta do FTS5).
+
+        Returns:
+            Lista de dicionários {codigo, gabarito, titulo, trecho}, por relevância
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT q.codigo, q.gabarito, q.titulo,"
+                " snippet(questions_fts, -1, '[', ']', '…', 12)"
+                " FROM questions_fts JOIN questions q ON q.rowid = questions_fts.rowid"
+                " WHERE questions_fts MATCH ? ORDER BY rank LIMIT ?",
+                (query, limit),
+            ).fetchall()
+        return [{"codigo": c, "gabarito": g, "titulo": t, "trecho": s} for c, g, t, s in rows]
+
+    def iter_questions(self, query=None):
+        """
+        Gera as Question do banco (todas ou só as que casam com a busca),
+        ordenadas por gabarito como no .mm.
+        """
+        if query:
+            sql = ("SELECT q.data FROM questions_fts JOIN questions q ON q.rowid = questions_fts.rowid"
+                   " WHERE questions_fts MATCH ? ORDER BY q.gabarito")
+            params = (query,)
+        else:
+            sql, params = "SELECT data FROM questions ORDER BY gabarito", ()
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        for (data,) in rows:
+            yield Question.unpack(data)
+
+    def total(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca no banco de questões raspadas")
+    parser.add_argument("query", help="Consulta FTS5 (ex: \"licitação AND dispensa\")")
+    parser.add_argument("--db", default=None, help="Caminho do banco (padrão: output/questions.sqlite3)")
+    parser.add_argument("--limit", type=int, default=20, help="Máximo de resultados exibidos")
+    parser.add_argument("--mm", default=None, help="Gera um mapa .mm só com as questões encontradas")
+    args = parser.parse_args(argv)
+
+    with QuestionBank(args.db) as bank:
+        if args.mm:
+            from freeplane import FreeplaneWriter
+            with FreeplaneWriter(args.mm) as writer:
+                writer.write_all(bank.iter_questions(args.query))
+            print(f"{writer.count} questões gravadas em {args.mm}")
+            return
+        start = time.perf_counter()
+        results = bank.search(args.query, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for r in results:
+            print(f"{r['codigo']} | {r['gabarito']} | {r['titulo']}\n    {r['trecho']}")
+        print(f"{len(results)} resultado(s) de {bank.total()} questões em {elapsed:.1f} ms")
+
+if __name__ == "__main__":
+    main()
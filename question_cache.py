@@ -0,0 +1,122 @@
+"""
+Cache local (SQLite) de questões já extraídas.
+
+As mesmas questões aparecem em vários filtros e em várias execuções. Antes da
+extração completa, o navegador calcula um hash barato de cada questão
+(enunciado + estatísticas + comentários); questões com o mesmo código
+("Q3437098", igual em qualquer filtro ou página) e o mesmo hash reaproveitam
+a questão salva (models.Question serializada em binário) e só as novas ou
+alteradas são extraídas.
+"""
+
+import time
+import sqlite3
+import threading
+from models import Question
+
+# Código e hash FNV-1a (32 bits) do conteúdo de cada questão da página.
+# Cards sem código não entram: são sempre extraídos por completo.
+FINGERPRINT_JS = """
+(sel) => {
+    const fnv = (str) => {
+        let h = 0x811c9dc5;
+        for (let i = 0; i < str.length; i++) {
+            h ^= str.charCodeAt(i);
+            h = Math.imul(h, 0x01000193);
+        }
+        return (h >>> 0).toString(16);
+    };
+    return Array.from(document.querySelectorAll(sel.card)).map(card => {
+        const num = card.querySelector(sel.num);
+        const code = (num && num.parentElement.querySelector(sel.code)) || card.querySelector(sel.code);
+        const stmt = card.querySelector(sel.statement);
+        const stats = card.querySelector(sel.statsAttr);
+        const comments = Array.from(card.querySelectorAll(sel.commentText)).map(c => c.innerHTML).join("|");
+        return {
+            codigo: code ? code.textContent.trim() : "",
+            numero: num ? num.textContent.trim() : "",
+            hash: fnv([
+                stmt ? stmt.innerHTML : "",
+                stats ? stats.getAttribute("data-question-statistics-alternatives-statistics") : "",
+                comments
+            ].join("\\u0000"))
+        };
+    }).filter(q => q.codigo !== "");
+}
+"""
+
+class QuestionCache:
+    """
+    Tabela codigo -> (hash, questão) com contadores de acertos e faltas.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            " codigo TEXT PRIMARY KEY,"
+            " hash TEXT NOT NULL,"
+            " data BLOB NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def lookup(self, fingerprints):
+        """
+        Procura as questões da página no cache.
+
+        Args:
+            fingerprints: Lista de {codigo, numero, hash} retornada por FINGERPRINT_JS
+
+        Returns:
+            Dicionário codigo -> Question para as questões com hash idêntico,
+            com numero atualizado para a posição na página atual
+        """
+        if not fingerprints:
+            return {}
+        wanted = {fp["codigo"]: fp["hash"] for fp in fingerprints}
+        placeholders = ",".join("?" * len(wanted))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT codigo, hash, data FROM questions WHERE codigo IN ({placeholders})",
+                list(wanted),
+            ).fetchall()
+        cached = {codigo: Question.unpack(data) for codigo, h, data in rows if wanted.get(codigo) == h}
+        for fp in fingerprints:
+            if fp["codigo"] in cached:
+                cached[fp["codigo"]].numero = fp["numero"]
+        with self._lock:
+            self.hits += len(cached)
+            self.misses += len(wanted) - len(cached)
+        return cached
+
+    def store(self, questions, fingerprints):
+        """
+        Grava as questões recém-extraídas com o hash calculado na página.
+        """
+        hashes = {fp["codigo"]: fp["hash"] for fp in fingerprints}
+        now = time.time()
+        rows = [(q.codigo, hashes[q.codigo], q.pack(), now)
+                for q in questions if q.codigo in hashes]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO questions (codigo, hash, data, updated_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0
+        return f"{self.hits} acertos, {self.misses} faltas ({rate:.0f}% reaproveitado)"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,249 @@
+"""
+Limite adaptativo de navegações por host (substitui a pausa fixa entre URLs).
+
+Cada host tem um token bucket: a taxa (navegações/s) começa em initial_rate e
+se ajusta pelo que o site responde:
+    - 429/503 ou redirecionamento para o login: taxa * backoff e pausa de
+      cooldown segundos (ou o Retry-After do servidor);
+    - outros 5xx ou falha de navegação: taxa * backoff;
+    - navegação mais lenta que slow_navigation: taxa * slow_factor;
+    - ramp_after navegações saudáveis seguidas: taxa + ramp_step (até max_rate).
+Quedas seguidas dentro de decrease_interval contam uma vez só, para uma
+rajada de 429 não derrubar a taxa ao mínimo.
+
+O estado fica numa tabela SQLite em output/, então threads, processos do
+scrape_worker.py e containers que compartilham o volume dividem o mesmo limite.
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+from contextlib import closing
+from urllib.parse import urlparse
+from config import LOGIN_URL, OUTPUT_CONFIG, RATE_LIMIT_CONFIG
+
+LOGIN_PATH = urlparse(LOGIN_URL).path
+THROTTLE_STATUS = (429, 503)
+
+def host_of(url):
+    return urlparse(url).netloc
+
+def retry_after(response):
+    """Segundos do cabeçalho Retry-After (None se ausente ou em formato de data)."""
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class RateLimiter:
+    """
+    Token bucket por host, compartilhado entre processos via SQLite.
+    """
+
+    def __init__(self, path=None, config=None):
+        self.config = {**RATE_LIMIT_CONFIG, **(config or {})}
+        self.path = path or os.path.join(OUTPUT_CONFIG["output_dir"], self.config["file"])
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Banco criado no primeiro uso, e não no import (o módulo tem uma instância global)
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self._create()
+                    self._ready = True
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _create(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=30, isolation_level=None)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " host TEXT PRIMARY KEY,"
+                " rate REAL NOT NULL,"
+                " tokens REAL NOT NULL,"
+                " updated REAL NOT NULL,"
+                " blocked_until REAL NOT NULL DEFAULT 0,"
+                " last_decrease REAL NOT NULL DEFAULT 0,"
+                " streak INTEGER NOT NULL DEFAULT 0)"
+            )
+
+    def _transaction(self, host, update):
+        """
+        Lê o bucket do host, aplica update(bucket, agora) e grava, numa transação exclusiva.
+
+        Returns:
+            O que update retornar
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT rate, tokens, updated, blocked_until, last_decrease, streak"
+                    " FROM buckets WHERE host = ?", (host,)
+                ).fetchone()
+                if row is None:
+                    row = (self.config["initial_rate"], self.config["burst"], now, 0, 0, 0)
+                bucket = dict(zip(("rate", "tokens", "updated", "blocked_until", "last_decrease", "streak"), row))
+                result = update(bucket, now)
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (host, rate, tokens, updated, blocked_until, last_decrease, streak)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (host, bucket["rate"], bucket["tokens"], bucket["updated"], bucket["blocked_until"],
+                     bucket["last_decrease"], bucket["streak"]),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def reserve(self, url):
+        """
+        Reserva uma navegação para o host da URL.
+
+        Returns:
+            Segundos a esperar antes de navegar (0 se há token disponível)
+        """
+        if not self.config["enabled"]:
+            return 0
+
+        def take(bucket, now):
+            tokens = min(self.config["burst"], bucket["tokens"] + (now - bucket["updated"]) * bucket["rate"])
+            # Tokens negativos são reservas de quem já está esperando
+            bucket["tokens"] = tokens - 1
+            bucket["updated"] = now
+            return max(0, -bucket["tokens"] / bucket["rate"], bucket["blocked_until"] - now)
+
+        return self._transaction(host_of(url), take)
+
+    def report(self, url, outcome, pause=None):
+        """
+        Ajusta a taxa do host conforme o resultado de uma navegação.
+
+        Args:
+            url: URL navegada
+            outcome: "ok", "slow", "error" ou "throttled"
+            pause: Segundos sem navegar após "throttled" (padrão: cooldown)
+        """
+        if not self.config["enabled"]:
+            return
+        cfg = self.config
+
+        def adjust(bucket, now):
+            if outcome == "ok":
+                bucket["streak"] += 1
+                if bucket["streak"] >= cfg["ramp_after"]:
+                    bucket["rate"] = min(cfg["max_rate"], bucket["rate"] + cfg["ramp_step"])
+                    bucket["streak"] = 0
+                return
+            bucket["streak"] = 0
+            if outcome == "throttled":
+                bucket["blocked_until"] = max(bucket["blocked_until"], now + (pause or cfg["cooldown"]))
+            if now - bucket["last_decrease"] < cfg["decrease_interval"]:
+                return
+            factor = cfg["slow_factor"] if outcome == "slow" else cfg["backoff"]
+            bucket["rate"] = max(cfg["min_rate"], bucket["rate"] * factor)
+            bucket["last_decrease"] = now
+
+        self._transaction(host_of(url), adjust)
+
+    def rate(self, url):
+        """Taxa atual (navegações/s) do host da URL."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT rate FROM buckets WHERE host = ?", (host_of(url),)).fetchone()
+        return row[0] if row else self.config["initial_rate"]
+
+    def classify(self, response, elapsed, final_url):
+        """
+        Returns:
+            (outcome, pause) para report()
+        """
+        if urlparse(final_url).path.startswith(LOGIN_PATH):
+            return "throttled", None
+        status = response.status if response is not None else 0
+        if status in THROTTLE_STATUS:
+            return "throttled", retry_after(response)
+        if status >= 500:
+            return "error", None
+        if elapsed > self.config["slow_navigation"]:
+            return "slow", None
+        return "ok", None
+
+    def navigate(self, page, url, on_wait=None, **kwargs):
+        """
+        page.goto respeitando e alimentando o limite do host.
+
+        Args:
+            page: Página do Playwright (sync)
+            url: URL de destino
+            on_wait: Chamado com os segundos de espera antes de dormir (para log)
+            **kwargs: Repassados a page.goto
+
+        Returns:
+            Response do page.goto
+        """
+        wait = self.reserve(url)
+        if wait > 0:
+            if on_wait:
+                on_wait(wait)
+            time.sleep(wait)
+        start = time.monotonic()
+        try:
+            response = page.goto(url, **kwargs)
+        except Exception:
+            self.report(url, "error")
+            raise
+        self.report(url, *self.classify(response, time.monotonic() - start, page.url))
+        return response
+
+    async def async_navigate(self, page, url, on_wait=None, **kwargs):
+        """
+        Versão de navigate para a API async do Playwright. As transações no
+        SQLite (que podem esperar pelo lock de outros processos) rodam numa
+        thread, fora do event loop.
+        """
+        wait = await asyncio.to_thread(self.reserve, url)
+        if wait > 0:
+            if on_wait:
+                on_wait(wait)
+            await asyncio.sleep(wait)
+        start = time.monotonic()
+        try:
+            response = await page.goto(url, **kwargs)
+        except Exception:
+            await asyncio.to_thread(self.report, url, "error")
+            raise
+        await asyncio.to_thread(self.report, url, *self.classify(response, time.monotonic() - start, page.url))
+        return response
+
+    def watch(self, page):
+        """
+        Reporta também os 429/5xx das requisições feitas pela página (XHR da API).
+        """
+        def on_response(response):
+            if response.status in THROTTLE_STATUS:
+                self.report(response.url, "throttled", retry_after(response))
+            elif response.status >= 500:
+                self.report(response.url, "error")
+
+        page.on("response", on_response)
+
+    def async_watch(self, page):
+        """Versão de watch para páginas async: report() roda fora do event loop."""
+        async def on_response(response):
+            if response.status in THROTTLE_STATUS:
+                await asyncio.to_thread(self.report, response.url, "throttled", retry_after(response))
+            elif response.status >= 500:
+                await asyncio.to_thread(self.report, response.url, "error")
+
+        page.on("response", on_response)
+
+# Limite compartilhado por todas as páginas deste processo (e, via SQLite, dos demais).
+# Não toca o disco até a primeira navegação.
+limiter = RateLimiter()
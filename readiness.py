@@ -0,0 +1,242 @@
+"""
+Esperas de prontidão baseadas em condições concretas da página.
+
+Substituem as pausas fixas (time.sleep) do fluxo de scraping: cada etapa
+espera apenas até a condição que realmente precisa (abas renderizadas,
+estatísticas preenchidas, comentários visíveis, rede ociosa), limitada por
+um timeout máximo. Na maioria das páginas isso leva bem menos de 1 segundo.
+O scroll segue a mesma ideia: termina quando o DOM para de mudar.
+
+A rede ociosa é medida por NetworkIdle, que conta as requisições em andamento:
+wait_for_load_state("networkidle") retorna na hora se a página já atingiu esse
+estado uma vez, mesmo com requisições novas (as do scroll) em curso.
+"""
+
+import time
+import asyncio
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from config import SEL, SCRAPING_CONFIG
+
+# Todos os atributos de estatística existem e já contêm o JSON das alternativas.
+# A cada verificação, os gabaritos já legíveis são guardados em
+# window.__qcGabaritos, para a extração usá-los mesmo depois da troca de aba
+# (sem uma ida e volta extra ao navegador só para ler o gabarito). Assim, se
+# algum card nunca fica pronto e a espera expira, os demais não perdem o gabarito.
+STATS_READY_JS = """
+(sel) => {
+    const gabaritos = window.__qcGabaritos || {};
+    let ready = true;
+    let found = 0;
+    document.querySelectorAll(sel.card).forEach(card => {
+        const num = card.querySelector(sel.num);
+        const el = card.querySelector(sel.statsAttr);
+        if (!el) return;
+        found++;
+        const raw = el.getAttribute('data-question-statistics-alternatives-statistics') || '';
+        if (raw.length <= 2) {
+            ready = false;
+            return;
+        }
+        if (!num) return;
+        try {
+            const correct = JSON.parse(raw).find(item => item.hit > 0);
+            if (correct) gabaritos[num.textContent.trim()] = "" + correct.id;
+        } catch (error) {}
+    });
+    window.__qcGabaritos = gabaritos;
+    return found > 0 && ready;
+}
+"""
+
+# Condições disponíveis: nome -> (tipo de espera, argumento)
+CONDITIONS = {
+    "tabs": ("selector", SEL["tab"]),
+    "statistics": ("function", SEL),
+    "comments": ("selector", SEL["commentText"]),
+}
+
+def _timeout_for(condition, timeout):
+    if timeout is not None:
+        return timeout
+    if condition == "comments":
+        return SCRAPING_CONFIG["comments_timeout"]
+    return SCRAPING_CONFIG["ready_timeout"]
+
+def wait_ready(page, condition, timeout=None):
+    """
+    Aguarda uma condição de prontidão da página.
+
+    Args:
+        page: Página do Playwright
+        condition: Uma das chaves de CONDITIONS ("tabs", "statistics", "comments")
+        timeout: Limite em ms (padrão: SCRAPING_CONFIG["ready_timeout"], ou o limite
+            próprio de "comments")
+
+    Returns:
+        True se a condição foi atingida, False se o timeout expirou
+    """
+    kind, arg = CONDITIONS[condition]
+    timeout = _timeout_for(condition, timeout)
+    try:
+        if kind == "selector":
+            page.wait_for_selector(arg, state="attached", timeout=timeout)
+        else:
+            page.wait_for_function(STATS_READY_JS, arg=arg, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+async def async_wait_ready(page, condition, timeout=None):
+    """
+    Versão assíncrona de wait_ready para páginas da playwright.async_api.
+    """
+    kind, arg = CONDITIONS[condition]
+    timeout = _timeout_for(condition, timeout)
+    try:
+        if kind == "selector":
+            await page.wait_for_selector(arg, state="attached", timeout=timeout)
+        else:
+            await page.wait_for_function(STATS_READY_JS, arg=arg, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+class NetworkIdle:
+    """
+    Requisições em andamento de uma página, via page.on("request") e
+    "requestfinished"/"requestfailed". Instalar antes da navegação.
+    """
+
+    # Intervalo (ms) entre verificações; na API síncrona os eventos da página
+    # só são entregues durante chamadas ao Playwright (page.wait_for_timeout)
+    POLL_MS = 50
+
+    def __init__(self, page=None):
+        self._pending = set()
+        self._last_activity = time.monotonic()
+        if page is not None:
+            self.attach(page)
+
+    def attach(self, page):
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+
+    def detach(self, page):
+        page.remove_listener("request", self._on_request)
+        page.remove_listener("requestfinished", self._on_done)
+        page.remove_listener("requestfailed", self._on_done)
+
+    def _on_request(self, request):
+        self._pending.add(request)
+        self._last_activity = time.monotonic()
+
+    def _on_done(self, request):
+        self._pending.discard(request)
+        self._last_activity = time.monotonic()
+
+    def idle_ms(self):
+        """Há quantos ms não há requisição em andamento (0 se há alguma)."""
+        if self._pending:
+            return 0
+        return (time.monotonic() - self._last_activity) * 1000
+
+    def _limits(self, idle_ms, timeout):
+        idle_ms = idle_ms or SCRAPING_CONFIG["network_idle_ms"]
+        timeout = timeout or SCRAPING_CONFIG["network_idle_timeout"]
+        return idle_ms, time.monotonic() + timeout / 1000
+
+    def wait(self, page, idle_ms=None, timeout=None):
+        """
+        Aguarda a página ficar idle_ms sem nenhuma requisição em andamento.
+
+        Args:
+            page: Página do Playwright em que o NetworkIdle está instalado
+            idle_ms: Janela sem requisições (padrão: SCRAPING_CONFIG["network_idle_ms"])
+            timeout: Limite em ms (padrão: SCRAPING_CONFIG["network_idle_timeout"])
+
+        Returns:
+            True se a rede ficou ociosa, False se o timeout expirou
+        """
+        idle_ms, deadline = self._limits(idle_ms, timeout)
+        while self.idle_ms() < idle_ms:
+            if time.monotonic() >= deadline:
+                return False
+            page.wait_for_timeout(self.POLL_MS)
+        return True
+
+    async def async_wait(self, page, idle_ms=None, timeout=None):
+        """Versão assíncrona de wait (os eventos chegam pelo event loop)."""
+        idle_ms, deadline = self._limits(idle_ms, timeout)
+        while self.idle_ms() < idle_ms:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(self.POLL_MS / 1000)
+        return True
+
+# Pula direto para o fim da página e observa mutações no DOM: sempre que a
+# altura cresce, pula de novo; retorna quando o DOM fica estável por quietMs.
+SCROLL_UNTIL_STABLE_JS = """
+async ({quietMs, timeoutMs, maxIter}) => {
+    const start = performance.now();
+    let lastMutation = start;
+    let iterations = 0;
+    let lastHeight = -1;
+    let converged = false;
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+    try {
+        while (performance.now() - start < timeoutMs) {
+            const h = document.body.scrollHeight;
+            if (h !== lastHeight) {
+                if (iterations >= maxIter) break;
+                window.scrollTo(0, h);
+                lastHeight = h;
+                iterations++;
+                lastMutation = performance.now();
+            }
+            await new Promise(r => setTimeout(r, 50));
+            if (performance.now() - lastMutation >= quietMs && document.body.scrollHeight === lastHeight) {
+                converged = true;
+                break;
+            }
+        }
+    } finally {
+        observer.disconnect();
+    }
+    return {
+        iterations: iterations,
+        elapsed: (performance.now() - start) / 1000,
+        height: document.body.scrollHeight,
+        converged: converged
+    };
+}
+"""
+
+def _scroll_args(quiet_ms, timeout, max_iter):
+    return {
+        "quietMs": quiet_ms or SCRAPING_CONFIG["scroll_quiet_ms"],
+        "timeoutMs": timeout or SCRAPING_CONFIG["scroll_timeout"],
+        "maxIter": max_iter or SCRAPING_CONFIG["scroll_max_iter"],
+    }
+
+def scroll_until_stable(page, quiet_ms=None, timeout=None, max_iter=None):
+    """
+    Rola até o fim e espera o conteúdo carregado sob demanda parar de chegar.
+
+    Args:
+        page: Página do Playwright
+        quiet_ms: Janela sem mutações no DOM que indica estabilidade
+        timeout: Limite total em ms
+        max_iter: Máximo de saltos para o fim da página
+
+    Returns:
+        Dicionário com iterations, elapsed (s), height (px) e converged
+    """
+    return page.evaluate(SCROLL_UNTIL_STABLE_JS, _scroll_args(quiet_ms, timeout, max_iter))
+
+async def async_scroll_until_stable(page, quiet_ms=None, timeout=None, max_iter=None):
+    """
+    Versão assíncrona de scroll_until_stable.
+    """
+    return await page.evaluate(SCROLL_UNTIL_STABLE_JS, _scroll_args(quiet_ms, timeout, max_iter))
@@ -0,0 +1,109 @@
+"""
+Filtro de requisições para o scraping.
+
+O scraper só lê texto do DOM e um atributo de estatística, então imagens,
+fontes, mídia e scripts de analytics são abortados via page.route antes de
+serem baixados. Os contadores permitem medir, por URL, quantas requisições
+foram bloqueadas; os bytes economizados são só uma estimativa por tipo
+(SCRAPING_CONFIG["blocked_bytes_estimate"]), já que a requisição abortada
+nunca recebe resposta e o tamanho real não é conhecido.
+"""
+
+from fnmatch import fnmatch
+from urllib.parse import urlparse
+from config import SCRAPING_CONFIG
+
+class ResourceFilter:
+    """
+    Aborta requisições por tipo de recurso ou padrão de host e conta o que bloqueou.
+    """
+
+    def __init__(self, blocked_types=None, blocked_hosts=None, estimated_bytes=None):
+        self.blocked_types = set(blocked_types if blocked_types is not None
+                                 else SCRAPING_CONFIG["blocked_resource_types"])
+        self.blocked_hosts = list(blocked_hosts if blocked_hosts is not None
+                                  else SCRAPING_CONFIG["blocked_hosts"])
+        self.estimated_bytes = (estimated_bytes if estimated_bytes is not None
+                                else SCRAPING_CONFIG["blocked_bytes_estimate"])
+        self.reset()
+
+    def reset(self):
+        """Zera os contadores (chamado no início de cada URL)."""
+        self.blocked = 0
+        self.estimated_bytes_saved = 0
+        self.by_type = {}
+
+    def should_block(self, request):
+        """
+        Decide se a requisição deve ser abortada.
+        """
+        if request.resource_type in self.blocked_types:
+            return True
+        host = urlparse(request.url).hostname or ""
+        return any(fnmatch(host, pattern) for pattern in self.blocked_hosts)
+
+    def _count(self, request):
+        resource_type = request.resource_type
+        self.blocked += 1
+        self.estimated_bytes_saved += self.estimated_bytes.get(resource_type, self.estimated_bytes.get("other", 0))
+        self.by_type[resource_type] = self.by_type.get(resource_type, 0) + 1
+
+    def handle(self, route):
+        """Handler de rota para a API síncrona."""
+        if self.should_block(route.request):
+            self._count(route.request)
+            route.abort()
+        else:
+            route.continue_()
+
+    async def handle_async(self, route):
+        """Handler de rota para a playwright.async_api."""
+        if self.should_block(route.request):
+            self._count(route.request)
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def snapshot(self, reset=True):
+        """
+        Retorna os contadores atuais e, por padrão, zera para a próxima URL.
+
+        Returns:
+            Dicionário com blocked, estimated_bytes_saved e by_type
+        """
+        stats = {"blocked": self.blocked, "estimated_bytes_saved": self.estimated_bytes_saved,
+                 "by_type": dict(self.by_type)}
+        if reset:
+            self.reset()
+        return stats
+
+    def describe(self, stats=None):
+        """
+        Texto curto para log: "12 bloqueadas (~480 KB estimados): image=10, font=2".
+        """
+        stats = stats or self.snapshot(reset=False)
+        detail = ", ".join(f"{t}={n}" for t, n in sorted(stats["by_type"].items()))
+        return f"{stats['blocked']} bloqueadas (~{stats['estimated_bytes_saved'] // 1024} KB estimados){': ' + detail if detail else ''}"
+
+def attach_resource_filter(page):
+    """
+    Instala o filtro na página se SCRAPING_CONFIG["resource_filter"] estiver ativo.
+
+    Returns:
+        ResourceFilter instalado, ou None se o filtro estiver desativado
+    """
+    if not SCRAPING_CONFIG["resource_filter"]:
+        return None
+    resource_filter = ResourceFilter()
+    page.route("**/*", resource_filter.handle)
+    return resource_filter
+
+async def async_attach_resource_filter(page):
+    """
+    Versão assíncrona de attach_resource_filter.
+    """
+    if not SCRAPING_CONFIG["resource_filter"]:
+        return None
+    resource_filter = ResourceFilter()
+    await page.route("**/*", resource_filter.handle_async)
+    return resource_filter
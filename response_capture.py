@@ -0,0 +1,167 @@
+"""
+Extração por captura de respostas de rede.
+
+Em vez de reconstruir as questões a partir do DOM renderizado (com seletores
+svelte frágeis, cliques em abas e scroll), escuta page.on("response") e guarda
+os JSON que o SPA busca para questões, estatísticas e comentários. Os payloads
+são convertidos nas mesmas Question da extração via DOM.
+
+O formato da API não é documentado, então o parser procura os campos pelos
+nomes listados em CAPTURE_CONFIG["fields"] em qualquer nível do JSON.
+"""
+
+from fnmatch import fnmatch
+from config import CAPTURE_CONFIG
+from freeplane import COMMENT_DIV
+from models import Question
+
+class ResponseCapture:
+    """
+    Acumula as respostas JSON relevantes de uma página.
+    """
+
+    def __init__(self, page=None, url_patterns=None):
+        self.url_patterns = url_patterns or CAPTURE_CONFIG["url_patterns"]
+        self._responses = []
+        if page is not None:
+            self.attach(page)
+
+    def attach(self, page):
+        page.on("response", self._on_response)
+
+    def detach(self, page):
+        page.remove_listener("response", self._on_response)
+
+    def reset(self):
+        self._responses = []
+
+    def _on_response(self, response):
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return
+        if "json" not in (response.headers.get("content-type") or ""):
+            return
+        if any(fnmatch(response.url, pattern) for pattern in self.url_patterns):
+            self._responses.append(response)
+
+    def collect(self):
+        """
+        Lê os corpos JSON das respostas capturadas (API síncrona).
+
+        Returns:
+            Lista de payloads decodificados
+        """
+        payloads = []
+        for response in self._responses:
+            try:
+                payloads.append(response.json())
+            except Exception:
+                continue
+        self.reset()
+        return payloads
+
+    async def collect_async(self):
+        """Versão assíncrona de collect()."""
+        payloads = []
+        for response in self._responses:
+            try:
+                payloads.append(await response.json())
+            except Exception:
+                continue
+        self.reset()
+        return payloads
+
+    def questions(self):
+        """Atalho: collect() + parse_payloads()."""
+        return parse_payloads(self.collect())
+
+def _walk(obj):
+    """Percorre todos os dicionários de um JSON."""
+    if isinstance(obj, dict):
+        yield obj
+        for value in obj.values():
+            yield from _walk(value)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from _walk(item)
+
+def _first(d, field):
+    for key in CAPTURE_CONFIG["fields"][field]:
+        if d.get(key) not in (None, "", []):
+            return d[key]
+    return None
+
+def _text(value):
+    """Converte valores aninhados (ex: {"name": ...}) em texto."""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return _text(value.get("name") or value.get("title") or value.get("description"))
+    if isinstance(value, list):
+        return ", ".join(filter(None, (_text(v) for v in value)))
+    return str(value).strip()
+
+def _answer_from_stats(stats):
+    if isinstance(stats, list):
+        for item in stats:
+            if isinstance(item, dict) and (item.get("hit") or 0) > 0:
+                return str(item.get("id", ""))
+    return ""
+
+def parse_payloads(payloads):
+    """
+    Converte os payloads capturados em questões.
+
+    Args:
+        payloads: JSON decodificados de questões, estatísticas e comentários
+
+    Returns:
+        Lista de Question, ordenada por gabarito como na extração via DOM
+    """
+    questions = {}
+    answers = {}
+    comments = {}
+
+    for payload in payloads:
+        for d in _walk(payload):
+            question_id = _first(d, "question_id")
+            statement = _first(d, "statement")
+            if statement is not None and _first(d, "id") is not None and "letter" not in d:
+                questions.setdefault(str(_first(d, "id")), d)
+                continue
+            if question_id is None:
+                continue
+            stats = _first(d, "statistics")
+            if stats is not None:
+                answer = _answer_from_stats(stats)
+                if answer:
+                    answers[str(question_id)] = answer
+                continue
+            body = _first(d, "comment")
+            if body is not None:
+                comments.setdefault(str(question_id), []).append(str(body))
+
+    parsed = []
+    for qid, d in questions.items():
+        answer = _text(_first(d, "answer")) or answers.get(qid, "") or _answer_from_stats(_first(d, "statistics"))
+        alternatives = []
+        for alt in _first(d, "alternatives") or []:
+            if isinstance(alt, dict):
+                letter = _text(alt.get("letter") or alt.get("id"))
+                body = _text(alt.get("body") or alt.get("text") or alt.get("statement"))
+                alternatives.append(f'<div class="d-block font-size-1">{letter}) {body}</div>')
+        inline_comments = [_text(c.get("body") or c.get("text")) if isinstance(c, dict) else _text(c)
+                           for c in _first(d, "comments") or []]
+        parsed.append(Question(
+            numero=_text(_first(d, "number")) or f"Q{qid}",
+            codigo=f"Q{qid}",
+            gabarito=answer,
+            titulo=_text(_first(d, "title")),
+            info=" ".join(filter(None, (_text(d.get(k)) for k in CAPTURE_CONFIG["fields"]["info"]))),
+            enunciado=_text(_first(d, "statement")).replace("\n", " "),
+            alternativas=alternatives,
+            comentarios=[f"{COMMENT_DIV}{c}</div>"
+                         for c in dict.fromkeys(inline_comments + comments.get(qid, [])) if c],
+        ))
+
+    parsed.sort(key=lambda q: q.gabarito)
+    return parsed
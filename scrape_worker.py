@@ -0,0 +1,137 @@
+"""
+Processos que consomem a fila de jobs de scraping (job_queue.py).
+
+Cada processo filho tira um job por vez da fila e o executa com o mesmo
+run_automation_thread da interface web; log, progresso e status chegam ao
+monitor pelo barramento de eventos (Redis). Cada filho usa o próprio Chromium
+compartilhado, numa porta CDP própria. O processo pai reinicia filhos que
+morrerem, devolvendo à fila o job que eles executavam (até max_attempts vezes;
+depois o job é marcado como falho). No SIGTERM o pai sinaliza aos filhos, por
+um Event compartilhado, que terminem o job atual e saiam.
+
+Os jobs não trazem credenciais: o login usa a sessão salva em output/ ou,
+se ela não servir, QC_EMAIL e QC_PASSWORD do ambiente (ou do .env).
+
+Uso:
+    python scrape_worker.py
+    python scrape_worker.py --processes 4
+    python scrape_worker.py --recover   # após uma queda, reenfileira jobs interrompidos
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import multiprocessing
+from dotenv import load_dotenv
+from config import BROWSER_SERVER_CONFIG, JOB_QUEUE_CONFIG
+
+def worker_loop(index, stop, current):
+    """
+    Loop de um processo filho: pega um job, executa, confirma.
+
+    current: buffer compartilhado com o pai, com o ID do job em execução
+    """
+    # Import tardio: cada filho cria seu próprio Flask app, log e barramento
+    import web_interface
+    from browser_server import SharedBrowser
+    from job_queue import open_queue
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Porta fixa configurada: uma por filho; com porta 0 o Chromium escolhe uma livre
+    port = BROWSER_SERVER_CONFIG["port"] and BROWSER_SERVER_CONFIG["port"] + index + 1
+    web_interface.shared_browser = SharedBrowser(port=port)
+    # Herdadas do pai (load_dotenv em main); nunca lidas da fila
+    email = os.getenv("QC_EMAIL")
+    password = os.getenv("QC_PASSWORD")
+    queue = open_queue()
+    print(f"[INFO] Worker {index} aguardando jobs ({type(queue).__name__})")
+
+    while not stop.is_set():
+        try:
+            job = queue.pop(timeout=5)
+        except Exception as e:
+            print(f"[ERROR] Worker {index}: falha ao ler a fila: {e}")
+            time.sleep(JOB_QUEUE_CONFIG["poll_interval"])
+            continue
+        if job is None:
+            continue
+
+        print(f"[INFO] Worker {index} executando job {job['id']} ({len(job['urls'])} URLs)")
+        current.value = job["id"].encode()
+        ok = web_interface.run_automation_thread(email, password, job["urls"], job["id"])
+        queue.ack(job, ok=ok)
+        current.value = b""
+
+    web_interface.shared_browser.stop()
+
+def release_job(queue, registry, job_id, attempts):
+    """
+    Devolve à fila o job de um filho que morreu, ou desiste dele após max_attempts.
+    """
+    attempts[job_id] = attempts.get(job_id, 0) + 1
+    if attempts[job_id] < JOB_QUEUE_CONFIG["max_attempts"]:
+        if queue.release(job_id, requeue=True):
+            registry.requeue(job_id)
+            print(f"[INFO] Job {job_id} devolvido à fila (tentativa {attempts[job_id]})")
+        return
+    queue.release(job_id, requeue=False)
+    registry.finish(job_id, error=f"Worker morreu {attempts[job_id]} vezes executando o job")
+    attempts.pop(job_id)
+    print(f"[ERROR] Job {job_id} descartado após {JOB_QUEUE_CONFIG['max_attempts']} tentativas")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Workers da fila de scraping")
+    parser.add_argument("--processes", type=int, default=JOB_QUEUE_CONFIG["workers"],
+                        help="Número de processos de scraping")
+    parser.add_argument("--recover", action="store_true",
+                        help="Devolve à fila jobs que ficaram em execução (use só sem outros workers ativos)")
+    args = parser.parse_args(argv)
+    load_dotenv()
+    if not (os.getenv("QC_EMAIL") and os.getenv("QC_PASSWORD")):
+        print("[WARNING] QC_EMAIL/QC_PASSWORD não definidos: só jobs com sessão salva válida vão funcionar")
+
+    from job_queue import open_queue
+    from job_registry import JobRegistry
+    queue = open_queue()
+    registry = JobRegistry()
+    if args.recover:
+        recovered = queue.recover()
+        print(f"[INFO] {recovered} job(s) interrompido(s) devolvido(s) à fila")
+
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    children = {}
+    current = {index: ctx.Array("c", 64) for index in range(args.processes)}
+    attempts = {}
+
+    def on_signal(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+
+    while not stop.is_set():
+        for index in range(args.processes):
+            child = children.get(index)
+            if child is None or not child.is_alive():
+                if child is not None:
+                    print(f"[WARNING] Worker {index} saiu (código {child.exitcode}); reiniciando")
+                    job_id = current[index].value.decode()
+                    if job_id:
+                        release_job(queue, registry, job_id, attempts)
+                        current[index].value = b""
+                child = ctx.Process(target=worker_loop, args=(index, stop, current[index]),
+                                    name=f"scrape-worker-{index}")
+                child.start()
+                children[index] = child
+        stop.wait(2)
+
+    print("[INFO] Encerrando workers (terminam o job atual)...")
+    for child in children.values():
+        child.join()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
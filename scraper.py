@@ -1,15 +1,28 @@
 import os
 import time
-import json
+import queue
+import argparse
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from config import LOGIN_URL, SEL, SCRAPING_CONFIG, OUTPUT_CONFIG, DEBUG_CONFIG
+from readiness import NetworkIdle, wait_ready, scroll_until_stable
+from resource_filter import attach_resource_filter
+from checkpoint import Checkpoint
+from freeplane import FreeplaneWriter
+from question_bank import QuestionBank
+from extraction import extract_questions, to_questions
+from planner import plan
+from question_cache import QuestionCache, FINGERPRINT_JS
+from response_capture import ResponseCapture
+from rate_limiter import limiter
+from session_store import SESSION_PATH, load_state, state_expired, validate_session_page, save_state
 
 # Importar o handler da interface web se disponível
 web_handler = None
 try:
-    from web_interface import WebSocketLogHandler
+    from event_bus import WebSocketLogHandler
     web_handler = WebSocketLogHandler
 except ImportError:
     pass
@@ -36,227 +49,96 @@ def add_screenshot(filename):
     if web_handler:
         web_handler.add_screenshot(filename)
 
-def set_running_status(running):
+def set_running_status(running, error=None):
     """
-    Define o status de execução na interface web.
+    Define o status de execução na interface web (error: motivo da falha, se houve).
     """
     if web_handler:
-        web_handler.set_running(running)
+        web_handler.set_running(running, error)
 
-def scroll_all(page, step=None, pause=None, max_iter=None):
+# Scripts executados na página - baseados nos bookmarklets. Ficam no nível do
+# módulo para serem compartilhados entre o motor síncrono e o assíncrono.
+CLICK_TAB_JS = """
+(text) => {
+    let found = false;
+    document.querySelectorAll('.tab').forEach(tab => {
+        if (tab.textContent.includes(text)) {
+            tab.click();
+            found = true;
+            console.log('Clicou na aba: ' + text);
+        }
+    });
+    return found;
+}
+"""
+
+def scroll_all(page, quiet_ms=None, timeout=None, max_iter=None):
     """
     Rola a página para carregar todo o conteúdo dinâmico.
+    Pula direto para o fim e encerra assim que o DOM fica estável.
     
     Args:
         page: Página do Playwright
-        step: Quantidade de pixels para rolar a cada iteração
-        pause: Tempo de pausa entre rolagens
-        max_iter: Número máximo de iterações
-    """
-    # Usa configurações padrão se não especificado
-    step = step or SCRAPING_CONFIG["scroll_step"]
-    pause = pause or SCRAPING_CONFIG["scroll_pause"]
-    max_iter = max_iter or SCRAPING_CONFIG["scroll_max_iter"]
-    
-    log_message(f"🔄 Iniciando scroll da página (step={step}, pause={pause}s, max_iter={max_iter})")
-    last = 0
-    for i in range(max_iter):
-        page.evaluate(f"window.scrollBy(0,{step});")
-        time.sleep(pause)
-        h = page.evaluate("document.body.scrollHeight")
-        if h == last:
-            log_message(f"✅ Scroll completo após {i+1} iterações (altura final: {h}px)")
-            break
-        last = h
-        if i % 10 == 0:  # Log a cada 10 iterações
-            log_message(f"   Scrolling... iteração {i+1}/{max_iter} (altura: {h}px)")
+        quiet_ms: Janela sem mutações no DOM que indica fim do carregamento
+        timeout: Limite total em ms
+        max_iter: Número máximo de saltos para o fim da página
+
+    Returns:
+        Dicionário com iterations, elapsed (s), height (px) e converged
+    """
+    log_message("🔄 Iniciando scroll da página (até o DOM estabilizar)")
+    stats = scroll_until_stable(page, quiet_ms, timeout, max_iter)
+    if stats["converged"]:
+        log_message(f"✅ Scroll completo após {stats['iterations']} iterações em {stats['elapsed']:.2f}s (altura final: {stats['height']}px)")
     else:
-        log_message(f"⚠️ Scroll atingiu limite máximo de {max_iter} iterações")
+        log_message(f"⚠️ Scroll não estabilizou: {stats['iterations']} iterações em {stats['elapsed']:.2f}s (altura: {stats['height']}px)")
+    return stats
 
 def click_tab(page, text):
     """
     Clica em uma aba específica baseada no texto.
-    Garante que a aba está visível e estável antes de clicar.
+    Garante que as abas estão renderizadas antes de clicar.
     Args:
         page: Página do Playwright
         text: Texto da aba a ser clicada
+
+    Returns:
+        True se a aba foi encontrada e clicada
     """
     log_message(f"🎯 Procurando aba '{text}'...")
     
-    # JavaScript para clicar na aba - baseado no bookmarklet
-    click_tab_js = f"""
-    (function() {{
-        let found = false;
-        document.querySelectorAll('.tab').forEach(tab => {{
-            if (tab.textContent.includes('{text}')) {{
-                tab.click();
-                found = true;
-                console.log('Clicou na aba: {text}');
-            }}
-        }});
-        return found;
-    }})();
-    """
-    
     try:
-        # Aguarda um pouco para garantir que as abas estão carregadas
-        time.sleep(1)
+        # Garante que as abas estão renderizadas antes de clicar
+        if not wait_ready(page, "tabs"):
+            log_message("⚠️ Abas não apareceram dentro do timeout", "WARNING")
         
-        result = page.evaluate(click_tab_js)
+        result = page.evaluate(CLICK_TAB_JS, text)
         if result:
             log_message(f"✅ Aba '{text}' clicada com sucesso!")
-            time.sleep(2)  # Aguarda o conteúdo da aba carregar
         else:
             log_message(f"⚠️ Aba '{text}' não encontrada")
-            
-        # Aguarda um pouco mais para estabilizar
-        time.sleep(1)
+        return result
         
     except Exception as e:
         log_message(f"❌ Erro ao clicar na aba '{text}': {e}", "ERROR")
+        return False
 
-def extract_gabarito_automatico(page):
-    """
-    Extrai o gabarito automaticamente usando estatísticas - baseado no bookmarklet
-    """
-    log_message("🎯 Extraindo gabaritos automaticamente...")
-    
-    extract_gabarito_js = """
-    (function() {
-        let respostas = [];
-        document.querySelectorAll('.mb-4').forEach((questao, index) => {
-            try {
-                let el = questao.querySelector('[data-question-statistics-alternatives-statistics]');
-                if (!el) return;
-                let stats = JSON.parse(el.getAttribute('data-question-statistics-alternatives-statistics'));
-                let correctAnswer = stats.find(item => item.hit > 0);
-                                
-                let numeroQuestaoEl = questao.querySelector('.index.text-center.font-weight-bold.border-right.pr-2.svelte-1i1uol');
-                let numeroQuestao = numeroQuestaoEl ? numeroQuestaoEl.textContent.trim().replace(/\\n/g, '') : (index + 1);
-                                
-                if (correctAnswer) {
-                    let alternativa = correctAnswer.id;
-                    respostas.push(`${numeroQuestao}:${alternativa}`);
-                }
-            } catch (error) {
-                console.error('Erro ao processar questão:', error);
-            }
-        });
-        
-        if (respostas.length > 0) {
-            let resultado = respostas.join(', ');
-            console.log('Gabaritos extraídos:', resultado);
-            return resultado;
-        } else {
-            console.log('Nenhuma resposta encontrada!');
-            return '';
-        }
-    })();
+def extract_all_data_with_javascript(page, skip=None):
     """
-    
-    try:
-        resultado = page.evaluate(extract_gabarito_js)
-        if resultado:
-            log_message(f"✅ Gabaritos extraídos: {resultado[:100]}..." if len(resultado) > 100 else f"✅ Gabaritos extraídos: {resultado}")
-            
-            # Converte para dicionário
-            gabarito_map = {}
-            for item in resultado.split(', '):
-                if ':' in item:
-                    num, alt = item.split(':')
-                    gabarito_map[num.strip()] = alt.strip()
-            
-            return gabarito_map
-        else:
-            log_message("⚠️ Nenhum gabarito encontrado")
-            return {}
-    except Exception as e:
-        log_message(f"❌ Erro ao extrair gabaritos: {e}", "ERROR")
-        return {}
+    Extrai todas as questões em uma única ida ao navegador.
 
-def extract_all_data_with_javascript(page, gabarito_map=None):
-    """
-    Extrai todos os dados usando JavaScript - baseado no bookmarklet de extração completa
-    """
-    log_message("🔍 Iniciando extração completa de dados com JavaScript...")
-    
-    # Se não foi fornecido gabarito, tenta extrair automaticamente
-    if not gabarito_map:
-        gabarito_map = {}
-    
-    # Converte o gabarito_map para string JavaScript
-    gabarito_js = json.dumps(gabarito_map) if gabarito_map else "{}"
-    
-    extract_all_js = f"""
-    (function() {{
-        let m = {gabarito_js};
-        let p = document.querySelectorAll(".mb-4");
-        let nodes = [];
-        
-        p.forEach(e => {{
-            let t = e.querySelector(".index.text-center.font-weight-bold.border-right.pr-2.svelte-1i1uol");
-            t = t ? t.textContent.trim() : "";
-            let n = m[t] ? "" + m[t] : "";
-            
-            // Se não tem gabarito no mapa, tenta extrair da estatística
-            if (n === "") {{
-                try {{
-                    let statsEl = e.querySelector("[data-question-statistics-alternatives-statistics]");
-                    if (statsEl) {{
-                        let stats = JSON.parse(statsEl.getAttribute("data-question-statistics-alternatives-statistics"));
-                        let correctAnswer = stats.find(item => item.hit > 0);
-                        if (correctAnswer) {{
-                            n = correctAnswer.id;
-                        }}
-                    }}
-                }} catch (error) {{
-                    console.error('Erro ao extrair estatística:', error);
-                }}
-            }}
-            
-            let o = e.querySelector(".title");
-            let l = o ? o.textContent.trim() : "";
-            let c = e.querySelector(".info.d-flex.flex-wrap.align-items-center.svelte-1i1uol");
-            let s = c ? c.textContent.trim().replace(/\\s+/g, " ") : "";
-            s.includes(l) && (s = s.replace(l, "").trim());
-            
-            let d = e.querySelector(".font-size-2.statement-container.svelte-18f2a5m");
-            let i = d ? d.innerHTML.trim().replace(/\\n/g, " ") : "";
-            let u = Array.from(e.querySelectorAll(".d-block.font-size-1")).map(e => e.outerHTML.trim()).join(" ");
-            let b = Array.from(e.querySelectorAll(".question-commentary-text.font-size-2")).map(e => e.outerHTML.trim()).join(" ") + u;
-            b = b.replace('<div class="question-commentary-text font-size-2">', '<div class="question-commentary-text font-size-2"><p>------------</p>');
-            
-            let h = e.querySelector(".question-commentary-text.font-size-2");
-            let x = "";
-            if (h) {{
-                let e_html = h.outerHTML.trim();
-                x = `<node MAX_WIDTH="40 cm"><richcontent TYPE="NODE"><html><head></head><body>${{e_html}}</body></html></richcontent></node>`;
-            }}
-            
-            let y = "E" === n ? ' style="background-color: #ffcccc;"' : "";
-            let v = [t, n, l, s].filter(Boolean).join(" | ");
-            let q = `<span${{y}}>${{v}}</span><br>${{i}}`;
-            let k = e.querySelector(".badge.badge-secondary.text-light.py-1.px-1.ml-2.font-size-1");
-            k = k ? k.outerHTML.trim() : "";
-            
-            let N = Array.from(e.querySelectorAll(".text.px-3.font-size-2.svelte-1tiqrp1")).map(e => e.outerHTML.replace('<div class="text px-3.font-size-2 svelte-1tiqrp1">', '<div class="text px-3 font-size-2 svelte-1tiqrp1">&#9830 ')).join("");
-            
-            if (q.trim() !== "") {{
-                let node = `<node MAX_WIDTH="40 cm"><richcontent TYPE="NODE"><html><head></head><body>${{q}}</body></html></richcontent><richcontent TYPE="NOTE" CONTENT-TYPE="xml/"><html><head></head><body>${{b}} | ${{k}}</body></html></richcontent>${{N ? `<node><richcontent TYPE="NODE"><html><head></head><body>${{N}}</body></html></richcontent></node>` : ""}}${{x}}</node>`;
-                nodes.push({{gabarito: n, conteudo: node}});
-            }}
-        }});
-        
-        // Ordena por gabarito
-        nodes.sort((a, b) => a.gabarito.localeCompare(b.gabarito));
-        
-        console.log(`Extraídos ${{nodes.length}} nódulos`);
-        return nodes;
-    }})();
+    Args:
+        page: Página do Playwright
+        skip: Códigos de questões a não extrair (já presentes no cache)
+
+    Returns:
+        Lista de Question, ordenada por gabarito
     """
+    log_message("🔍 Iniciando extração estruturada das questões...")
     
     try:
-        nodes = page.evaluate(extract_all_js)
+        records = extract_questions(page, skip)
+        nodes = to_questions(records)
         log_message(f"✅ Extraídos {len(nodes)} nódulos de dados!")
         return nodes
     except Exception as e:
@@ -313,12 +195,492 @@ def debug_page_elements(page, description=""):
         except Exception as e:
             log_message(f"  Button {i}: Error reading attributes - {e}")
 
-def main():
+def login(page, email, password):
+    """
+    Executa o fluxo de login completo na página informada.
+    Levanta exceção se o redirecionamento para o app não ocorrer.
+
+    Args:
+        page: Página do Playwright
+        email: E-mail da conta
+        password: Senha da conta
+    """
+    # === NOVO LOGIN PADRONIZADO ===
+    log_message("🔐 INICIANDO PROCESSO DE LOGIN...", "INFO")
+    log_message("1. Navegando para a página de login...", "INFO")
+    page.goto(LOGIN_URL, wait_until="domcontentloaded", timeout=60000)
+
+    log_message("2. Aguardando formulário de login...", "INFO")
+    try:
+        page.wait_for_selector("#login_form", state="visible", timeout=15000)
+        log_message("✓ Formulário de login encontrado!", "SUCCESS")
+    except Exception as form_error:
+        log_message(f"✗ Erro ao aguardar formulário: {form_error}", "WARNING")
+
+    log_message("3. Aguardando JavaScript carregar completamente...", "INFO")
+    time.sleep(3)
+    if DEBUG_CONFIG["verbose_logging"]:
+        debug_page_elements(page, "Página de login carregada")
+
+    log_message("4. Tentando aguardar pelo campo de email...", "INFO")
+    try:
+        page.wait_for_selector(SEL["email"], state="visible", timeout=10000)
+        email_element = page.locator(SEL["email"])
+        if email_element.is_enabled():
+            log_message("✓ Campo de email encontrado e habilitado!", "SUCCESS")
+        else:
+            log_message("⚠️ Campo de email encontrado mas não está habilitado", "WARNING")
+            time.sleep(2)
+    except Exception as wait_error:
+        log_message(f"✗ Erro ao aguardar campo de email: {wait_error}", "ERROR")
+        if DEBUG_CONFIG["verbose_logging"]:
+            debug_page_elements(page, "Após timeout aguardando campo de email")
+
+    log_message("5. Tentando preencher email...", "INFO")
+    try:
+        page.click(SEL["email"], timeout=10000)
+        time.sleep(0.5)
+        page.fill(SEL["email"], email, timeout=15000)
+        log_message("✓ Email preenchido com sucesso!", "SUCCESS")
+    except Exception as email_error:
+        log_message(f"✗ Erro ao preencher email: {email_error}", "ERROR")
+        alternative_selectors = [
+            'input[name="user[email]"]',
+            'input[type="text"][placeholder*="E-mail"]',
+            'input[type="email"]',
+            'input[name="email"]',
+            'input[name="login"]',
+            'input[placeholder*="email" i]',
+            'input[placeholder*="E-mail" i]'
+        ]
+        email_filled = False
+        for alt_selector in alternative_selectors:
+            try:
+                if page.locator(alt_selector).count() > 0:
+                    page.click(alt_selector, timeout=5000)
+                    time.sleep(0.5)
+                    page.fill(alt_selector, email, timeout=5000)
+                    log_message(f"✓ Email preenchido usando seletor alternativo: {alt_selector}", "SUCCESS")
+                    email_filled = True
+                    break
+            except Exception:
+                continue
+        if not email_filled:
+            raise Exception("Não foi possível preencher o campo de email")
+
+    log_message("6. Tentando preencher senha...", "INFO")
+    try:
+        page.click(SEL["password"], timeout=10000)
+        time.sleep(0.5)
+        page.fill(SEL["password"], password, timeout=15000)
+        log_message("✓ Senha preenchida com sucesso!", "SUCCESS")
+    except Exception as password_error:
+        log_message(f"✗ Erro ao preencher senha: {password_error}", "ERROR")
+        alternative_selectors = [
+            'input[name="user[password]"]',
+            'input[type="password"]',
+            'input[name="password"]',
+            'input[name="senha"]'
+        ]
+        password_filled = False
+        for alt_selector in alternative_selectors:
+            try:
+                if page.locator(alt_selector).count() > 0:
+                    page.click(alt_selector, timeout=5000)
+                    time.sleep(0.5)
+                    page.fill(alt_selector, password, timeout=5000)
+                    log_message(f"✓ Senha preenchida usando seletor alternativo: {alt_selector}", "SUCCESS")
+                    password_filled = True
+                    break
+            except Exception:
+                continue
+        if not password_filled:
+            raise Exception("Não foi possível preencher o campo de senha")
+
+    if DEBUG_CONFIG["verbose_logging"]:
+        debug_page_elements(page, "Após preencher credenciais")
+
+    log_message("7. Aguardando um momento antes de submeter...", "INFO")
+    time.sleep(2)
+
+    log_message("8. Tentando clicar no botão de login...", "INFO")
+    try:
+        page.click(SEL["submit"], timeout=10000)
+        log_message("✓ Botão de login clicado!", "SUCCESS")
+    except Exception as submit_error:
+        log_message(f"✗ Erro ao clicar no botão: {submit_error}", "ERROR")
+        alternative_selectors = [
+            'input[type="submit"][value="Entrar"]',
+            'button[type="submit"]',
+            'input[type="submit"]',
+            'button:has-text("Entrar")',
+            'button:has-text("Login")',
+            'button:has-text("Acessar")'
+        ]
+        submit_clicked = False
+        for alt_selector in alternative_selectors:
+            try:
+                if page.locator(alt_selector).count() > 0:
+                    page.click(alt_selector, timeout=5000)
+                    log_message(f"✓ Botão clicado usando seletor alternativo: {alt_selector}", "SUCCESS")
+                    submit_clicked = True
+                    break
+            except Exception:
+                continue
+        if not submit_clicked:
+            try:
+                page.keyboard.press("Enter")
+                log_message("✓ Pressionado Enter como alternativa", "SUCCESS")
+            except Exception:
+                raise Exception("Não foi possível submeter o formulário de login")
+
+    log_message("9. Aguardando redirecionamento...", "INFO")
+    try:
+        page.wait_for_url("**/app.qconcursos.com/**", timeout=60000)
+        log_message("✅ LOGIN REALIZADO COM SUCESSO!", "SUCCESS")
+        log_message(f"🔗 URL final: {page.url}", "SUCCESS")
+    except Exception as redirect_error:
+        log_message(f"✗ Erro no redirecionamento: {redirect_error}", "ERROR")
+        log_message(f"URL atual: {page.url}", "ERROR")
+        error_selectors = [
+            '.alert-danger',
+            '.error',
+            '[class*="error"]',
+            '[class*="alert"]'
+        ]
+        for error_sel in error_selectors:
+            try:
+                if page.locator(error_sel).count() > 0:
+                    error_text = page.locator(error_sel).first.inner_text()
+                    log_message(f"Mensagem de erro encontrada: {error_text}", "ERROR")
+            except Exception:
+                pass
+        raise Exception("Falha no login - redirecionamento não ocorreu")
+    # === FIM DO NOVO LOGIN PADRONIZADO ===
+
+def new_scraping_page(browser, storage_state=None):
+    """
+    Cria um contexto (opcionalmente autenticado) e uma página com os headers padrão.
+
+    Args:
+        browser: Navegador do Playwright
+        storage_state: Estado de sessão (cookies/localStorage) a reutilizar
+
+    Returns:
+        Tupla (context, page)
+    """
+    context = browser.new_context(
+        user_agent=SCRAPING_CONFIG["user_agent"],
+        storage_state=storage_state
+    )
+    page = context.new_page()
+    # 429/5xx das requisições da página também reduzem a taxa do host
+    limiter.watch(page)
+
+    # Configura headers adicionais se especificado
+    if SCRAPING_CONFIG["user_agent"]:
+        page.set_extra_http_headers({
+            "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
+        })
+    return context, page
+
+def open_session(browser, email, password):
+    """
+    Abre uma página autenticada, reaproveitando a sessão salva quando possível.
+
+    A sessão de SESSION_PATH é descartada sem abrir página se os cookies já
+    venceram; caso contrário é confirmada abrindo o dashboard. O login completo
+    só roda quando a sessão não serve, e o estado novo é salvo atomicamente.
+
+    Returns:
+        Tupla (context, page) já autenticada
+    """
+    state = load_state(SESSION_PATH)
+    if state is not None:
+        if state_expired(state):
+            log_message("⌛ Cookies da sessão salva expiraram", "INFO")
+        else:
+            context, page = new_scraping_page(browser, state)
+            if validate_session_page(page):
+                log_message("♻️ Sessão salva reutilizada - login não necessário!", "SUCCESS")
+                return context, page
+            log_message("⌛ Sessão salva foi recusada pelo site", "INFO")
+            context.close()
+
+    if not email or not password:
+        raise RuntimeError("Defina QC_EMAIL e QC_PASSWORD no arquivo .env")
+
+    context, page = new_scraping_page(browser)
+    try:
+        login(page, email, password)
+    except Exception:
+        save_debug_artifacts(page, "login_error")
+        raise
+
+    try:
+        save_state(context, SESSION_PATH)
+        log_message(f"💾 Sessão salva em {SESSION_PATH}", "INFO")
+    except Exception as save_error:
+        log_message(f"⚠️ Erro ao salvar sessão: {save_error}", "WARNING")
+    return context, page
+
+def launch_browser(p):
+    """
+    Inicia o Chromium com as configurações anti-detecção.
+    """
+    return p.chromium.launch(
+        headless=SCRAPING_CONFIG["headless"],
+        args=['--disable-blink-features=AutomationControlled']  # Reduz detecção de automação
+    )
+
+def save_debug_artifacts(page, prefix):
+    """
+    Salva screenshot e HTML bruto da página para debug, conforme DEBUG_CONFIG.
+
+    Args:
+        page: Página do Playwright
+        prefix: Prefixo dos arquivos gerados (ex: "error_url_3")
+    """
+    if DEBUG_CONFIG["screenshot_on_error"]:
+        try:
+            screenshot_path = f"{prefix}.png"
+            page.screenshot(path=screenshot_path)
+            log_message(f"Screenshot salvo em {screenshot_path}", "INFO")
+            add_screenshot(screenshot_path)
+        except Exception as screenshot_error:
+            log_message(f"Erro ao salvar screenshot: {screenshot_error}", "ERROR")
+
+    if DEBUG_CONFIG["save_raw_html"]:
+        try:
+            html_content = page.content()
+            with open(f"{prefix}.html", "w", encoding="utf-8") as f:
+                f.write(html_content)
+            log_message(f"HTML bruto salvo em {prefix}.html", "INFO")
+        except Exception as html_error:
+            log_message(f"Erro ao salvar HTML: {html_error}", "ERROR")
+
+def navigate(page, url):
+    """
+    Abre a URL passando pelo limitador de taxa do host, que se ajusta à resposta.
+    """
+    limiter.navigate(
+        page, url,
+        on_wait=lambda wait: log_message(f"⏳ Aguardando {wait:.1f}s (limite de {limiter.rate(url):.2f} navegações/s)"),
+        wait_until="domcontentloaded", timeout=60000,
+    )
+
+def extract_via_network(page, url):
+    """
+    Extrai as questões capturando o JSON que o SPA busca, sem abas nem scroll.
+
+    Args:
+        page: Página do Playwright já autenticada
+        url: URL de questões a processar
+
+    Returns:
+        Lista de Question capturadas
+    """
+    capture = ResponseCapture(page)
+    network = NetworkIdle(page)
+    try:
+        navigate(page, url)
+        # Espera as respostas da API que o SPA dispara após o carregamento
+        network.wait(page)
+        return capture.questions()
+    finally:
+        network.detach(page)
+        capture.detach(page)
+
+def extract_with_cache(page, question_cache):
+    """
+    Extrai só as questões novas ou alteradas e completa com as questões do cache.
+
+    Returns:
+        Lista de Question da página (extraídas + reaproveitadas), ordenada por gabarito
+    """
+    fingerprints = page.evaluate(FINGERPRINT_JS, SEL)
+    cached = question_cache.lookup(fingerprints)
+    log_message(f"🗃️ Cache: {len(cached)} de {len(fingerprints)} questões reaproveitadas", "INFO")
+    nodes = extract_all_data_with_javascript(page, skip=cached.keys())
+    question_cache.store(nodes, fingerprints)
+    nodes.extend(cached.values())
+    nodes.sort(key=lambda q: q.gabarito)
+    return nodes
+
+def process_url(page, url, index, resource_filter=None, mode=None, question_cache=None):
+    """
+    Executa os passos de raspagem (abas, gabarito, scroll, extração) para uma URL.
+
+    Args:
+        page: Página do Playwright já autenticada
+        url: URL de questões a processar
+        index: Posição da URL na lista (usada nos arquivos de debug)
+        resource_filter: ResourceFilter instalado na página, para reportar bloqueios
+        mode: "dom" ou "network" (padrão: SCRAPING_CONFIG["extraction_mode"])
+        question_cache: QuestionCache para reaproveitar questões já extraídas
+
+    Returns:
+        Lista de Question extraídas; None em caso de erro
+    """
+    mode = mode or SCRAPING_CONFIG["extraction_mode"]
+    if resource_filter:
+        resource_filter.reset()
+    network = None
+    try:
+        if mode == "network":
+            log_message("📡 Capturando respostas JSON da página...")
+            nodes = extract_via_network(page, url)
+            if nodes:
+                log_message(f"✅ EXTRAÍDOS {len(nodes)} NÓDULOS DA REDE!", "SUCCESS")
+                return nodes
+            log_message("⚠️ Nenhuma questão nas respostas capturadas; usando extração via DOM", "WARNING")
+
+        # Navega para a URL (respeitando o limite adaptativo do host)
+        network = NetworkIdle(page)
+        navigate(page, url)
+        log_message("✅ Página carregada com sucesso!", "SUCCESS")
+        
+        # PASSO 1: Clica na aba "Estatísticas"; a espera guarda os gabaritos na página
+        log_message("📊 PASSO 1: Acessando aba de Estatísticas...")
+        if click_tab(page, "Estatísticas") and not wait_ready(page, "statistics"):
+            log_message("⚠️ Estatísticas não carregaram dentro do timeout", "WARNING")
+        
+        # PASSO 3: Clica na aba "Comentários de alunos"
+        log_message("💬 PASSO 3: Acessando aba de Comentários de alunos...")
+        if click_tab(page, "Comentários de alunos") and not wait_ready(page, "comments"):
+            log_message("⚠️ Comentários não apareceram dentro do timeout", "WARNING")
+        
+        # PASSO 4: Scroll completo para carregar todos os comentários
+        log_message("📜 PASSO 4: Carregando todos os comentários (scroll completo)...")
+        scroll_all(page)
+        
+        # Aguarda as requisições disparadas pelo scroll terminarem
+        if not network.wait(page):
+            log_message("⚠️ Rede não ficou ociosa dentro do timeout", "WARNING")
+        
+        # PASSO 5: Extração completa usando JavaScript
+        log_message("🔍 PASSO 5: Executando extração completa de dados...")
+        if question_cache:
+            nodes = extract_with_cache(page, question_cache)
+        else:
+            nodes = extract_all_data_with_javascript(page)
+        
+        if nodes:
+            log_message(f"✅ EXTRAÍDOS {len(nodes)} NÓDULOS DE DADOS!", "SUCCESS")
+        else:
+            log_message("⚠️ Nenhum nódulo extraído desta URL", "WARNING")
+        return nodes
+        
+    except Exception as e:
+        log_message(f"❌ Erro ao processar URL: {e}", "ERROR")
+        save_debug_artifacts(page, f"error_url_{index}")
+        return None
+    finally:
+        if network:
+            network.detach(page)
+        if resource_filter:
+            log_message(f"🚫 Requisições filtradas: {resource_filter.describe()}")
+
+def run_worker_pool(urls, storage_state, workers, mode=None, on_result=None, question_cache=None):
+    """
+    Processa as URLs em paralelo com N workers que compartilham a mesma sessão.
+
+    Cada worker roda em sua própria thread com seu próprio driver do Playwright
+    (a API síncrona não pode ser compartilhada entre threads) e abre um contexto
+    a partir do storage_state do login único feito em main().
+
+    Args:
+        urls: Lista de URLs a processar
+        storage_state: Estado de sessão retornado por context.storage_state()
+        workers: Número de páginas concorrentes
+        mode: Modo de extração repassado a process_url
+        on_result: Callback (url, nodes) chamado a cada URL concluída com sucesso
+        question_cache: QuestionCache compartilhado entre os workers
+
+    Returns:
+        Lista de nós na mesma ordem das URLs
+    """
+    total = len(urls)
+    work = queue.Queue()
+    for i, url in enumerate(urls, 1):
+        work.put((i, url))
+
+    results = {}
+    lock = threading.Lock()
+    done = [0]
+
+    def worker(worker_id):
+        with sync_playwright() as p:
+            browser = launch_browser(p)
+            try:
+                context, page = new_scraping_page(browser, storage_state)
+                resource_filter = attach_resource_filter(page)
+                while True:
+                    try:
+                        i, url = work.get_nowait()
+                    except queue.Empty:
+                        break
+                    log_message(f"📄 [worker {worker_id}] PROCESSANDO URL {i}/{total}", "INFO")
+                    log_message(f"🔗 [worker {worker_id}] Navegando para: {url[:80]}...", "INFO")
+                    with lock:
+                        update_progress(done[0], total, f"[worker {worker_id}] {url}")
+
+                    nodes = process_url(page, url, i, resource_filter, mode, question_cache)
+                    if nodes is not None and on_result:
+                        on_result(url, nodes)
+
+                    with lock:
+                        results[i] = nodes or []
+                        done[0] += 1
+                        update_progress(done[0], total, f"[worker {worker_id}] {url}")
+
+                context.close()
+            finally:
+                browser.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(n,), name=f"scraper-worker-{n}", daemon=True)
+        for n in range(1, min(workers, total) + 1)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    all_nodes = []
+    for i in sorted(results):
+        all_nodes.extend(results[i])
+    return all_nodes
+
+def parse_args(argv=None):
+    """
+    Lê os argumentos de linha de comando do scraper.
+    """
+    parser = argparse.ArgumentParser(description="QConcursos Scraper")
+    parser.add_argument("--workers", type=int, default=SCRAPING_CONFIG["workers"],
+                        help="Número de páginas processando URLs em paralelo")
+    parser.add_argument("--expand-pages", action="store_true", default=SCRAPING_CONFIG["expand_pagination"],
+                        help="Expande cada filtro em todas as suas páginas antes do scraping")
+    parser.add_argument("--mode", choices=["dom", "network"], default=SCRAPING_CONFIG["extraction_mode"],
+                        help="Extração via DOM (abas + scroll) ou captura do JSON da API")
+    parser.add_argument("--resume", action="store_true",
+                        help="Retoma a execução anterior pulando as URLs já gravadas no checkpoint")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignora o cache de questões e extrai tudo de novo")
+    parser.add_argument("--engine", choices=["sync", "async"], default=SCRAPING_CONFIG["engine"],
+                        help="Motor de scraping: threads com API síncrona ou asyncio")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """
     Função principal que executa todo o processo de scraping.
     """
+    args = parse_args(argv)
+
     # Marca o início da execução
     set_running_status(True)
+    error = None
     
     try:
         # Carrega variáveis de ambiente
@@ -326,9 +688,6 @@ def main():
         email = os.getenv("QC_EMAIL")
         password = os.getenv("QC_PASSWORD")
         
-        if not email or not password:
-            raise RuntimeError("Defina QC_EMAIL e QC_PASSWORD no arquivo .env")
-
         # Lê URLs do arquivo
         urls = [u.strip() for u in Path("urls.txt").read_text().splitlines() if u.strip()]
 
@@ -340,323 +699,111 @@ def main():
         screenshots_dir = Path("screenshots")
         screenshots_dir.mkdir(exist_ok=True)
 
+        workers = max(1, args.workers)
         log_message("🚀 INICIANDO SCRAPING COMPLETO DO QCONCURSOS...")
-        log_message(f"📊 Total de URLs a processar: {len(urls)}")
+        log_message(f"📊 Total de URLs a processar: {len(urls)} (workers: {workers}, motor: {args.engine})")
         
         # Atualiza progresso inicial
         update_progress(0, len(urls))
         
+        storage_state = None
+
         with sync_playwright() as p:
             # Inicia o navegador com configurações anti-detecção
-            browser = p.chromium.launch(
-                headless=SCRAPING_CONFIG["headless"],
-                args=['--disable-blink-features=AutomationControlled']  # Reduz detecção de automação
-            )
-            context = browser.new_context(
-                user_agent=SCRAPING_CONFIG["user_agent"]
-            )
-            page = context.new_page()
-            
-            # Configura headers adicionais se especificado
-            if SCRAPING_CONFIG["user_agent"]:
-                page.set_extra_http_headers({
-                    "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
-                })
+            browser = launch_browser(p)
 
             try:
-                # === NOVO LOGIN PADRONIZADO ===
-                log_message("🔐 INICIANDO PROCESSO DE LOGIN...", "INFO")
-                log_message("1. Navegando para a página de login...", "INFO")
-                page.goto(LOGIN_URL, wait_until="domcontentloaded", timeout=60000)
-
-                log_message("2. Aguardando formulário de login...", "INFO")
-                try:
-                    page.wait_for_selector("#login_form", state="visible", timeout=15000)
-                    log_message("✓ Formulário de login encontrado!", "SUCCESS")
-                except Exception as form_error:
-                    log_message(f"✗ Erro ao aguardar formulário: {form_error}", "WARNING")
-
-                log_message("3. Aguardando JavaScript carregar completamente...", "INFO")
-                time.sleep(3)
-                if DEBUG_CONFIG["verbose_logging"]:
-                    debug_page_elements(page, "Página de login carregada")
-
-                log_message("4. Tentando aguardar pelo campo de email...", "INFO")
-                try:
-                    page.wait_for_selector(SEL["email"], state="visible", timeout=10000)
-                    email_element = page.locator(SEL["email"])
-                    if email_element.is_enabled():
-                        log_message("✓ Campo de email encontrado e habilitado!", "SUCCESS")
-                    else:
-                        log_message("⚠️ Campo de email encontrado mas não está habilitado", "WARNING")
-                        time.sleep(2)
-                except Exception as wait_error:
-                    log_message(f"✗ Erro ao aguardar campo de email: {wait_error}", "ERROR")
-                    if DEBUG_CONFIG["verbose_logging"]:
-                        debug_page_elements(page, "Após timeout aguardando campo de email")
-
-                log_message("5. Tentando preencher email...", "INFO")
-                try:
-                    page.click(SEL["email"], timeout=10000)
-                    time.sleep(0.5)
-                    page.fill(SEL["email"], email, timeout=15000)
-                    log_message("✓ Email preenchido com sucesso!", "SUCCESS")
-                except Exception as email_error:
-                    log_message(f"✗ Erro ao preencher email: {email_error}", "ERROR")
-                    alternative_selectors = [
-                        'input[name="user[email]"]',
-                        'input[type="text"][placeholder*="E-mail"]',
-                        'input[type="email"]',
-                        'input[name="email"]',
-                        'input[name="login"]',
-                        'input[placeholder*="email" i]',
-                        'input[placeholder*="E-mail" i]'
-                    ]
-                    email_filled = False
-                    for alt_selector in alternative_selectors:
-                        try:
-                            if page.locator(alt_selector).count() > 0:
-                                page.click(alt_selector, timeout=5000)
-                                time.sleep(0.5)
-                                page.fill(alt_selector, email, timeout=5000)
-                                log_message(f"✓ Email preenchido usando seletor alternativo: {alt_selector}", "SUCCESS")
-                                email_filled = True
-                                break
-                        except Exception:
-                            continue
-                    if not email_filled:
-                        raise Exception("Não foi possível preencher o campo de email")
-
-                log_message("6. Tentando preencher senha...", "INFO")
-                try:
-                    page.click(SEL["password"], timeout=10000)
-                    time.sleep(0.5)
-                    page.fill(SEL["password"], password, timeout=15000)
-                    log_message("✓ Senha preenchida com sucesso!", "SUCCESS")
-                except Exception as password_error:
-                    log_message(f"✗ Erro ao preencher senha: {password_error}", "ERROR")
-                    alternative_selectors = [
-                        'input[name="user[password]"]',
-                        'input[type="password"]',
-                        'input[name="password"]',
-                        'input[name="senha"]'
-                    ]
-                    password_filled = False
-                    for alt_selector in alternative_selectors:
-                        try:
-                            if page.locator(alt_selector).count() > 0:
-                                page.click(alt_selector, timeout=5000)
-                                time.sleep(0.5)
-                                page.fill(alt_selector, password, timeout=5000)
-                                log_message(f"✓ Senha preenchida usando seletor alternativo: {alt_selector}", "SUCCESS")
-                                password_filled = True
-                                break
-                        except Exception:
-                            continue
-                    if not password_filled:
-                        raise Exception("Não foi possível preencher o campo de senha")
-
-                if DEBUG_CONFIG["verbose_logging"]:
-                    debug_page_elements(page, "Após preencher credenciais")
-
-                log_message("7. Aguardando um momento antes de submeter...", "INFO")
-                time.sleep(2)
-
-                log_message("8. Tentando clicar no botão de login...", "INFO")
-                try:
-                    page.click(SEL["submit"], timeout=10000)
-                    log_message("✓ Botão de login clicado!", "SUCCESS")
-                except Exception as submit_error:
-                    log_message(f"✗ Erro ao clicar no botão: {submit_error}", "ERROR")
-                    alternative_selectors = [
-                        'input[type="submit"][value="Entrar"]',
-                        'button[type="submit"]',
-                        'input[type="submit"]',
-                        'button:has-text("Entrar")',
-                        'button:has-text("Login")',
-                        'button:has-text("Acessar")'
-                    ]
-                    submit_clicked = False
-                    for alt_selector in alternative_selectors:
-                        try:
-                            if page.locator(alt_selector).count() > 0:
-                                page.click(alt_selector, timeout=5000)
-                                log_message(f"✓ Botão clicado usando seletor alternativo: {alt_selector}", "SUCCESS")
-                                submit_clicked = True
-                                break
-                        except Exception:
-                            continue
-                    if not submit_clicked:
-                        try:
-                            page.keyboard.press("Enter")
-                            log_message("✓ Pressionado Enter como alternativa", "SUCCESS")
-                        except Exception:
-                            raise Exception("Não foi possível submeter o formulário de login")
-
-                log_message("9. Aguardando redirecionamento...", "INFO")
-                try:
-                    page.wait_for_url("**/app.qconcursos.com/**", timeout=60000)
-                    log_message("✅ LOGIN REALIZADO COM SUCESSO!", "SUCCESS")
-                    log_message(f"🔗 URL final: {page.url}", "SUCCESS")
-                except Exception as redirect_error:
-                    log_message(f"✗ Erro no redirecionamento: {redirect_error}", "ERROR")
-                    log_message(f"URL atual: {page.url}", "ERROR")
-                    error_selectors = [
-                        '.alert-danger',
-                        '.error',
-                        '[class*="error"]',
-                        '[class*="alert"]'
-                    ]
-                    for error_sel in error_selectors:
-                        try:
-                            if page.locator(error_sel).count() > 0:
-                                error_text = page.locator(error_sel).first.inner_text()
-                                log_message(f"Mensagem de erro encontrada: {error_text}", "ERROR")
-                        except Exception:
-                            pass
-                    raise Exception("Falha no login - redirecionamento não ocorreu")
-                # === FIM DO NOVO LOGIN PADRONIZADO ===
-
+                context, page = open_session(browser, email, password)
             except Exception as login_error:
                 log_message(f"❌ FALHA NO LOGIN: {login_error}", "ERROR")
                 log_message("🔒 SESSÃO NÃO FOI ESTABELECIDA", "ERROR")
-                
-                # Screenshot de debug
-                if DEBUG_CONFIG["screenshot_on_error"]:
-                    try:
-                        screenshot_path = "login_error.png"
-                        page.screenshot(path=screenshot_path)
-                        log_message("Screenshot de erro salvo em login_error.png", "INFO")
-                        add_screenshot("login_error.png")
-                    except Exception as screenshot_error:
-                        log_message(f"Erro ao salvar screenshot: {screenshot_error}", "ERROR")
-                
-                # Salva HTML bruto
-                if DEBUG_CONFIG["save_raw_html"]:
-                    try:
-                        html_content = page.content()
-                        with open("login_error.html", "w", encoding="utf-8") as f:
-                            f.write(html_content)
-                        log_message("HTML bruto salvo em login_error.html", "INFO")
-                    except Exception as html_error:
-                        log_message(f"Erro ao salvar HTML: {html_error}", "ERROR")
-                
                 browser.close()
                 raise
 
-            all_nodes = []
-            
+            if args.expand_pages:
+                log_message("🧭 Expandindo paginação dos filtros...", "INFO")
+                urls = plan(page, urls, log_message)
+                log_message(f"📊 Total de páginas a processar: {len(urls)}", "INFO")
+                update_progress(0, len(urls))
+
+            # Cada URL concluída vai para o checkpoint assim que é extraída
+            checkpoint = Checkpoint(out_dir / OUTPUT_CONFIG["checkpoint_file"])
+            if args.resume:
+                completed = checkpoint.load()
+                pending = [u for u in urls if u not in completed]
+                log_message(f"♻️ Retomando: {len(urls) - len(pending)} URLs já concluídas, {len(pending)} pendentes", "INFO")
+            else:
+                checkpoint.reset()
+                pending = urls
+            update_progress(len(urls) - len(pending), len(urls))
+
+            question_cache = None
+            if SCRAPING_CONFIG["question_cache"] and not args.no_cache:
+                question_cache = QuestionCache(out_dir / OUTPUT_CONFIG["cache_file"])
+
             # Processa cada URL
             log_message("🚀 INICIANDO PROCESSO COMPLETO DE RASPAGEM DE DADOS", "SUCCESS")
-            for i, url in enumerate(urls, 1):
-                log_message(f"📄 PROCESSANDO URL {i}/{len(urls)}", "INFO")
-                log_message(f"🔗 Navegando para: {url[:80]}...", "INFO")
-                update_progress(i-1, len(urls), url)
-                
-                try:
-                    # Navega para a URL
-                    page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                    log_message("✅ Página carregada com sucesso!", "SUCCESS")
-                    
-                    # Aguarda a página estabilizar
-                    time.sleep(3)
-                    
-                    # PASSO 1: Clica na aba "Estatísticas" para extrair gabaritos
-                    log_message("📊 PASSO 1: Acessando aba de Estatísticas...")
-                    click_tab(page, "Estatísticas")
-                    time.sleep(2)  # Aguarda carregar
-                    
-                    # PASSO 2: Extrai gabaritos automaticamente
-                    log_message("🎯 PASSO 2: Extraindo gabaritos automaticamente...")
-                    gabarito_map = extract_gabarito_automatico(page)
-                    
-                    # PASSO 3: Clica na aba "Comentários de alunos"
-                    log_message("💬 PASSO 3: Acessando aba de Comentários de alunos...")
-                    click_tab(page, "Comentários de alunos")
-                    time.sleep(3)  # Aguarda carregar comentários
-                    
-                    # PASSO 4: Scroll completo para carregar todos os comentários
-                    log_message("📜 PASSO 4: Carregando todos os comentários (scroll completo)...")
-                    scroll_all(page, 
-                              step=SCRAPING_CONFIG["scroll_step"], 
-                              pause=SCRAPING_CONFIG["scroll_pause"], 
-                              max_iter=SCRAPING_CONFIG["scroll_max_iter"])
-                    
-                    # Aguarda um pouco mais para garantir que tudo carregou
-                    time.sleep(2)
-                    
-                    # PASSO 5: Extração completa usando JavaScript
-                    log_message("🔍 PASSO 5: Executando extração completa de dados...")
-                    nodes = extract_all_data_with_javascript(page, gabarito_map)
-                    
-                    if nodes:
-                        all_nodes.extend(nodes)
-                        log_message(f"✅ EXTRAÍDOS {len(nodes)} NÓDULOS DE DADOS!", "SUCCESS")
-                        log_message(f"📊 Total acumulado: {len(all_nodes)} nódulos", "INFO")
-                    else:
-                        log_message("⚠️ Nenhum nódulo extraído desta URL", "WARNING")
-                    
-                    update_progress(i, len(urls))
-                    
-                    # Pausa entre URLs
-                    if i < len(urls):  # Não pausa na última URL
-                        log_message(f"⏳ Aguardando {SCRAPING_CONFIG['url_pause']}s antes da próxima URL...")
-                        time.sleep(SCRAPING_CONFIG['url_pause'])
-                    
-                except Exception as e:
-                    log_message(f"❌ Erro ao processar URL: {e}", "ERROR")
-                    
-                    # Screenshot de debug se habilitado
-                    if DEBUG_CONFIG["screenshot_on_error"]:
-                        try:
-                            error_screenshot = f"error_url_{i}.png"
-                            page.screenshot(path=error_screenshot)
-                            log_message(f"Screenshot salvo em {error_screenshot}", "INFO")
-                            add_screenshot(error_screenshot)
-                        except Exception as screenshot_error:
-                            log_message(f"Erro ao salvar screenshot: {screenshot_error}", "ERROR")
-                    
-                    # Salva HTML bruto se habilitado
-                    if DEBUG_CONFIG["save_raw_html"]:
-                        try:
-                            html_content = page.content()
-                            with open(f"error_url_{i}.html", "w", encoding="utf-8") as f:
-                                f.write(html_content)
-                            log_message(f"HTML bruto salvo em error_url_{i}.html", "INFO")
-                        except Exception as html_error:
-                            log_message(f"Erro ao salvar HTML: {html_error}", "ERROR")
-                    
-                    continue
-
-            # Gera o XML Freeplane
-            if all_nodes:
-                log_message("📋 INICIANDO FORMATAÇÃO DOS DADOS...", "INFO")
-                log_message("🔄 Construindo arquivo XML do Freeplane...", "INFO")
-                
-                # Constrói o XML manualmente baseado na estrutura do bookmarklet
-                xml_content = '<map version="freeplane 1.9.8"><node LOCALIZED_TEXT="new_mindmap">'
-                for node in all_nodes:
-                    xml_content += node['conteudo']
-                xml_content += '</node></map>'
-                
-                output_file = out_dir / OUTPUT_CONFIG["filename"]
-                output_file.write_text(xml_content, encoding=OUTPUT_CONFIG["encoding"])
-                
-                log_message(f"💾 ARQUIVO SALVO: {output_file}", "SUCCESS")
-                log_message(f"🎯 PROCESSO FINALIZADO - {len(all_nodes)} NÓDULOS PROCESSADOS!", "SUCCESS")
-                log_message("🎉 RASPAGEM CONCLUÍDA COM SUCESSO!", "SUCCESS")
+            if not pending:
+                log_message("✅ Nenhuma URL pendente", "INFO")
+            elif args.engine == "async" or workers > 1:
+                # Os modos concorrentes reaproveitam a sessão do login acima
+                storage_state = context.storage_state()
             else:
-                log_message("⚠️ Nenhum dado foi extraído. Verifique as URLs e configurações.", "WARNING")
+                resource_filter = attach_resource_filter(page)
+                for i, url in enumerate(pending, 1):
+                    log_message(f"📄 PROCESSANDO URL {i}/{len(pending)}", "INFO")
+                    log_message(f"🔗 Navegando para: {url[:80]}...", "INFO")
+                    update_progress(i-1, len(pending), url)
 
+                    nodes = process_url(page, url, i, resource_filter, args.mode, question_cache)
+                    if nodes is not None:
+                        checkpoint.append(url, nodes)
+                    update_progress(i, len(pending))
             browser.close()
+
+        # O motor assíncrono precisa rodar fora do loop da API síncrona
+        if storage_state is not None:
+            if args.engine == "async":
+                import async_scraper
+                async_scraper.run(pending, storage_state, workers, args.mode, checkpoint.append, question_cache)
+            else:
+                run_worker_pool(pending, storage_state, workers, args.mode, checkpoint.append, question_cache)
+
+        if question_cache:
+            log_message(f"🗃️ Cache de questões: {question_cache.report()}", "INFO")
+            question_cache.close()
+
+        # O arquivo final é sempre montado a partir do checkpoint, em streaming
+        log_message("📋 INICIANDO FORMATAÇÃO DOS DADOS...", "INFO")
+        log_message("🔄 Construindo arquivo XML do Freeplane...", "INFO")
+        output_file = out_dir / OUTPUT_CONFIG["filename"]
+        bank = QuestionBank(out_dir / OUTPUT_CONFIG["bank_file"]) if OUTPUT_CONFIG["question_bank"] else None
+        try:
+            with FreeplaneWriter(output_file) as writer:
+                for question in checkpoint.iter_questions(urls):
+                    writer.write(question)
+                    if bank:
+                        bank.add(question)
+        finally:
+            if bank:
+                bank.close()
+
+        if writer.count:
+            log_message(f"💾 ARQUIVO SALVO: {output_file}", "SUCCESS")
+            if bank:
+                log_message(f"🔎 Banco de questões atualizado: {bank.path} ({bank.count} questões)", "SUCCESS")
+            log_message(f"🎯 PROCESSO FINALIZADO - {writer.count} NÓDULOS PROCESSADOS!", "SUCCESS")
+            log_message("🎉 RASPAGEM CONCLUÍDA COM SUCESSO!", "SUCCESS")
+        else:
+            log_message("⚠️ Nenhum dado foi extraído. Verifique as URLs e configurações.", "WARNING")
             
     except Exception as e:
         log_message(f"💥 ERRO CRÍTICO NO PROCESSO: {e}", "ERROR")
+        error = str(e) or type(e).__name__
         raise
     finally:
-        # Marca o fim da execução
-        set_running_status(False)
+        # Marca o fim da execução (com o erro, se houve, para o monitor não mostrar sucesso)
+        set_running_status(False, error)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Persistência da sessão (storage_state) do QConcursos.
+
+Compartilhado pelo scraper de linha de comando e pela interface web: carrega
+o estado salvo, faz uma validação barata pelos cookies e grava o estado novo
+de forma atômica (arquivo temporário + os.replace) para que uma interrupção
+nunca deixe um arquivo de sessão truncado.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse
+from config import DASHBOARD_URL, OUTPUT_CONFIG, SCRAPING_CONFIG
+
+SESSION_PATH = os.path.join(OUTPUT_CONFIG["output_dir"], OUTPUT_CONFIG["session_file"])
+
+def load_state(path=SESSION_PATH):
+    """
+    Lê o storage_state salvo.
+
+    Returns:
+        Dicionário do storage_state, ou None se não existir ou estiver corrompido
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) else None
+
+def state_expired(state, now=None):
+    """
+    Verifica pelos cookies se a sessão certamente expirou, sem abrir navegador.
+
+    Cookies de sessão (expires = -1) são considerados válidos; a sessão é dada
+    como expirada se não houver cookies do QConcursos ou se todos os cookies
+    com validade explícita já tiverem vencido.
+    """
+    now = now or time.time()
+    cookies = [c for c in state.get("cookies", []) if "qconcursos" in c.get("domain", "")]
+    if not cookies:
+        return True
+    expiring = [c for c in cookies if c.get("expires", -1) > 0]
+    if len(expiring) < len(cookies):
+        return False
+    return all(c["expires"] <= now for c in expiring)
+
+def is_login_url(url):
+    """True se a URL é a tela de login (redirecionamento de sessão inválida)."""
+    return "entrar" in url or "login" in url
+
+def validate_session_page(page, timeout=15000):
+    """
+    Confirma a sessão abrindo o dashboard na página informada.
+
+    Returns:
+        True se o dashboard abriu sem redirecionar para o login
+    """
+    try:
+        page.goto(DASHBOARD_URL, wait_until="domcontentloaded", timeout=timeout)
+    except Exception:
+        return False
+    return not is_login_url(page.url)
+
+def save_state(context, path=SESSION_PATH):
+    """
+    Grava o storage_state do contexto atomicamente.
+    """
+    state = context.storage_state()
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".session-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return state
+
+def cookie_header(state, url, now=None):
+    """
+    Monta o header Cookie que o navegador enviaria para a URL a partir do storage_state.
+    """
+    now = now or time.time()
+    host = urlparse(url).hostname or ""
+    pairs = []
+    for c in state.get("cookies", []):
+        domain = c.get("domain", "").lstrip(".")
+        if not (host == domain or host.endswith("." + domain)):
+            continue
+        if 0 < c.get("expires", -1) <= now:
+            continue
+        pairs.append(f"{c['name']}={c['value']}")
+    return "; ".join(pairs)
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+def probe_session(state, timeout=5):
+    """
+    Confirma a sessão com uma única requisição HTTP ao dashboard, sem navegador.
+
+    Returns:
+        True se o dashboard respondeu sem mandar para o login, False se
+        redirecionou para o login, None se não foi possível decidir (rede)
+    """
+    request = urllib.request.Request(DASHBOARD_URL, headers={
+        "Cookie": cookie_header(state, DASHBOARD_URL),
+        "User-Agent": SCRAPING_CONFIG["user_agent"],
+    })
+    opener = urllib.request.build_opener(_NoRedirect)
+    try:
+        with opener.open(request, timeout=timeout):
+            return True
+    except urllib.error.HTTPError as e:
+        if 300 <= e.code < 400:
+            return not is_login_url(e.headers.get("Location", ""))
+        if e.code in (401, 403):
+            return False
+        return None
+    except (urllib.error.URLError, OSError):
+        return None
+
+class SessionValidator:
+    """
+    Validação de sessão com cache por TTL.
+
+    Primeiro olha a validade dos cookies (sem rede); se eles ainda valem,
+    confirma com probe_session. O resultado fica em cache enquanto o arquivo
+    de sessão não mudar e o TTL não vencer, e chamadas concorrentes esperam
+    a mesma verificação em andamento em vez de disparar outra.
+    """
+
+    def __init__(self, path=SESSION_PATH, ttl=300, confirm=True):
+        self.path = path
+        self.ttl = ttl
+        self.confirm = confirm
+        self._lock = threading.Lock()
+        self._inflight = None
+        self._cached = None  # (mtime, checked_at, valid)
+
+    def invalidate(self):
+        with self._lock:
+            self._cached = None
+
+    def _mtime(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def check(self, force=False):
+        """
+        Returns:
+            True se a sessão salva é utilizável
+        """
+        mtime = self._mtime()
+        if mtime is None:
+            return False
+
+        with self._lock:
+            cached = self._cached
+            if (not force and cached and cached[0] == mtime
+                    and time.time() - cached[1] < self.ttl):
+                return cached[2]
+            inflight = self._inflight
+            if inflight is None:
+                inflight = self._inflight = threading.Event()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            inflight.wait()
+            cached = self._cached
+            return bool(cached and cached[2])
+
+        try:
+            valid = self._validate()
+            with self._lock:
+                self._cached = (mtime, time.time(), valid)
+            return valid
+        finally:
+            with self._lock:
+                self._inflight = None
+            inflight.set()
+
+    def _validate(self):
+        state = load_state(self.path)
+        if state is None or state_expired(state):
+            return False
+        if not self.confirm:
+            return True
+        probed = probe_session(state)
+        # Sem resposta conclusiva da rede, confia na validade dos cookies
+        return True if probed is None else probed
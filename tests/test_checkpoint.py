@@ -0,0 +1,68 @@
+import os
+from checkpoint import Checkpoint
+from models import Question
+
+def questions(prefix, count=3):
+    return [Question(numero=str(i), gabarito="ABCDE"[i % 5], enunciado=f"{prefix} {i}", codigo=f"Q{prefix}{i}")
+            for i in range(count)]
+
+def test_append_load_round_trip(tmp_path):
+    cp = Checkpoint(tmp_path / "checkpoint.bin")
+    cp.append("https://a", questions("a"))
+    cp.append("https://b", questions("b", 2))
+    cp.append("https://vazia", [])
+    assert cp.load() == {"https://a": questions("a"), "https://b": questions("b", 2), "https://vazia": []}
+
+def test_iter_questions_follows_url_order(tmp_path):
+    cp = Checkpoint(tmp_path / "checkpoint.bin")
+    cp.append("https://a", questions("a"))
+    cp.append("https://b", questions("b"))
+    got = list(cp.iter_questions(["https://b", "https://faltando", "https://a"]))
+    assert got == questions("b") + questions("a")
+
+def test_truncated_tail_keeps_complete_frames(tmp_path):
+    path = tmp_path / "checkpoint.bin"
+    cp = Checkpoint(path)
+    cp.append("https://a", questions("a"))
+    intact = os.path.getsize(path)
+    cp.append("https://b", questions("b"))
+    full = path.read_bytes()
+    # Processo morto no meio da escrita: o registro incompleto do fim é ignorado
+    for size in (intact + 2, intact + 7, len(full) - 1):
+        path.write_bytes(full[:size])
+        assert cp.load() == {"https://a": questions("a")}
+        assert list(cp.iter_questions(["https://a", "https://b"])) == questions("a")
+
+def test_missing_file_and_reset(tmp_path):
+    cp = Checkpoint(tmp_path / "checkpoint.bin")
+    assert cp.load() == {}
+    assert list(cp.iter_questions(["https://a"])) == []
+    cp.append("https://a", questions("a"))
+    cp.reset()
+    assert cp.load() == {}
+
+def test_append_after_truncated_tail_is_readable(tmp_path):
+    path = tmp_path / "checkpoint.bin"
+    Checkpoint(path).append("https://a", questions("a"))
+    intact = os.path.getsize(path)
+    Checkpoint(path).append("https://b", questions("b"))
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    # --resume: um Checkpoint novo continua o arquivo da execução que caiu
+    resumed = Checkpoint(path)
+    assert resumed.load() == {"https://a": questions("a")}
+    resumed.append("https://b", questions("b"))
+    resumed.append("https://c", questions("c"))
+    assert os.path.getsize(path) > intact
+    assert Checkpoint(path).load() == {"https://a": questions("a"), "https://b": questions("b"),
+                                       "https://c": questions("c")}
+
+def test_append_after_garbage_tail_is_readable(tmp_path):
+    path = tmp_path / "checkpoint.bin"
+    Checkpoint(path).append("https://a", questions("a"))
+    with open(path, "ab") as f:
+        f.write(b"\x00\x00\x00\x10lixo-nao-zlib....")
+    resumed = Checkpoint(path)
+    resumed.append("https://b", questions("b"))
+    assert list(Checkpoint(path).load()) == ["https://a", "https://b"]
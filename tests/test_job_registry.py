@@ -0,0 +1,87 @@
+import os
+import pytest
+import job_registry
+from job_registry import JobRegistry
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        self.now += 1
+        return self.now
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setitem(job_registry.LOG_CONFIG, "path", str(tmp_path / "logs" / "scraper.log"))
+    monkeypatch.setitem(job_registry.OUTPUT_CONFIG, "output_dir", str(tmp_path / "output"))
+    monkeypatch.setitem(job_registry.JOB_REGISTRY_CONFIG, "keep", 2)
+    monkeypatch.setattr(job_registry.time, "time", Clock().time)
+    return JobRegistry(str(tmp_path / "registry.sqlite3"))
+
+def test_create_and_get(registry, tmp_path):
+    registry.create("a", 3)
+    job = registry.get("a")
+    assert (job["state"], job["urls"], job["processed"], job["elapsed"]) == ("queued", 3, 0, None)
+    assert job["log_path"] == str(tmp_path / "logs" / "jobs" / "a.log")
+    assert job["output_path"] == str(tmp_path / "output" / "jobs" / "a" / "resultado.mm")
+    assert registry.get("faltando") is None
+
+def test_duplicate_id_keeps_first(registry):
+    registry.create("a", 3)
+    registry.start("a", "worker-1")
+    registry.create("a", 99)
+    job = registry.get("a")
+    assert (job["urls"], job["state"]) == (3, "running")
+    assert len(registry.list()) == 1
+
+def test_status_transitions(registry):
+    registry.create("ok", 2)
+    registry.start("ok", "worker-1")
+    registry.progress("ok", 1, "https://a")
+    job = registry.get("ok")
+    assert (job["state"], job["worker"], job["processed"], job["current_url"]) == ("running", "worker-1", 1, "https://a")
+    assert job["elapsed"] is not None
+    registry.finish("ok", nodes=40)
+    job = registry.get("ok")
+    assert (job["state"], job["nodes"], job["error"]) == ("completed", 40, None)
+
+    registry.create("falhou", 1)
+    registry.start("falhou", "worker-2")
+    registry.finish("falhou", error="Falha no login")
+    assert registry.get("falhou")["state"] == "failed"
+    assert [j["id"] for j in registry.list(state="failed")] == ["falhou"]
+
+def test_requeue_resets_progress(registry):
+    registry.create("a", 2)
+    registry.start("a", "worker-1")
+    registry.progress("a", 1, "https://a")
+    registry.requeue("a")
+    job = registry.get("a")
+    assert (job["state"], job["worker"], job["processed"], job["started_at"]) == ("queued", None, 0, None)
+
+def test_latest_output_skips_empty_and_failed(registry):
+    assert registry.latest_output() is None
+    for job_id, error, nodes in (("cheio", None, 10), ("vazio", None, 0), ("erro", "x", 5)):
+        registry.create(job_id, 1)
+        registry.finish(job_id, error=error, nodes=nodes)
+    assert registry.latest_output() == registry.get("cheio")["output_path"]
+
+def test_prune_keeps_latest_finished_and_removes_files(registry):
+    jobs = {}
+    registry.create("rodando", 1)
+    registry.start("rodando", "worker-1")
+    for job_id in ("j1", "j2", "j3"):
+        registry.create(job_id, 1)   # create() poda os finalizados além de keep=2
+        jobs[job_id] = job = registry.get(job_id)
+        for path in (job["log_path"], job["output_path"]):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+        registry.finish(job_id, nodes=1)
+    assert [j["id"] for j in registry.list()] == ["j3", "j2", "j1", "rodando"]
+
+    registry.create("j4", 1)
+    assert [j["id"] for j in registry.list()] == ["j4", "j3", "j2", "rodando"]
+    assert not os.path.exists(jobs["j1"]["log_path"])
+    assert not os.path.exists(os.path.dirname(jobs["j1"]["output_path"]))
+    assert os.path.exists(jobs["j2"]["output_path"])
@@ -0,0 +1,108 @@
+import json
+import os
+from log_writer import BufferedLogWriter, format_text, read_tail
+
+def test_missing_file(tmp_path):
+    path = tmp_path / "scraper.log"
+    assert read_tail(path) == {"text": "", "cursor": None, "reset": False, "more": False}
+    assert read_tail(path, "1:10")["reset"] is True
+
+def test_cursor_returns_only_new_complete_lines(tmp_path):
+    path = tmp_path / "scraper.log"
+    path.write_text("um\ndois\ntrê", encoding="utf-8")
+    first = read_tail(path)
+    assert first["text"] == "um\ndois\n"
+    assert first["reset"] is False and first["more"] is True
+
+    # A linha incompleta fica para a próxima leitura
+    assert read_tail(path, first["cursor"])["text"] == ""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("s\nquatro\n")
+    second = read_tail(path, first["cursor"])
+    assert second["text"] == "três\nquatro\n"
+    assert second["more"] is False
+    assert read_tail(path, second["cursor"]) == {"text": "", "cursor": second["cursor"],
+                                                 "reset": False, "more": False}
+
+def test_max_bytes_pages_through_file(tmp_path):
+    path = tmp_path / "scraper.log"
+    lines = [f"linha {i}\n" for i in range(50)]
+    path.write_text("".join(lines), encoding="utf-8")
+    cursor, text, calls = None, "", 0
+    while True:
+        chunk = read_tail(path, cursor, max_bytes=64)
+        text += chunk["text"]
+        cursor = chunk["cursor"]
+        calls += 1
+        if not chunk["more"]:
+            break
+    assert text == "".join(lines)
+    assert calls > 1
+
+def test_truncate_and_rotation_reset_cursor(tmp_path):
+    path = tmp_path / "scraper.log"
+    path.write_text("antigo 1\nantigo 2\n", encoding="utf-8")
+    cursor = read_tail(path)["cursor"]
+
+    path.write_text("novo\n", encoding="utf-8")
+    after_truncate = read_tail(path, cursor)
+    assert after_truncate["reset"] is True
+    assert after_truncate["text"] == "novo\n"
+
+    os.replace(path, f"{path}.1")
+    path.write_text("rotacionado\n", encoding="utf-8")
+    after_rotate = read_tail(path, after_truncate["cursor"])
+    assert after_rotate["reset"] is True
+    assert after_rotate["text"] == "rotacionado\n"
+
+def test_invalid_cursor_reads_from_start(tmp_path):
+    path = tmp_path / "scraper.log"
+    path.write_text("um\n", encoding="utf-8")
+    result = read_tail(path, "lixo")
+    assert result["text"] == "um\n" and result["reset"] is True
+
+def test_json_lines_formatted_for_monitor(tmp_path):
+    path = tmp_path / "scraper.log"
+    writer = BufferedLogWriter(str(path), fmt="json", flush_interval=0.01)
+    writer.write("ERROR: falhou")
+    writer.write("sem nível")
+    writer.flush()
+    writer.close()
+    entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [(e["level"], e["msg"]) for e in entries] == [("ERROR", "falhou"), ("INFO", "sem nível")]
+    text = read_tail(path)["text"].splitlines()
+    assert text[0].endswith("] ERROR: falhou") and text[1].endswith("] INFO: sem nível")
+    assert format_text("texto puro\n") == "texto puro\n"
+
+def test_writers_follow_rotation_by_another_process(tmp_path):
+    path = str(tmp_path / "scraper.log")
+    first = BufferedLogWriter(path, flush_interval=0.01, max_bytes=200, backups=3)
+    second = BufferedLogWriter(path, flush_interval=0.01, max_bytes=200, backups=3)
+    second.write("INFO: abre o arquivo")
+    second.flush()
+    # O primeiro writer rotaciona o arquivo que o segundo ainda tem aberto
+    for i in range(10):
+        first.write(f"INFO: linha longa número {i:02d} " + "x" * 20)
+        first.flush()
+    second.write("INFO: depois da rotação")
+    second.flush()
+    first.close()
+    second.close()
+
+    assert "depois da rotação" in (tmp_path / "scraper.log").read_text(encoding="utf-8")
+    rotated = "".join((tmp_path / f"scraper.log.{i}").read_text(encoding="utf-8")
+                      for i in range(1, 4) if (tmp_path / f"scraper.log.{i}").exists())
+    assert "depois da rotação" not in rotated
+    assert os.path.getsize(path) <= 200
+
+def test_reset_after_rotation_truncates_current_file(tmp_path):
+    path = tmp_path / "scraper.log"
+    writer = BufferedLogWriter(str(path), flush_interval=0.01)
+    writer.write("INFO: antes")
+    writer.flush()
+    os.replace(path, f"{path}.1")
+    path.write_text("novo arquivo\n", encoding="utf-8")
+    writer.reset()
+    writer.close()
+    assert path.read_text(encoding="utf-8") == ""
+    assert "antes" in (tmp_path / "scraper.log.1").read_text(encoding="utf-8")
@@ -0,0 +1,73 @@
+import pytest
+import models
+from models import Comment, Question, pack_questions, unpack_questions
+
+def sample(codigo="Q3437098"):
+    return Question(
+        numero="1", gabarito="C", titulo="Direito Administrativo", info="Ano: 2023 Banca: FGV",
+        enunciado="<p>Licitação &amp; contratos — ção</p>", alternativas=["<div>A) a</div>", "<div>B) b</div>"],
+        comentarios=["<div>comentário</div>"], badge="<span>badge</span>", extras=["<div>extra</div>"],
+        codigo=codigo,
+    )
+
+@pytest.fixture(params=["msgpack", "prefixed"])
+def fmt(request, monkeypatch):
+    if request.param == "prefixed":
+        monkeypatch.setattr(models, "msgpack", None)
+    elif models.msgpack is None:
+        pytest.skip("msgpack não instalado")
+    return request.param
+
+def test_question_round_trip(fmt):
+    q = sample()
+    restored = Question.unpack(q.pack())
+    assert restored == q
+    assert restored.codigo == "Q3437098"
+    assert restored.comentarios == (Comment("<div>comentário</div>"),)
+
+def test_empty_question_round_trip(fmt):
+    assert Question.unpack(Question().pack()) == Question()
+
+def test_questions_list_round_trip(fmt):
+    questions = [sample("Q1"), sample("Q2"), Question()]
+    assert unpack_questions(pack_questions(questions)) == questions
+    assert unpack_questions(pack_questions([])) == []
+
+def test_truncated_question_raises(monkeypatch):
+    monkeypatch.setattr(models, "msgpack", None)
+    data = sample().pack()
+    for size in (5, len(data) // 2, len(data) - 1):
+        with pytest.raises(ValueError):
+            Question.unpack(data[:size])
+
+def test_truncated_list_raises(fmt):
+    data = pack_questions([sample("Q1"), sample("Q2")])
+    for size in (2, 10, len(data) - 1):
+        with pytest.raises(ValueError):
+            unpack_questions(data[:size])
+
+def test_unknown_format_raises():
+    with pytest.raises(ValueError):
+        Question.unpack(b"X" + b"\0" * 8)
+
+def test_data_packed_before_codigo_still_unpacks(monkeypatch):
+    monkeypatch.setattr(models, "msgpack", None)
+    q = sample()
+    out = bytearray(models._PREFIXED)
+    for value in q._fields()[:-1]:
+        if isinstance(value, list):
+            out += models._U32.pack(len(value))
+            for item in value:
+                models._pack_str(out, item)
+        else:
+            models._pack_str(out, value)
+    restored = Question.unpack(bytes(out))
+    assert restored.codigo == ""
+    assert restored.enunciado == q.enunciado
+
+def test_key_uses_codigo_or_content_hash():
+    assert sample().key == "Q3437098"
+    a, b = sample(codigo=""), sample(codigo="")
+    assert a.key == b.key and a.key.startswith("#")
+    b.enunciado = "outro"
+    assert a.key != b.key
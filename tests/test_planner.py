@@ -0,0 +1,75 @@
+import pytest
+import planner
+from urllib.parse import urlsplit, parse_qsl
+from planner import expand_url, page_urls, plan, with_page
+
+BASE = "https://www.qconcursos.com/questoes-de-concursos/questoes"
+
+def query(url):
+    return parse_qsl(urlsplit(url).query, keep_blank_values=True)
+
+def test_with_page_without_query():
+    assert with_page(BASE, 1, 50) == f"{BASE}?per_page=50&page=1"
+
+def test_with_page_keeps_other_params_and_replaces_paging():
+    url = f"{BASE}?discipline_ids%5B%5D=100&per_page=20&page=3&q="
+    result = with_page(url, 2, 50)
+    assert query(result) == [("discipline_ids[]", "100"), ("q", ""), ("per_page", "50"), ("page", "2")]
+
+def test_with_page_keeps_fragment():
+    result = with_page(f"{BASE}?page=1#topo", 4, 50)
+    assert urlsplit(result).fragment == "topo"
+    assert query(result) == [("per_page", "50"), ("page", "4")]
+
+def test_with_page_uses_configured_param(monkeypatch):
+    monkeypatch.setitem(planner.SCRAPING_CONFIG, "page_param", "pagina")
+    assert query(with_page(f"{BASE}?pagina=9&page=1", 2, 10)) == [("page", "1"), ("per_page", "10"), ("pagina", "2")]
+
+@pytest.mark.parametrize("total, per_page, pages", [
+    (1, 50, 1), (50, 50, 1), (51, 50, 2), (100, 50, 2), (1234, 50, 25), (0, 50, 1),
+])
+def test_page_count(total, per_page, pages):
+    urls = page_urls(BASE, total, per_page)
+    assert len(urls) == pages
+    assert [dict(query(u))["page"] for u in urls] == [str(n) for n in range(1, pages + 1)]
+
+class FakePage:
+    def __init__(self, total):
+        self.total = total
+        self.visited = []
+
+    def goto(self, url, **kwargs):
+        self.visited.append(url)
+
+    def wait_for_function(self, js, timeout=None):
+        pass
+
+    def evaluate(self, js):
+        if isinstance(self.total, Exception):
+            raise self.total
+        return self.total
+
+class DirectLimiter:
+    def navigate(self, page, url, **kwargs):
+        return page.goto(url, **kwargs)
+
+@pytest.fixture(autouse=True)
+def direct_limiter(monkeypatch):
+    monkeypatch.setattr(planner, "limiter", DirectLimiter())
+
+def test_expand_url_uses_detected_total():
+    page = FakePage(120)
+    urls = expand_url(page, f"{BASE}?per_page=20", per_page=50)
+    assert page.visited == [with_page(BASE, 1, 50)]
+    assert urls == [with_page(BASE, n, 50) for n in (1, 2, 3)]
+
+@pytest.mark.parametrize("total", [None, 0, RuntimeError("página fechada")])
+def test_expand_url_falls_back_to_original(total):
+    url = f"{BASE}?per_page=20"
+    assert expand_url(FakePage(total), url) == [url]
+
+def test_plan_keeps_order_and_logs():
+    messages = []
+    urls = plan(FakePage(60), [f"{BASE}?a=1", f"{BASE}?a=2"], log=messages.append)
+    assert [dict(query(u))["a"] for u in urls] == ["1", "1", "2", "2"]
+    assert len(messages) == 2
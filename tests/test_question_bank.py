@@ -0,0 +1,67 @@
+import sqlite3
+import pytest
+from models import Question
+from question_bank import QuestionBank, html_to_text
+
+def question(codigo, enunciado, comentarios=(), gabarito="C"):
+    return Question(numero="1", gabarito=gabarito, titulo="Direito Administrativo",
+                    enunciado=enunciado, comentarios=list(comentarios), codigo=codigo)
+
+@pytest.fixture
+def bank(tmp_path):
+    bank = QuestionBank(tmp_path / "questions.sqlite3")
+    yield bank
+    bank.close()
+
+def codes(results):
+    return sorted(r["codigo"] for r in results)
+
+def test_html_to_text():
+    assert html_to_text("<p>Licitação&nbsp;&amp;  <b>contratos</b></p>") == "Licitação & contratos"
+    assert html_to_text(None) == ""
+
+def test_insert_and_search(bank):
+    bank.upsert([
+        question("Q1", "<p>Dispensa de <b>licitação</b></p>", ["<div>ver art. 75</div>"]),
+        question("Q2", "<p>Controle de constitucionalidade</p>"),
+    ])
+    assert bank.total() == 2
+    assert codes(bank.search("licitacao")) == ["Q1"]          # sem acento
+    assert codes(bank.search("art")) == ["Q1"]                # comentários indexados
+    assert codes(bank.search("controle OR dispensa")) == ["Q1", "Q2"]
+    result = bank.search("constitucionalidade")[0]
+    assert result["titulo"] == "Direito Administrativo" and "[constitucionalidade]" in result["trecho"]
+
+def test_reupsert_updates_row_and_index(bank):
+    bank.upsert([question("Q1", "<p>texto antigo</p>", gabarito="A")])
+    bank.upsert([question("Q1", "<p>texto novo</p>", gabarito="E")])
+    assert bank.total() == 1
+    assert bank.search("antigo") == []
+    assert [(r["codigo"], r["gabarito"]) for r in bank.search("novo")] == [("Q1", "E")]
+    # O índice externo continua consistente com a tabela de conteúdo
+    conn = sqlite3.connect(bank.path)
+    conn.execute("INSERT INTO questions_fts (questions_fts) VALUES ('integrity-check')")
+    conn.close()
+
+def test_same_position_different_codes_kept(bank):
+    bank.upsert([question("Q1", "primeira"), question("Q2", "segunda")])
+    assert bank.total() == 2
+
+def test_batched_add_flushes(tmp_path):
+    bank = QuestionBank(tmp_path / "questions.sqlite3", batch_size=2)
+    bank.add(question("Q1", "um"))
+    assert bank.total() == 0
+    bank.add(question("Q2", "dois"))
+    assert bank.total() == 2
+    bank.add(question("Q3", "três"))
+    bank.close()
+    reopened = QuestionBank(tmp_path / "questions.sqlite3")
+    assert reopened.total() == 3
+    reopened.close()
+
+def test_iter_questions_round_trip(bank):
+    stored = [question("Q1", "<p>licitação</p>", ["<div>c</div>"], gabarito="B"),
+              question("Q2", "<p>outra</p>", gabarito="A")]
+    bank.upsert(stored)
+    assert list(bank.iter_questions()) == [stored[1], stored[0]]
+    assert list(bank.iter_questions("licitacao")) == [stored[0]]
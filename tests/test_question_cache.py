@@ -0,0 +1,62 @@
+import pytest
+from models import Question
+from question_cache import QuestionCache
+
+def fp(codigo, numero, h):
+    return {"codigo": codigo, "numero": numero, "hash": h}
+
+def question(codigo, numero, enunciado="enunciado"):
+    return Question(numero=numero, gabarito="C", enunciado=enunciado, codigo=codigo)
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = QuestionCache(tmp_path / "cache.sqlite3")
+    yield cache
+    cache.close()
+
+def test_empty_cache_misses(cache):
+    assert cache.lookup([fp("Q1", "1", "aa"), fp("Q2", "2", "bb")]) == {}
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert cache.lookup([]) == {}
+
+def test_store_then_hit(cache):
+    fingerprints = [fp("Q1", "1", "aa"), fp("Q2", "2", "bb")]
+    cache.store([question("Q1", "1"), question("Q2", "2")], fingerprints)
+    cached = cache.lookup(fingerprints)
+    assert cached == {"Q1": question("Q1", "1"), "Q2": question("Q2", "2")}
+    assert (cache.hits, cache.misses) == (2, 0)
+
+def test_changed_hash_misses(cache):
+    cache.store([question("Q1", "1")], [fp("Q1", "1", "aa")])
+    assert cache.lookup([fp("Q1", "1", "outro")]) == {}
+    assert cache.misses == 1
+
+def test_same_code_on_another_page_hits_with_current_position(cache):
+    cache.store([question("Q1", "1")], [fp("Q1", "1", "aa")])
+    # A questão Q1 aparece em outro filtro, na posição 7
+    cached = cache.lookup([fp("Q1", "7", "aa"), fp("Q9", "1", "aa")])
+    assert list(cached) == ["Q1"]
+    assert cached["Q1"].numero == "7"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_different_codes_at_same_position_do_not_collide(cache):
+    cache.store([question("Q1", "1", "primeira")], [fp("Q1", "1", "aa")])
+    cache.store([question("Q2", "1", "segunda")], [fp("Q2", "1", "bb")])
+    assert cache.lookup([fp("Q1", "1", "aa")])["Q1"].enunciado == "primeira"
+    assert cache.lookup([fp("Q2", "1", "bb")])["Q2"].enunciado == "segunda"
+
+def test_store_replaces_and_skips_unfingerprinted(cache):
+    cache.store([question("Q1", "1", "antiga")], [fp("Q1", "1", "aa")])
+    cache.store([question("Q1", "1", "nova"), question("Q3", "2")], [fp("Q1", "1", "bb")])
+    assert cache.lookup([fp("Q1", "1", "bb")])["Q1"].enunciado == "nova"
+    assert cache.lookup([fp("Q3", "2", "aa")]) == {}
+
+def test_persists_across_instances(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    first = QuestionCache(path)
+    first.store([question("Q1", "1")], [fp("Q1", "1", "aa")])
+    first.close()
+    second = QuestionCache(path)
+    assert list(second.lookup([fp("Q1", "1", "aa")])) == ["Q1"]
+    assert "1 acertos, 0 faltas (100% reaproveitado)" == second.report()
+    second.close()
@@ -0,0 +1,93 @@
+import pytest
+import rate_limiter
+from rate_limiter import RateLimiter
+
+URL = "https://app.qconcursos.com/questoes-de-concursos/questoes?page=1"
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "time", clock.time)
+    return clock
+
+@pytest.fixture
+def limiter(tmp_path, clock, monkeypatch):
+    limiter = RateLimiter(str(tmp_path / "rate_limits.sqlite3"), {"initial_rate": 1.0, "burst": 2})
+    # Quem usa a instância global do módulo também grava no tmp_path
+    monkeypatch.setattr(rate_limiter, "limiter", limiter)
+    return limiter
+
+class FakeResponse:
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+
+def test_burst_then_waits_queue_up(limiter):
+    assert [limiter.reserve(URL) for _ in range(4)] == [0, 0, 1.0, 2.0]
+
+def test_tokens_refill_with_time(limiter, clock):
+    for _ in range(3):
+        limiter.reserve(URL)
+    clock.now += 10
+    assert limiter.reserve(URL) == 0
+
+def test_hosts_are_independent(limiter):
+    for _ in range(3):
+        limiter.reserve(URL)
+    assert limiter.reserve("https://www.qconcursos.com/conta/entrar") == 0
+
+def test_throttled_backoff_counts_once_per_interval(limiter, clock):
+    limiter.report(URL, "throttled")
+    limiter.report(URL, "throttled")
+    assert limiter.rate(URL) == 0.5
+    assert limiter.reserve(URL) == 30
+
+    clock.now += 6
+    limiter.report(URL, "error")
+    assert limiter.rate(URL) == 0.25
+
+def test_retry_after_overrides_cooldown(limiter):
+    limiter.report(URL, "throttled", 90)
+    assert limiter.reserve(URL) == 90
+
+def test_rate_ramps_up_and_respects_limits(tmp_path, clock):
+    limiter = RateLimiter(str(tmp_path / "rate_limits.sqlite3"),
+                          {"initial_rate": 1.9, "min_rate": 0.3, "decrease_interval": 0})
+    for _ in range(6):
+        limiter.report(URL, "ok")
+    assert limiter.rate(URL) == 2.0
+    for _ in range(10):
+        limiter.report(URL, "error")
+    assert limiter.rate(URL) == 0.3
+
+def test_slow_navigation_uses_slow_factor(limiter):
+    limiter.report(URL, "slow")
+    assert limiter.rate(URL) == pytest.approx(0.8)
+
+def test_disabled_never_waits(tmp_path, clock):
+    limiter = RateLimiter(str(tmp_path / "rate_limits.sqlite3"), {"enabled": False})
+    limiter.report(URL, "throttled")
+    assert [limiter.reserve(URL) for _ in range(5)] == [0] * 5
+
+def test_classify(limiter):
+    assert limiter.classify(FakeResponse(200), 1, URL) == ("ok", None)
+    assert limiter.classify(FakeResponse(200), 20, URL) == ("slow", None)
+    assert limiter.classify(FakeResponse(429, {"retry-after": "12"}), 1, URL) == ("throttled", 12.0)
+    assert limiter.classify(FakeResponse(503), 1, URL) == ("throttled", None)
+    assert limiter.classify(FakeResponse(502), 1, URL) == ("error", None)
+    assert limiter.classify(FakeResponse(200), 1, rate_limiter.LOGIN_URL) == ("throttled", None)
+    assert limiter.classify(None, 1, URL) == ("ok", None)
+
+def test_database_created_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    limiter = RateLimiter()
+    assert not (tmp_path / "output").exists()
+    limiter.reserve(URL)
+    assert (tmp_path / "output" / "rate_limits.sqlite3").exists()
@@ -0,0 +1,42 @@
+from resource_filter import ResourceFilter
+
+class FakeRequest:
+    def __init__(self, resource_type, url="https://app.qconcursos.com/x"):
+        self.resource_type = resource_type
+        self.url = url
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.action = None
+
+    def abort(self):
+        self.action = "abort"
+
+    def continue_(self):
+        self.action = "continue"
+
+def make_filter():
+    return ResourceFilter(blocked_types=["image", "font"], blocked_hosts=["*.google-analytics.com"],
+                          estimated_bytes={"image": 40 * 1024, "font": 10 * 1024, "other": 1024})
+
+def test_blocks_by_type_and_host():
+    rf = make_filter()
+    actions = []
+    for request in (FakeRequest("image"), FakeRequest("font"), FakeRequest("xhr"),
+                    FakeRequest("script", "https://www.google-analytics.com/analytics.js")):
+        route = FakeRoute(request)
+        rf.handle(route)
+        actions.append(route.action)
+    assert actions == ["abort", "abort", "continue", "abort"]
+    assert rf.by_type == {"image": 1, "font": 1, "script": 1}
+
+def test_snapshot_reports_estimate_and_resets():
+    rf = make_filter()
+    for resource_type in ("image", "image", "font"):
+        rf.handle(FakeRoute(FakeRequest(resource_type)))
+    assert rf.describe() == "3 bloqueadas (~90 KB estimados): font=1, image=2"
+    stats = rf.snapshot()
+    assert stats == {"blocked": 3, "estimated_bytes_saved": 90 * 1024, "by_type": {"font": 1, "image": 2}}
+    assert rf.snapshot() == {"blocked": 0, "estimated_bytes_saved": 0, "by_type": {}}
+    assert rf.describe() == "0 bloqueadas (~0 KB estimados)"
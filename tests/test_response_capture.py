@@ -0,0 +1,115 @@
+import json
+from freeplane import COMMENT_DIV
+from response_capture import ResponseCapture, parse_payloads
+
+QUESTIONS = {
+    "data": {
+        "questions": [
+            {
+                "id": 3437098,
+                "code": "Q3437098",
+                "statement": "<p>Sobre licitação,\nassinale a correta.</p>",
+                "discipline": {"name": "Direito Administrativo"},
+                "year": 2023,
+                "examining_board": {"name": "FGV"},
+                "institute": "TCE-SP",
+                "alternatives": [
+                    {"letter": "A", "body": "primeira"},
+                    {"letter": "B", "body": "segunda"},
+                ],
+                "comments": [{"body": "comentário inline"}],
+            },
+            {
+                "id": 3437099,
+                "statement": "Certo ou errado?",
+                "correct_alternative": "C",
+                "alternatives": [],
+            },
+        ]
+    }
+}
+
+STATISTICS = [
+    {"question_id": 3437098, "alternatives_statistics": [{"id": "A", "hit": 0}, {"id": "B", "hit": 12}]},
+]
+
+COMMENTS = {
+    "comments": [
+        {"question_id": 3437098, "body": "comentário da API"},
+        {"question_id": 3437098, "body": "comentário inline"},
+        {"question_id": 999, "body": "questão que não está na página"},
+    ]
+}
+
+def by_code(questions):
+    return {q.codigo: q for q in questions}
+
+def test_parses_questions_stats_and_comments():
+    parsed = by_code(parse_payloads([QUESTIONS, STATISTICS, COMMENTS]))
+    assert list(parsed) == ["Q3437098", "Q3437099"]      # ordenado por gabarito: B, C
+
+    q = parsed["Q3437098"]
+    assert q.numero == "Q3437098"
+    assert q.gabarito == "B"
+    assert q.titulo == "Direito Administrativo"
+    assert q.info == "2023 FGV TCE-SP"
+    assert q.enunciado == "<p>Sobre licitação, assinale a correta.</p>"
+    assert q.alternativas == ('<div class="d-block font-size-1">A) primeira</div>',
+                              '<div class="d-block font-size-1">B) segunda</div>')
+    # Comentário repetido (inline e na API de comentários) aparece uma vez
+    assert [c.html for c in q.comentarios] == [f"{COMMENT_DIV}comentário inline</div>",
+                                               f"{COMMENT_DIV}comentário da API</div>"]
+
+    q = parsed["Q3437099"]
+    assert (q.gabarito, q.numero, q.comentarios) == ("C", "Q3437099", ())
+
+def test_answer_from_inline_statistics():
+    payload = {"id": 1, "statement": "x", "statistics": [{"id": "D", "hit": 3}]}
+    assert parse_payloads([payload])[0].gabarito == "D"
+
+def test_payload_order_does_not_matter():
+    forward = parse_payloads([QUESTIONS, STATISTICS, COMMENTS])
+    backward = parse_payloads([COMMENTS, STATISTICS, QUESTIONS])
+    assert forward == backward
+
+def test_non_matching_payloads():
+    assert parse_payloads([]) == []
+    assert parse_payloads([STATISTICS, COMMENTS]) == []
+    assert parse_payloads([{"user": {"id": 1, "name": "Fulano"}}, [1, 2, 3], "texto", None, 42]) == []
+    # Alternativa com "letter" não é confundida com uma questão
+    assert parse_payloads([{"id": "A", "letter": "A", "statement": "alt"}]) == []
+
+def test_malformed_values_are_tolerated():
+    payload = {"id": 7, "statement": None, "enunciado": "fallback",
+               "alternatives": ["não é dict", {"id": "A"}], "comments": "não é lista",
+               "statistics": "nem lista"}
+    q = parse_payloads([payload])[0]
+    assert q.enunciado == "fallback"
+    assert q.gabarito == ""
+    assert q.alternativas == ('<div class="d-block font-size-1">A) </div>',)
+
+class FakeRequest:
+    def __init__(self, resource_type):
+        self.resource_type = resource_type
+
+class FakeResponse:
+    def __init__(self, url, body, resource_type="xhr", content_type="application/json"):
+        self.url = url
+        self.request = FakeRequest(resource_type)
+        self.headers = {"content-type": content_type}
+        self._body = body
+
+    def json(self):
+        return json.loads(self._body)
+
+def test_capture_filters_and_skips_malformed_json():
+    capture = ResponseCapture()
+    capture._on_response(FakeResponse("https://api.example/questions?page=1", json.dumps(QUESTIONS)))
+    capture._on_response(FakeResponse("https://api.example/questions/statistics", "{não é json"))
+    capture._on_response(FakeResponse("https://api.example/users/me", json.dumps({"id": 1})))
+    capture._on_response(FakeResponse("https://api.example/questions", "{}", resource_type="document"))
+    capture._on_response(FakeResponse("https://api.example/questions", "<html>", content_type="text/html"))
+
+    payloads = capture.collect()
+    assert payloads == [QUESTIONS]
+    assert capture.collect() == []
@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+import pytest
+import session_store
+from session_store import SessionValidator, cookie_header, state_expired
+
+NOW = 1_700_000_000.0
+
+def cookie(name="sid", domain=".qconcursos.com", expires=-1, value="v"):
+    return {"name": name, "value": value, "domain": domain, "expires": expires}
+
+def test_state_expired():
+    assert state_expired({}, NOW)
+    assert state_expired({"cookies": [cookie(domain="outro.com")]}, NOW)
+    assert not state_expired({"cookies": [cookie()]}, NOW)                       # cookie de sessão
+    assert not state_expired({"cookies": [cookie(expires=NOW + 60)]}, NOW)
+    assert state_expired({"cookies": [cookie(expires=NOW - 60), cookie("b", expires=NOW)]}, NOW)
+    assert not state_expired({"cookies": [cookie(expires=NOW - 60), cookie("b", expires=NOW + 1)]}, NOW)
+
+def test_cookie_header_matches_domain_and_expiry():
+    state = {"cookies": [cookie("a", value="1"), cookie("b", domain="app.qconcursos.com", value="2"),
+                         cookie("c", domain="outro.com"), cookie("d", expires=NOW - 1)]}
+    assert cookie_header(state, "https://app.qconcursos.com/b/dashboard", NOW) == "a=1; b=2"
+
+class Clock:
+    def __init__(self):
+        self.now = NOW
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store.time, "time", clock.time)
+    return clock
+
+@pytest.fixture
+def probe(monkeypatch):
+    calls = []
+    result = {"value": True}
+
+    def fake_probe(state):
+        calls.append(state)
+        return result["value"]
+
+    monkeypatch.setattr(session_store, "probe_session", fake_probe)
+    fake_probe.calls = calls
+    fake_probe.result = result
+    return fake_probe
+
+def write_state(path, cookies, mtime=None):
+    path.write_text(json.dumps({"cookies": cookies}), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+def test_missing_or_expired_state_skips_probe(tmp_path, clock, probe):
+    path = tmp_path / "session.json"
+    validator = SessionValidator(str(path), ttl=300)
+    assert validator.check() is False
+    write_state(path, [cookie(expires=NOW - 10)])
+    assert validator.check() is False
+    assert probe.calls == []
+
+def test_result_cached_until_ttl(tmp_path, clock, probe):
+    path = tmp_path / "session.json"
+    write_state(path, [cookie()], mtime=NOW - 100)
+    validator = SessionValidator(str(path), ttl=300)
+    assert validator.check() is True
+    probe.result["value"] = False
+    clock.now += 299
+    assert validator.check() is True
+    assert len(probe.calls) == 1
+    clock.now += 2
+    assert validator.check() is False
+    assert len(probe.calls) == 2
+
+def test_force_invalidate_and_new_file_bypass_cache(tmp_path, clock, probe):
+    path = tmp_path / "session.json"
+    write_state(path, [cookie()], mtime=NOW - 100)
+    validator = SessionValidator(str(path), ttl=300)
+    validator.check()
+    validator.check(force=True)
+    assert len(probe.calls) == 2
+    validator.invalidate()
+    validator.check()
+    assert len(probe.calls) == 3
+    write_state(path, [cookie()], mtime=NOW - 50)   # sessão regravada: mtime novo
+    validator.check()
+    assert len(probe.calls) == 4
+
+def test_inconclusive_probe_trusts_cookies(tmp_path, clock, probe):
+    path = tmp_path / "session.json"
+    write_state(path, [cookie()])
+    probe.result["value"] = None
+    assert SessionValidator(str(path)).check() is True
+    assert SessionValidator(str(path), confirm=False).check() is True
+    assert len(probe.calls) == 1
+
+def test_concurrent_checks_share_one_probe(tmp_path, clock, monkeypatch):
+    path = tmp_path / "session.json"
+    write_state(path, [cookie()])
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_probe(state):
+        calls.append(state)
+        started.set()
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(session_store, "probe_session", slow_probe)
+    validator = SessionValidator(str(path), ttl=300)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(validator.check())) for _ in range(5)]
+    threads[0].start()
+    assert started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == [True] * 5
+    assert len(calls) == 1
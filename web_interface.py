@@ -3,72 +3,179 @@
 Interface web para monitorar o scraping do QConcursos em tempo real.
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 import os
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 import time
-import json
+import uuid
 import threading
+from readiness import NetworkIdle, wait_ready, scroll_until_stable
+from session_store import SESSION_PATH, SessionValidator, is_login_url, save_state
+from browser_server import SharedBrowser
+from freeplane import FreeplaneWriter, write_gzip_copy
+from question_bank import QuestionBank
+from extraction import extract_questions, to_questions
+from config import BROWSER_SERVER_CONFIG, OUTPUT_CONFIG, LOG_CONFIG, LIVE_CONFIG, JOB_QUEUE_CONFIG
+from log_writer import BufferedLogWriter, format_text, read_tail, split_level
+from live_updates import EventBroker
+from event_bus import bus
+from job_queue import new_job, open_queue
+from job_registry import JobRegistry, job_log_path, job_output_path
+from rate_limiter import limiter
+
+# Flask-SocketIO é opcional: sem ele o monitor usa o SSE de /events
+try:
+    from flask_socketio import SocketIO, emit
+except ImportError:
+    SocketIO = None
 
 app = Flask(__name__)
+socketio = SocketIO(app) if SocketIO is not None and LIVE_CONFIG["socketio"] else None
 
-LOG_PATH = "logs/scraper.log"
+LOG_PATH = LOG_CONFIG["path"]
 MM_PATH = os.path.join("output", "resultado.mm")
-SESSION_PATH = os.path.join("output", "session")
+gzip_lock = threading.Lock()  # Serializa a geração do resultado.mm.gz
+SESSION_CHECK_TTL = 300  # Segundos que um resultado de validação de sessão é reaproveitado
+LOGIN_REDIRECT_TIMEOUT = 30000  # Limite (ms) da espera pelo redirecionamento após o login
 
-# Variável global para controlar o status
+# Variável global para controlar o status (último job que mudou de estado)
 scraping_status = {"running": False, "completed": False, "error": None}
 
+# Status, progresso, log e mapa de cada job, compartilhados entre processos
+registry = JobRegistry()
+
+# Job executado pela thread atual (id, log_writer e nodes)
+current_job = threading.local()
+
+
+# Escrita do log em segundo plano: log() só enfileira a mensagem
+log_writer = BufferedLogWriter(LOG_PATH)
+
+# Eventos enviados aos monitores conectados (Socket.IO e/ou SSE)
+broker = EventBroker()
+broker.socketio = socketio
+
+
+def forward_events(events):
+    """
+    Repassa ao broker um lote do barramento: eventos deste processo e, via
+    Redis, dos scrapers rodando em outros processos/containers.
+    """
+    global scraping_status
+    for event, data in events:
+        if event == "status":
+            # Início de um job (local ou num scrape_worker): limpa o histórico do monitor
+            if data.get("running") and not scraping_status.get("running"):
+                broker.reset()
+            scraping_status = data
+        if event == "log":
+            stamp = time.strftime("%H:%M:%S", time.localtime(data["ts"]))
+            broker.publish("log", {"line": f"[{stamp}] {data['level']}: {data['message']}\n",
+                                   "job_id": data.get("job_id")})
+        else:
+            broker.publish(event, data)
+
+
+bus.add_listener(forward_events)
+bus.subscribe(forward_events)
+
+
+@app.before_request
+def ensure_bus_subscription():
+    """
+    Com preload_app do gunicorn a assinatura feita no import fica só no mestre;
+    cada worker inicia a sua no primeiro request.
+    """
+    bus.ensure_subscribed()
+
 
 def log(msg):
-    with open(LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(f"[{time.strftime('%H:%M:%S')}] {msg}\n")
+    log_writer.write(msg)
+    job_log = getattr(current_job, "log_writer", None)
+    if job_log is not None:
+        job_log.write(msg)
+    level, message = split_level(msg)
+    bus.publish("log", {"level": level, "message": message, "ts": time.time(),
+                        "job_id": getattr(current_job, "id", None)})
 
 
-def check_session_valid():
-    """Verifica se a sessão salva ainda é válida"""
-    if not os.path.exists(SESSION_PATH):
-        return False
-    
+def set_status(status):
+    """Atualiza o status do job (global e no registro) e avisa os monitores conectados."""
+    global scraping_status
+    job_id = getattr(current_job, "id", None)
+    scraping_status = {**status, "job_id": job_id}
+    bus.publish("status", scraping_status)
+    if job_id:
+        if status["running"]:
+            registry.start(job_id, bus.source)
+        else:
+            registry.finish(job_id, error=status["error"], nodes=current_job.nodes)
+
+
+def update_progress(processed, total, current_url=""):
+    job_id = getattr(current_job, "id", None)
+    bus.publish("progress", {"processed": processed, "total": total, "url": current_url, "job_id": job_id})
+    if job_id:
+        registry.progress(job_id, processed, current_url)
+
+
+# Cache da validação de sessão compartilhado por /session_status e pelos jobs
+session_validator = SessionValidator(SESSION_PATH, ttl=SESSION_CHECK_TTL)
+
+
+def wait_login_redirect(page):
+    """Aguarda o site sair da tela de login após o envio do formulário"""
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(storage_state=SESSION_PATH)
-            page = context.new_page()
-            
-            # Tenta acessar uma página que requer login
-            page.goto("https://app.qconcursos.com/b/dashboard", timeout=10000)
-            page.wait_for_timeout(3000)
-            
-            # Se ainda está na página de login, a sessão expirou
-            if "entrar" in page.url or "login" in page.url:
-                browser.close()
-                return False
-            
-            browser.close()
-            return True
-    except:
+        page.wait_for_url(lambda url: not is_login_url(url), timeout=LOGIN_REDIRECT_TIMEOUT)
+    except PlaywrightTimeoutError:
+        pass
+
+
+def check_session_valid(force=False):
+    """Verifica se a sessão salva ainda é válida (cookies + requisição HTTP, com cache)"""
+    try:
+        return session_validator.check(force=force)
+    except Exception:
         return False
 
 
-def scroll_all(page, step=500, pause=1, max_iter=50):
+# Fila de jobs consumida pelo scrape_worker.py (aberta no primeiro uso)
+job_queue = None
+job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    global job_queue
+    with job_queue_lock:
+        if job_queue is None:
+            job_queue = open_queue()
+        return job_queue
+
+
+# Chromium aquecido compartilhado pelos jobs deste processo
+shared_browser = SharedBrowser()
+
+
+def open_browser(p):
+    """Conecta ao Chromium compartilhado ou, se desativado, inicia um navegador próprio"""
+    if BROWSER_SERVER_CONFIG["enabled"]:
+        log("INFO: Conectando ao Chromium compartilhado...")
+        return shared_browser.connect(p)
+    log("INFO: Iniciando navegador Chromium...")
+    return p.chromium.launch(headless=False)  # headless=False para debug
+
+
+def scroll_all(page, quiet_ms=None, timeout=None, max_iter=None):
     """
-    Rola a página para carregar todo o conteúdo dinâmico.
+    Rola a página para carregar todo o conteúdo dinâmico, até o DOM estabilizar.
     """
     log("INFO: Iniciando scroll da página")
-    last = 0
-    for i in range(max_iter):
-        page.evaluate(f"window.scrollBy(0,{step});")
-        time.sleep(pause)
-        h = page.evaluate("document.body.scrollHeight")
-        if h == last:
-            log(f"INFO: Scroll completo após {i+1} iterações")
-            break
-        last = h
-        if i % 10 == 0:
-            log(f"INFO: Scrolling... iteração {i+1}/{max_iter}")
+    stats = scroll_until_stable(page, quiet_ms, timeout, max_iter)
+    if stats["converged"]:
+        log(f"INFO: Scroll completo após {stats['iterations']} iterações em {stats['elapsed']:.2f}s")
     else:
-        log(f"WARNING: Scroll atingiu limite máximo de {max_iter} iterações")
+        log(f"WARNING: Scroll não estabilizou: {stats['iterations']} iterações em {stats['elapsed']:.2f}s")
+    return stats
 
 
 def click_tab(page, text):
@@ -92,179 +199,67 @@ def click_tab(page, text):
     """
     
     try:
-        time.sleep(1)
+        if not wait_ready(page, "tabs"):
+            log("WARNING: Abas não apareceram dentro do timeout")
         result = page.evaluate(click_tab_js)
         if result:
             log(f"INFO: Aba '{text}' clicada com sucesso!")
-            time.sleep(2)
         else:
             log(f"WARNING: Aba '{text}' não encontrada")
-        time.sleep(1)
+        return result
     except Exception as e:
         log(f"ERROR: Erro ao clicar na aba '{text}': {str(e)}")
+        return False
 
 
-def extract_gabarito_automatico(page):
+def extract_all_data_with_javascript(page):
     """
-    Extrai o gabarito automaticamente usando estatísticas - baseado no bookmarklet
-    """
-    log("INFO: Extraindo gabaritos automaticamente...")
-    
-    extract_gabarito_js = """
-    (function() {
-        let respostas = [];
-        document.querySelectorAll('.mb-4').forEach((questao, index) => {
-            try {
-                let el = questao.querySelector('[data-question-statistics-alternatives-statistics]');
-                if (!el) return;
-                let stats = JSON.parse(el.getAttribute('data-question-statistics-alternatives-statistics'));
-                let correctAnswer = stats.find(item => item.hit > 0);
-                                
-                let numeroQuestaoEl = questao.querySelector('.index.text-center.font-weight-bold.border-right.pr-2.svelte-1i1uol');
-                let numeroQuestao = numeroQuestaoEl ? numeroQuestaoEl.textContent.trim().replace(/\\n/g, '') : (index + 1);
-                                
-                if (correctAnswer) {
-                    let alternativa = correctAnswer.id;
-                    respostas.push(`${numeroQuestao}:${alternativa}`);
-                }
-            } catch (error) {
-                console.error('Erro ao processar questão:', error);
-            }
-        });
-        
-        if (respostas.length > 0) {
-            let resultado = respostas.join(', ');
-            console.log('Gabaritos extraídos:', resultado);
-            return resultado;
-        } else {
-            console.log('Nenhuma resposta encontrada!');
-            return '';
-        }
-    })();
+    Extrai todas as questões em uma única ida ao navegador
     """
+    log("INFO: Iniciando extração estruturada das questões...")
     
     try:
-        resultado = page.evaluate(extract_gabarito_js)
-        if resultado:
-            log(f"INFO: Gabaritos extraídos: {resultado[:100]}..." if len(resultado) > 100 else f"INFO: Gabaritos extraídos: {resultado}")
-            
-            # Converte para dicionário
-            gabarito_map = {}
-            for item in resultado.split(', '):
-                if ':' in item:
-                    num, alt = item.split(':')
-                    gabarito_map[num.strip()] = alt.strip()
-            
-            return gabarito_map
-        else:
-            log("WARNING: Nenhum gabarito encontrado")
-            return {}
+        nodes = to_questions(extract_questions(page))
+        log(f"INFO: Extraídos {len(nodes)} nódulos de dados!")
+        return nodes
     except Exception as e:
-        log(f"ERROR: Erro ao extrair gabaritos: {str(e)}")
-        return {}
+        log(f"ERROR: Erro na extração de dados: {str(e)}")
+        return []
 
 
-def extract_all_data_with_javascript(page, gabarito_map=None):
+def run_automation_thread(email, password, urls, job_id=None):
     """
-    Extrai todos os dados usando JavaScript - baseado no bookmarklet de extração completa
-    """
-    log("INFO: Iniciando extração completa de dados com JavaScript...")
-    
-    # Se não foi fornecido gabarito, tenta extrair automaticamente
-    if not gabarito_map:
-        gabarito_map = {}
-    
-    # Converte o gabarito_map para string JavaScript
-    gabarito_js = json.dumps(gabarito_map) if gabarito_map else "{}"
-    
-    extract_all_js = f"""
-    (function() {{
-        let m = {gabarito_js};
-        let p = document.querySelectorAll(".mb-4");
-        let nodes = [];
-        
-        p.forEach(e => {{
-            let t = e.querySelector(".index.text-center.font-weight-bold.border-right.pr-2.svelte-1i1uol");
-            t = t ? t.textContent.trim() : "";
-            let n = m[t] ? "" + m[t] : "";
-            
-            // Se não tem gabarito no mapa, tenta extrair da estatística
-            if (n === "") {{
-                try {{
-                    let statsEl = e.querySelector("[data-question-statistics-alternatives-statistics]");
-                    if (statsEl) {{
-                        let stats = JSON.parse(statsEl.getAttribute("data-question-statistics-alternatives-statistics"));
-                        let correctAnswer = stats.find(item => item.hit > 0);
-                        if (correctAnswer) {{
-                            n = correctAnswer.id;
-                        }}
-                    }}
-                }} catch (error) {{
-                    console.error('Erro ao extrair estatística:', error);
-                }}
-            }}
-            
-            let o = e.querySelector(".title");
-            let l = o ? o.textContent.trim() : "";
-            let c = e.querySelector(".info.d-flex.flex-wrap.align-items-center.svelte-1i1uol");
-            let s = c ? c.textContent.trim().replace(/\\s+/g, " ") : "";
-            s.includes(l) && (s = s.replace(l, "").trim());
-            
-            let d = e.querySelector(".font-size-2.statement-container.svelte-18f2a5m");
-            let i = d ? d.innerHTML.trim().replace(/\\n/g, " ") : "";
-            let u = Array.from(e.querySelectorAll(".d-block.font-size-1")).map(e => e.outerHTML.trim()).join(" ");
-            let b = Array.from(e.querySelectorAll(".question-commentary-text.font-size-2")).map(e => e.outerHTML.trim()).join(" ") + u;
-            b = b.replace('<div class="question-commentary-text font-size-2">', '<div class="question-commentary-text font-size-2"><p>------------</p>');
-            
-            let h = e.querySelector(".question-commentary-text.font-size-2");
-            let x = "";
-            if (h) {{
-                let e_html = h.outerHTML.trim();
-                x = `<node MAX_WIDTH="40 cm"><richcontent TYPE="NODE"><html><head></head><body>${{e_html}}</body></html></richcontent></node>`;
-            }}
-            
-            let y = "E" === n ? ' style="background-color: #ffcccc;"' : "";
-            let v = [t, n, l, s].filter(Boolean).join(" | ");
-            let q = `<span${{y}}>${{v}}</span><br>${{i}}`;
-            let k = e.querySelector(".badge.badge-secondary.text-light.py-1.px-1.ml-2.font-size-1");
-            k = k ? k.outerHTML.trim() : "";
-            
-            let N = Array.from(e.querySelectorAll(".text.px-3.font-size-2.svelte-1tiqrp1")).map(e => e.outerHTML.replace('<div class="text px-3.font-size-2 svelte-1tiqrp1">', '<div class="text px-3 font-size-2 svelte-1tiqrp1">&#9830 ')).join("");
-            
-            if (q.trim() !== "") {{
-                let node = `<node MAX_WIDTH="40 cm"><richcontent TYPE="NODE"><html><head></head><body>${{q}}</body></html></richcontent><richcontent TYPE="NOTE" CONTENT-TYPE="xml/"><html><head></head><body>${{b}} | ${{k}}</body></html></richcontent>${{N ? `<node><richcontent TYPE="NODE"><html><head></head><body>${{N}}</body></html></richcontent></node>` : ""}}${{x}}</node>`;
-                nodes.push({{gabarito: n, conteudo: node}});
-            }}
-        }});
-        
-        // Ordena por gabarito
-        nodes.sort((a, b) => a.gabarito.localeCompare(b.gabarito));
-        
-        console.log(`Extraídos ${{nodes.length}} nódulos`);
-        return nodes;
-    }})();
+    Executa um job (numa thread da interface web ou num scrape_worker) com
+    log e mapa próprios, registrando status e progresso no JobRegistry.
+
+    Returns:
+        True se o job foi concluído
     """
-    
+    job_id = job_id or uuid.uuid4().hex
+    registry.create(job_id, len(urls))
+    current_job.id = job_id
+    current_job.nodes = 0
+    current_job.log_writer = BufferedLogWriter(job_log_path(job_id))
     try:
-        nodes = page.evaluate(extract_all_js)
-        log(f"INFO: Extraídos {len(nodes)} nódulos de dados!")
-        return nodes
-    except Exception as e:
-        log(f"ERROR: Erro na extração de dados: {str(e)}")
-        return []
+        return bool(run_job(email, password, urls, job_output_path(job_id)))
+    finally:
+        current_job.log_writer.close()
+        current_job.id = current_job.log_writer = None
 
 
-def run_automation_thread(email, password, urls):
-    """Executa a automação em uma thread separada"""
-    global scraping_status
+def run_job(email, password, urls, mm_path):
+    """Executa a automação gravando o mapa em mm_path; retorna True se concluiu"""
+    bank = None
     try:
-        scraping_status = {"running": True, "completed": False, "error": None}
+        set_status({"running": True, "completed": False, "error": None})
         log("INFO: Iniciando automação Playwright...")
-        all_nodes = []
         
-        with sync_playwright() as p:
-            log("INFO: Iniciando navegador Chromium...")
-            browser = p.chromium.launch(headless=False)  # headless=False para debug
+        if OUTPUT_CONFIG["question_bank"]:
+            bank = QuestionBank(os.path.join("output", OUTPUT_CONFIG["bank_file"]))
+        
+        # Os nós vão direto para o disco à medida que são extraídos
+        with FreeplaneWriter(mm_path) as writer, sync_playwright() as p:
+            browser = open_browser(p)
             
             # Verifica se há sessão salva e válida
             session_exists = os.path.exists(SESSION_PATH)
@@ -284,9 +279,15 @@ def run_automation_thread(email, password, urls):
                 context = browser.new_context()
             
             page = context.new_page()
+            limiter.watch(page)
             
             # Login apenas se necessário
             if not session_valid:
+                if not (email and password):
+                    log("ERROR: Sessão inválida e nenhuma credencial disponível para o login")
+                    browser.close()
+                    set_status({"running": False, "completed": False, "error": "Credenciais ausentes"})
+                    return
                 log("INFO: Navegando para tela de login...")
                 try:
                     page.goto("https://www.qconcursos.com/conta/entrar?return_url=https%3A%2F%2Fapp.qconcursos.com%2F", timeout=30000)
@@ -294,7 +295,7 @@ def run_automation_thread(email, password, urls):
                 except Exception as e:
                     log(f"ERROR: Erro ao carregar página de login: {str(e)}")
                     browser.close()
-                    scraping_status = {"running": False, "completed": False, "error": str(e)}
+                    set_status({"running": False, "completed": False, "error": str(e)})
                     return
                 
                 log("INFO: Preenchendo credenciais...")
@@ -305,25 +306,25 @@ def run_automation_thread(email, password, urls):
                 except Exception as e:
                     log(f"ERROR: Erro ao preencher credenciais: {str(e)}")
                     browser.close()
-                    scraping_status = {"running": False, "completed": False, "error": str(e)}
+                    set_status({"running": False, "completed": False, "error": str(e)})
                     return
                 
                 log("INFO: Clicando no botão de login...")
                 try:
                     page.click('#btnLogin')
-                    page.wait_for_timeout(5000)
                     log("INFO: Botão de login clicado")
+                    wait_login_redirect(page)
                 except Exception as e:
                     log(f"ERROR: Erro ao clicar no botão de login: {str(e)}")
                     browser.close()
-                    scraping_status = {"running": False, "completed": False, "error": str(e)}
+                    set_status({"running": False, "completed": False, "error": str(e)})
                     return
                 
                 log(f"INFO: URL atual após login: {page.url}")
-                if "entrar" in page.url:
+                if is_login_url(page.url):
                     log("ERROR: Falha no login. Verifique suas credenciais.")
                     browser.close()
-                    scraping_status = {"running": False, "completed": False, "error": "Falha no login"}
+                    set_status({"running": False, "completed": False, "error": "Falha no login"})
                     return
                 
                 log("INFO: Login realizado com sucesso!")
@@ -332,53 +333,13 @@ def run_automation_thread(email, password, urls):
                 log("INFO: Salvando sessão para uso futuro...")
                 try:
                     os.makedirs("output", exist_ok=True)
-                    context.storage_state(path=SESSION_PATH)
+                    save_state(context, SESSION_PATH)
                     log("INFO: Sessão salva com sucesso!")
                 except Exception as e:
                     log(f"WARNING: Erro ao salvar sessão: {str(e)}")
             else:
+                # check_session_valid() já confirmou a sessão com uma requisição ao dashboard
                 log("INFO: Usando sessão existente - login não necessário!")
-                # Verifica se realmente está logado
-                try:
-                    page.goto("https://app.qconcursos.com/b/dashboard", timeout=10000)
-                    page.wait_for_timeout(3000)
-                    if "entrar" in page.url or "login" in page.url:
-                        log("WARNING: Sessão inválida, fazendo novo login...")
-                        session_valid = False
-                        # Continua para o bloco de login abaixo
-                    else:
-                        log("INFO: Sessão confirmada como válida!")
-                except Exception as e:
-                    log(f"WARNING: Erro ao verificar sessão: {str(e)}")
-                    session_valid = False
-            
-            # Se a sessão não é válida, faz login
-            if not session_valid:
-                log("INFO: Fazendo login...")
-                try:
-                    page.goto("https://www.qconcursos.com/conta/entrar?return_url=https%3A%2F%2Fapp.qconcursos.com%2F", timeout=30000)
-                    page.fill('#login_email', email)
-                    page.fill('#login_password', password)
-                    page.click('#btnLogin')
-                    page.wait_for_timeout(5000)
-                    
-                    if "entrar" in page.url:
-                        log("ERROR: Falha no login. Verifique suas credenciais.")
-                        browser.close()
-                        scraping_status = {"running": False, "completed": False, "error": "Falha no login"}
-                        return
-                    
-                    log("INFO: Login realizado com sucesso!")
-                    
-                    # Salva a sessão
-                    os.makedirs("output", exist_ok=True)
-                    context.storage_state(path=SESSION_PATH)
-                    log("INFO: Sessão salva com sucesso!")
-                except Exception as e:
-                    log(f"ERROR: Erro no login: {str(e)}")
-                    browser.close()
-                    scraping_status = {"running": False, "completed": False, "error": str(e)}
-                    return
             
             # Processa cada URL seguindo a mesma lógica do scraper.py
             log("INFO: INICIANDO PROCESSO COMPLETO DE RASPAGEM DE DADOS")
@@ -387,86 +348,81 @@ def run_automation_thread(email, password, urls):
                     continue
                     
                 log(f"INFO: PROCESSANDO URL {i}/{len(urls)}: {url.strip()}")
+                update_progress(i - 1, len(urls), url.strip())
+                network = NetworkIdle(page)
                 try:
-                    # Navega para a URL
-                    page.goto(url.strip(), wait_until="domcontentloaded", timeout=60000)
+                    # Navega para a URL; o limitador do host substitui a pausa fixa entre URLs
+                    limiter.navigate(
+                        page, url.strip(),
+                        on_wait=lambda wait: log(f"INFO: Aguardando {wait:.1f}s (limite do host)"),
+                        wait_until="domcontentloaded", timeout=60000,
+                    )
                     log("INFO: Página carregada com sucesso!")
                     
-                    # Aguarda a página estabilizar
-                    time.sleep(5)  # Aumentado de 3 para 5 segundos
-                    
-                    # PASSO 1: Clica na aba "Estatísticas" para extrair gabaritos
+                    # PASSO 1: Clica na aba "Estatísticas"; a espera guarda os gabaritos na página
                     log("INFO: PASSO 1: Acessando aba de Estatísticas...")
-                    click_tab(page, "Estatísticas")
-                    time.sleep(4)  # Aumentado de 2 para 4 segundos
-                    
-                    # PASSO 2: Extrai gabaritos automaticamente
-                    log("INFO: PASSO 2: Extraindo gabaritos automaticamente...")
-                    gabarito_map = extract_gabarito_automatico(page)
-                    time.sleep(2)  # Aguarda um pouco após extrair gabaritos
+                    if click_tab(page, "Estatísticas") and not wait_ready(page, "statistics"):
+                        log("WARNING: Estatísticas não carregaram dentro do timeout")
                     
                     # PASSO 3: Clica na aba "Comentários de alunos"
                     log("INFO: PASSO 3: Acessando aba de Comentários de alunos...")
-                    click_tab(page, "Comentários de alunos")
-                    time.sleep(6)  # Aumentado de 3 para 6 segundos - mais tempo para carregar comentários
+                    if click_tab(page, "Comentários de alunos") and not wait_ready(page, "comments"):
+                        log("WARNING: Comentários não apareceram dentro do timeout")
                     
                     # PASSO 4: Scroll completo para carregar todos os comentários
                     log("INFO: PASSO 4: Carregando todos os comentários (scroll completo)...")
-                    scroll_all(page, step=300, pause=1.5, max_iter=80)  # Scroll mais lento e mais iterações
+                    scroll_all(page)
                     
-                    # Aguarda um pouco mais para garantir que tudo carregou
-                    time.sleep(4)  # Aumentado de 2 para 4 segundos
+                    # Aguarda as requisições disparadas pelo scroll terminarem
+                    if not network.wait(page):
+                        log("WARNING: Rede não ficou ociosa dentro do timeout")
                     
                     # PASSO 5: Extração completa usando JavaScript
                     log("INFO: PASSO 5: Executando extração completa de dados...")
-                    nodes = extract_all_data_with_javascript(page, gabarito_map)
+                    nodes = extract_all_data_with_javascript(page)
                     
                     if nodes:
-                        all_nodes.extend(nodes)
+                        writer.write_all(nodes)
+                        if bank:
+                            bank.upsert(nodes)
                         log(f"INFO: EXTRAÍDOS {len(nodes)} NÓDULOS DE DADOS!")
-                        log(f"INFO: Total acumulado: {len(all_nodes)} nódulos")
+                        log(f"INFO: Total acumulado: {writer.count} nódulos")
                     else:
                         log("WARNING: Nenhum nódulo extraído desta URL")
                     
-                    # Pausa entre URLs
-                    if i < len(urls):
-                        log(f"INFO: Aguardando 3s antes da próxima URL...")
-                        time.sleep(3)  # Aumentado de 2 para 3 segundos
-                    
                 except Exception as e:
                     log(f"ERROR: Erro ao processar URL: {str(e)}")
                     continue
+                finally:
+                    network.detach(page)
             
             log("INFO: Fechando navegador...")
             browser.close()
         
-        # Gera o XML Freeplane usando a mesma lógica do scraper.py
-        if all_nodes:
-            log("INFO: INICIANDO FORMATAÇÃO DOS DADOS...")
-            log("INFO: Construindo arquivo XML do Freeplane...")
-            
-            # Constrói o XML manualmente baseado na estrutura do bookmarklet
-            xml_content = '<map version="freeplane 1.9.8"><node LOCALIZED_TEXT="new_mindmap">'
-            for node in all_nodes:
-                xml_content += node['conteudo']
-            xml_content += '</node></map>'
-            
-            # Salvar arquivo
-            os.makedirs("output", exist_ok=True)
-            with open(MM_PATH, "w", encoding="utf-8") as f:
-                f.write(xml_content)
-            
-            log(f"INFO: ARQUIVO SALVO: {MM_PATH}")
-            log(f"INFO: PROCESSO FINALIZADO - {len(all_nodes)} NÓDULOS PROCESSADOS!")
+        # O FreeplaneWriter fecha o mapa e o renomeia para mm_path ao sair do bloco
+        current_job.nodes = writer.count
+        if writer.count:
+            log(f"INFO: ARQUIVO SALVO: {mm_path}")
+            with gzip_lock:
+                write_gzip_copy(mm_path)
+            if bank:
+                log(f"INFO: Banco de questões atualizado: {bank.path}")
+            log(f"INFO: PROCESSO FINALIZADO - {writer.count} NÓDULOS PROCESSADOS!")
             log("INFO: RASPAGEM CONCLUÍDA COM SUCESSO!")
         else:
             log("WARNING: Nenhum dado foi extraído. Verifique as URLs e configurações.")
         
-        scraping_status = {"running": False, "completed": True, "error": None}
+        update_progress(len(urls), len(urls))
+        set_status({"running": False, "completed": True, "error": None})
+        return True
         
     except Exception as e:
         log(f"ERROR: Erro geral na automação: {str(e)}")
-        scraping_status = {"running": False, "completed": False, "error": str(e)}
+        set_status({"running": False, "completed": False, "error": str(e)})
+        return False
+    finally:
+        if bank:
+            bank.close()
 
 
 @app.route("/")
@@ -480,15 +436,32 @@ def start_scraping():
         password = request.form.get("password")
         urls = request.form.get("urls", "").splitlines()
         
-        # Limpa log
-        open(LOG_PATH, "w").close()
+        if JOB_QUEUE_CONFIG["enabled"]:
+            # Só enfileira: um processo do scrape_worker.py executa o job
+            queue = get_job_queue()
+            if queue.pending() >= JOB_QUEUE_CONFIG["max_pending"]:
+                return jsonify({"success": False, "error": "Fila de jobs cheia, tente mais tarde"}), 503
+            # As credenciais do formulário não vão para a fila: o worker usa a
+            # sessão salva ou QC_EMAIL/QC_PASSWORD do próprio ambiente
+            job = new_job(urls)
+            registry.create(job["id"], len(job["urls"]))
+            job_id = queue.push(job)
+            log(f"INFO: Job {job_id} enfileirado ({queue.pending()} na fila)")
+            return jsonify({"success": True, "message": "Automação enfileirada", "job_id": job_id})
+        
+        # Limpa o log geral só se nenhum outro job estiver rodando (cada job tem o seu)
+        if not registry.list(limit=1, state="running"):
+            log_writer.reset()
+        broker.reset()
         
         # Inicia a automação em uma thread separada
-        thread = threading.Thread(target=run_automation_thread, args=(email, password, urls))
+        job_id = uuid.uuid4().hex
+        registry.create(job_id, len(urls))
+        thread = threading.Thread(target=run_automation_thread, args=(email, password, urls, job_id))
         thread.daemon = True
         thread.start()
         
-        return jsonify({"success": True, "message": "Automação iniciada"})
+        return jsonify({"success": True, "message": "Automação iniciada", "job_id": job_id})
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
@@ -503,6 +476,7 @@ def clear_session():
     try:
         if os.path.exists(SESSION_PATH):
             os.remove(SESSION_PATH)
+        session_validator.invalidate()
         return jsonify({"success": True, "message": "Sessão limpa com sucesso"})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
@@ -511,7 +485,8 @@ def clear_session():
 def session_status():
     """Retorna o status da sessão"""
     session_exists = os.path.exists(SESSION_PATH)
-    session_valid = check_session_valid() if session_exists else False
+    force = request.args.get("refresh") == "1"
+    session_valid = check_session_valid(force=force) if session_exists else False
     
     return jsonify({
         "session_exists": session_exists,
@@ -519,18 +494,115 @@ def session_status():
         "message": "Sessão válida" if session_valid else ("Sessão expirada" if session_exists else "Nenhuma sessão")
     })
 
+@app.route("/browser_status")
+def browser_status():
+    """Retorna a saúde do Chromium compartilhado"""
+    return jsonify({"enabled": BROWSER_SERVER_CONFIG["enabled"], **shared_browser.status()})
+
+def send_mm(path):
+    """
+    Envia um mapa com ETag/Last-Modified (respostas 304) e suporte a Range.
+
+    Se o cliente aceita gzip, envia o .mm.gz pré-comprimido com
+    Content-Encoding: gzip. ?format=gz baixa o .mm.gz como arquivo e
+    ?format=raw força o .mm sem compressão.
+    """
+    if not os.path.exists(path):
+        return "Arquivo não encontrado", 404
+
+    fmt = request.args.get("format", "auto")
+    accepts_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+    if fmt == "raw" or (fmt == "auto" and not accepts_gzip):
+        response = send_file(path, mimetype="application/x-freemind", as_attachment=True,
+                             conditional=True, etag=True, max_age=0)
+    else:
+        with gzip_lock:
+            gz_path = write_gzip_copy(path)
+        if fmt == "gz":
+            response = send_file(gz_path, mimetype="application/gzip", as_attachment=True,
+                                 conditional=True, etag=True, max_age=0)
+        else:
+            response = send_file(gz_path, mimetype="application/x-freemind", as_attachment=True,
+                                 download_name=os.path.basename(path),
+                                 conditional=True, etag=True, max_age=0)
+            response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
 @app.route("/download_mm")
 def download_mm():
-    if os.path.exists(MM_PATH):
-        return send_file(MM_PATH, as_attachment=True)
-    return "Arquivo não encontrado", 404
+    """Baixa o mapa do último job concluído (ver send_mm)."""
+    return send_mm(registry.latest_output() or MM_PATH)
+
+@app.route("/jobs")
+def list_jobs():
+    """Jobs mais recentes (?state=queued|running|completed|failed, ?limit=)."""
+    limit = min(request.args.get("limit", 50, type=int), 500)
+    return jsonify(registry.list(limit=limit, state=request.args.get("state")))
+
+@app.route("/jobs/<job_id>")
+def get_job(job_id):
+    job = registry.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job não encontrado"}), 404
+    return jsonify(job)
+
+@app.route("/jobs/<job_id>/download")
+def download_job(job_id):
+    job = registry.get(job_id)
+    if job is None:
+        return "Job não encontrado", 404
+    return send_mm(job["output_path"])
+
+@app.route("/jobs/<job_id>/log")
+def job_log(job_id):
+    """Log do job a partir de ?cursor= (mesmo formato de /log_tail)."""
+    job = registry.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job não encontrado"}), 404
+    return jsonify(read_tail(job["log_path"], request.args.get("cursor")))
 
 @app.route("/get_log")
 def get_log():
+    log_writer.flush()
     if os.path.exists(LOG_PATH):
         with open(LOG_PATH, "r", encoding="utf-8") as f:
-            return f.read()
+            return "".join(format_text(line) for line in f)
     return "Sem logs ainda."
 
+@app.route("/log_tail")
+def log_tail():
+    """
+    Devolve só as linhas novas do log desde ?cursor= (ver log_writer.read_tail).
+    """
+    log_writer.flush()
+    return jsonify(read_tail(LOG_PATH, request.args.get("cursor")))
+
+@app.route("/events")
+def events():
+    """
+    Stream SSE com log, progresso e status (alternativa ao Socket.IO).
+    """
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_id") or 0
+    try:
+        last_id = int(last_id)
+    except ValueError:
+        last_id = 0
+    response = Response(stream_with_context(broker.sse_stream(last_id)), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+if socketio is not None:
+    @socketio.on("subscribe")
+    def on_subscribe(data=None):
+        """Reenvia ao cliente o que ele perdeu desde last_id."""
+        last_id = int((data or {}).get("last_id") or 0)
+        for item in broker.replay(last_id):
+            emit(item["event"], {"id": item["id"], **item["data"]})
+
 if __name__ == "__main__":
-    app.run(debug=True) 
\ No newline at end of file
+    if socketio is not None:
+        socketio.run(app, debug=True)
+    else:
+        app.run(debug=True, threaded=True) 
\ No newline at end of file